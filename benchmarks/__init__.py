@@ -0,0 +1 @@
+"""Benchmarks of the pipelines, run with `python -m benchmarks.<name>`."""
@@ -0,0 +1,38 @@
+"""Run time of the batched bootstrap confidence intervals on synthetic groups."""
+
+import time
+
+import click
+import numpy as np
+
+from movie_metadata.stats import bootstrap_group_means
+
+
+@click.command()
+@click.option("-g", "--groups", default=2000, show_default=True)
+@click.option(
+    "--mean-size",
+    default=5.0,
+    show_default=True,
+    help="Mean number of rows per group (geometric distribution).",
+)
+@click.option("-r", "--resamples", default=10_000, show_default=True)
+@click.option("--seed", default=0, show_default=True)
+def main(groups: int, mean_size: float, resamples: int, seed: int) -> None:
+    """Time the confidence intervals of the means of synthetic rating groups."""
+    rng = np.random.default_rng(seed)
+    sizes = rng.geometric(1 / mean_size, groups)
+    values = rng.normal(7.9, 0.3, sizes.sum()).round(1)
+
+    start = time.perf_counter()
+    low, high = bootstrap_group_means(values, sizes, n_resamples=resamples, seed=seed)
+    wall_time = time.perf_counter() - start
+
+    draws = int(sizes[sizes > 1].sum()) * resamples
+    click.echo(f"groups: {groups}, rows: {sizes.sum()}, resamples: {resamples}")
+    click.echo(f"time: {wall_time:.2f}s ({draws / wall_time / 1e6:.1f}M draws/s)")
+    click.echo(f"median interval width: {np.median(high - low):.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Run time of the duplicate detection on synthetic noisy catalogs of growing size."""
+
+import time
+
+import click
+import numpy as np
+import polars as pl
+
+from movie_metadata.dedupe import find_duplicates
+
+syllables = "ka lo mi ren sa to vel dar ni qua bel or im stra fen ga lu ther".split()
+
+
+def synthetic_titles(n: int, duplicate_rate: float, seed: int) -> pl.DataFrame:
+    """Generate `n` titles, a fraction of which are noisy copies of others.
+
+    Parameters
+    ----------
+    n : int
+        Number of records.
+    duplicate_rate : float
+        Fraction of the records copied from another record with a trailing space,
+        upper case or punctuation and a release year off by up to one.
+    seed : int
+        Seed of the random generator.
+
+    Returns
+    -------
+    pl.DataFrame
+        Columns `title` and `released_year`.
+    """
+    rng = np.random.default_rng(seed)
+    n_duplicates = int(n * duplicate_rate)
+    n_originals = n - n_duplicates
+    # A vocabulary of 2 and 3 syllable words with Zipf distributed frequencies.
+    vocabulary = np.unique(
+        ["".join(rng.choice(syllables, rng.integers(2, 4))) for _ in range(20_000)]
+    )
+    weights = 1 / np.arange(1, len(vocabulary) + 1)
+    lengths = rng.integers(1, 6, n_originals)
+    tokens = rng.choice(vocabulary, lengths.sum(), p=weights / weights.sum())
+    originals = pl.DataFrame(
+        {
+            "title": tokens,
+            "group": np.repeat(np.arange(n_originals), lengths),
+        }
+    )
+    originals = (
+        originals.group_by("group", maintain_order=True)
+        .agg(pl.col("title").str.join(" "))
+        .select("title", released_year=pl.Series(rng.integers(1920, 2024, n_originals)))
+    )
+
+    sources = originals.sample(n_duplicates, with_replacement=True, seed=seed)
+    noise = rng.integers(0, 3, n_duplicates)
+    duplicates = sources.with_columns(
+        pl.when(pl.Series(noise) == 0)
+        .then(pl.col("title") + " ")
+        .when(pl.Series(noise) == 1)
+        .then(pl.col("title").str.to_uppercase())
+        .otherwise(pl.col("title").str.replace(" ", ": ")),
+        pl.col("released_year") + pl.Series(rng.integers(-1, 2, n_duplicates)),
+    )
+    return pl.concat([originals, duplicates]).sample(
+        fraction=1, shuffle=True, seed=seed
+    )
+
+
+@click.command()
+@click.option(
+    "-n",
+    "--records",
+    multiple=True,
+    type=int,
+    default=[10_000, 100_000, 1_000_000],
+    show_default=True,
+)
+@click.option("--duplicate-rate", default=0.1, show_default=True)
+@click.option("--seed", default=0, show_default=True)
+def main(records: tuple[int, ...], duplicate_rate: float, seed: int) -> None:
+    """Time the duplicate detection on synthetic catalogs of growing size."""
+    for n in records:
+        titles = synthetic_titles(n, duplicate_rate, seed)
+        start = time.perf_counter()
+        pairs, clusters = find_duplicates(titles)
+        wall_time = time.perf_counter() - start
+        click.echo(
+            f"records: {n:>9}, time: {wall_time:6.2f}s "
+            + f"({wall_time / n * 1e6:.1f}µs/record), pairs: {pairs.height}, "
+            + f"clusters: {clusters['cluster'].n_unique()}"
+        )
+
+
+if __name__ == "__main__":
+    main()
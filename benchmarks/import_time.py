@@ -0,0 +1,204 @@
+"""Import time of the notebook and library modules with a budget check.
+
+Each target is imported in a fresh interpreter with `python -X importtime` and the
+cumulative time of its top-level imports is reported. The notebook is measured twice:
+its startup cell alone, and the imports of all of its cells (marimo runs every cell
+when the notebook opens). The run fails if a target exceeds its budget or if the
+notebook's startup cell loads a plotting library.
+
+`tests/test_import_time.py` runs the check with the default budgets as a
+`performance` test.
+"""
+
+import ast
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+import click
+
+# Root of the repository, the working directory of the measured interpreters.
+repo_root = Path(__file__).parent.parent
+
+# Marimo notebook whose startup cell is measured.
+notebook_path = repo_root / "notebooks" / "movie_metadata.py"
+
+# Names of the notebook targets in the report.
+notebook_target = "notebook startup cell"
+notebook_cells_target = "notebook, all cells"
+
+# Library modules measured by default.
+default_modules = ["movie_metadata.catalog", "movie_metadata.service"]
+
+# Packages the notebook's startup cell must not load.
+deferred_packages = ["matplotlib", "seaborn", "great_tables", "plotly"]
+
+# Line of the `-X importtime` report, e.g. "import time:  123 |  456 |   polars".
+importtime_line = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def cell_imports(path: Path = notebook_path) -> list[str]:
+    """Return the import statements of every notebook cell that imports.
+
+    Parameters
+    ----------
+    path : Path, optional
+        Marimo notebook, by default `notebook_path`.
+
+    Returns
+    -------
+    list[str]
+        The import statements of each cell, one per line, in notebook order.
+
+    Raises
+    ------
+    ValueError
+        If no cell of the notebook imports anything.
+    """
+    cells = []
+    for node in ast.parse(path.read_text()).body:
+        if not isinstance(node, ast.FunctionDef):
+            continue
+        imports = [
+            statement
+            for statement in node.body
+            if isinstance(statement, (ast.Import, ast.ImportFrom))
+        ]
+        if imports:
+            cells.append("\n".join(ast.unparse(statement) for statement in imports))
+    if not cells:
+        raise ValueError(f"No cell of '{path}' imports anything.")
+    return cells
+
+
+def startup_imports(path: Path = notebook_path) -> str:
+    """Return the import statements of the first notebook cell that imports."""
+    return cell_imports(path)[0]
+
+
+def measure(
+    code: str, baseline: frozenset[str] = frozenset()
+) -> tuple[float, dict[str, float]]:
+    """Run `code` in a fresh interpreter with `-X importtime`.
+
+    Parameters
+    ----------
+    code : str
+        Code importing the modules to measure.
+    baseline : frozenset[str], optional
+        Modules imported by the interpreter itself (e.g. `site`), left out of the
+        report, by default empty.
+
+    Returns
+    -------
+    tuple[float, dict[str, float]]
+        Total import time in ms (sum of the cumulative times of the top-level
+        imports) and the cumulative time in ms of every imported module.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=repo_root,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total = 0.0
+    modules: dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        match = importtime_line.match(line)
+        if match is None or match.group(4) in baseline:
+            continue
+        cumulative = int(match.group(2)) / 1000
+        modules[match.group(4)] = cumulative
+        # Nested imports are indented by two spaces per level.
+        if len(match.group(3)) == 1:
+            total += cumulative
+    return total, modules
+
+
+@click.command()
+@click.option(
+    "-m",
+    "--module",
+    "modules",
+    multiple=True,
+    help="Library module to measure, may be repeated. By default "
+    + ", ".join(default_modules)
+    + ".",
+)
+@click.option("-r", "--repeat", default=5, show_default=True, help="Runs per target.")
+@click.option(
+    "--notebook-budget",
+    default=1500.0,
+    show_default=True,
+    help="Budget of the notebook's startup cell [ms].",
+)
+@click.option(
+    "--notebook-cells-budget",
+    default=3000.0,
+    show_default=True,
+    help="Budget of the imports of all notebook cells [ms].",
+)
+@click.option(
+    "--module-budget",
+    default=1000.0,
+    show_default=True,
+    help="Budget of each library module [ms].",
+)
+@click.option(
+    "--top", default=5, show_default=True, help="Slowest imports listed per target."
+)
+def main(
+    modules: tuple[str, ...],
+    repeat: int,
+    notebook_budget: float,
+    notebook_cells_budget: float,
+    module_budget: float,
+    top: int,
+) -> None:
+    """Measure import times and check them against their budgets."""
+    targets = {
+        notebook_target: (startup_imports(), notebook_budget),
+        notebook_cells_target: ("\n".join(cell_imports()), notebook_cells_budget),
+    } | {
+        module: (f"import {module}", module_budget)
+        for module in modules or default_modules
+    }
+
+    # Warm-up run, so that bytecode compilation is not measured.
+    for code, _ in targets.values():
+        measure(code)
+    baseline = frozenset(measure("pass")[1])
+
+    failures = []
+    for name, (code, budget) in targets.items():
+        runs = [measure(code, baseline) for _ in range(repeat)]
+        total = statistics.median(run_total for run_total, _ in runs)
+        imported = runs[-1][1]
+        status = "ok" if total <= budget else "OVER BUDGET"
+        click.echo(f"{name}: {total:.1f} ms (budget {budget:.0f} ms) {status}")
+        slowest = sorted(
+            (module for module in imported if "." not in module),
+            key=imported.__getitem__,
+            reverse=True,
+        )
+        for module in slowest[:top]:
+            click.echo(f"    {imported[module]:8.1f} ms  {module}")
+        if total > budget:
+            failures.append(f"{name} exceeds its budget")
+
+        if name == notebook_target:
+            loaded = [package for package in deferred_packages if package in imported]
+            if loaded:
+                failures.append(f"{name} imports {', '.join(loaded)}")
+
+    for failure in failures:
+        click.echo(f"failed: {failure}", err=True)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
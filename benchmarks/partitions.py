@@ -0,0 +1,124 @@
+"""Bytes read by a year-range query on the partitioned dataset versus a CSV scan.
+
+The bundled catalog is repeated `--copies` times (with distinct titles and vote
+counts, so that copies do not compress away) to get a dataset of a realistic size,
+written both as a raw CSV and as a partitioned Parquet dataset, and the same
+`released_year.is_between(START, END)` query is run on both.
+
+Bytes read are the `read_bytes` counter of `/proc/self/io` (Linux only), the bytes
+fetched from storage, which covers memory-mapped reads too. The pages of the files
+are evicted from the page cache before every query, so the directory must be on a
+disk-backed file system (not tmpfs).
+"""
+
+import os
+import tempfile
+import time
+from collections.abc import Callable, Iterable
+from pathlib import Path
+
+import click
+import polars as pl
+
+from movie_metadata.catalog import col_order, imdb_top_1000_path, transform
+from movie_metadata.dataset import scan_dataset, scan_years, write_dataset
+
+
+def bytes_read() -> int:
+    """Return the number of bytes this process fetched from storage so far."""
+    with open("/proc/self/io") as io:
+        for line in io:
+            if line.startswith("read_bytes:"):
+                return int(line.split()[1])
+    raise RuntimeError("'/proc/self/io' has no 'read_bytes' counter.")
+
+
+def evict(paths: Iterable[Path]) -> None:
+    """Drop the cached pages of `paths` so that the next reads hit the storage."""
+    os.sync()
+    for path in paths:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+
+
+def measure(
+    query: Callable[[], pl.LazyFrame], paths: list[Path]
+) -> tuple[int, int, float]:
+    """Collect `query` with cold `paths` and return its rows, bytes read and time."""
+    evict(paths)
+    before = bytes_read()
+    start = time.perf_counter()
+    rows = query().collect().height
+    return rows, bytes_read() - before, time.perf_counter() - start
+
+
+@click.command()
+@click.option("--start", default=2006, show_default=True, help="First release year.")
+@click.option("--end", default=2016, show_default=True, help="Last release year.")
+@click.option(
+    "-c",
+    "--copies",
+    default=100,
+    show_default=True,
+    help="Number of times the bundled catalog is repeated.",
+)
+@click.option(
+    "--dir",
+    "directory",
+    type=click.Path(file_okay=False, exists=True),
+    default=tempfile.gettempdir(),
+    show_default=True,
+    help="Disk-backed directory the files are written to.",
+)
+def main(start: int, end: int, copies: int, directory: str) -> None:
+    """Compare the bytes read by a year-range query on a CSV and on the dataset."""
+    raw = pl.read_csv(imdb_top_1000_path, infer_schema=False)
+    catalog = pl.concat(
+        raw.with_columns(
+            pl.col("Series_Title") + f" ({copy})",
+            (pl.col("No_of_Votes").cast(pl.UInt32) + copy).cast(pl.String),
+        )
+        for copy in range(copies)
+    )
+    with tempfile.TemporaryDirectory(dir=directory) as work_dir:
+        csv_path = Path(work_dir) / "catalog.csv"
+        catalog.write_csv(csv_path)
+
+        def scan_csv() -> pl.LazyFrame:
+            return transform(
+                pl.scan_csv(csv_path, infer_schema=False)
+                .rename(lambda col_name: col_name.lower())
+                .select(col_order)
+            )
+
+        root = write_dataset(scan_csv().collect(), Path(work_dir) / "dataset")
+        files = list(root.rglob("*.parquet"))
+        click.echo(
+            f"rows: {catalog.height}, csv: {csv_path.stat().st_size / 1e6:.1f} MB, "
+            + f"dataset: {sum(file.stat().st_size for file in files) / 1e6:.1f} MB "
+            + f"in {len(files)} files"
+        )
+
+        queries = {
+            f"csv {start}-{end}": (
+                lambda: scan_csv().filter(
+                    pl.col("released_year").is_between(start, end)
+                ),
+                [csv_path],
+            ),
+            "dataset full scan": (lambda: scan_dataset(root), files),
+            f"dataset {start}-{end}": (lambda: scan_years(start, end, root), files),
+        }
+        for name, (query, paths) in queries.items():
+            rows, size, wall_time = measure(query, paths)
+            click.echo(
+                f"{name:>20}: {rows:>7} rows, {size / 1e6:7.2f} MB read, "
+                + f"{wall_time * 1e3:7.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Throughput of the poster fetcher against a local stand-in HTTP server."""
+
+import asyncio
+import hashlib
+import random
+import tempfile
+import threading
+from urllib.parse import urlsplit
+
+import click
+
+from movie_metadata.posters import PosterCache, fetch_posters, poster_urls
+
+
+class StandInServer:
+    """Local HTTP server answering every GET with deterministic image bytes.
+
+    Parameters
+    ----------
+    latency : float
+        Delay before each response in seconds.
+    failure_rate : float
+        Fraction of requests answered with 503 Service Unavailable.
+    size : int
+        Size of each image in bytes.
+    """
+
+    def __init__(self, latency: float, failure_rate: float, size: int) -> None:
+        """Configure the server, it is started by `start`."""
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.size = size
+        self.requests = 0
+        self.loop = asyncio.new_event_loop()
+        self.ready = threading.Event()
+        self.port = 0
+
+    def body(self, path: str) -> bytes:
+        """Return the image bytes served for `path`."""
+        seed = hashlib.sha256(path.encode()).digest()
+        return (seed * (self.size // len(seed) + 1))[: self.size]
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Answer the requests of one keep-alive connection.
+
+        Parameters
+        ----------
+        reader : asyncio.StreamReader
+            Stream of the client requests.
+        writer : asyncio.StreamWriter
+            Stream of the responses.
+        """
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                path = head.decode("latin-1").split(" ", 2)[1]
+                self.requests += 1
+                await asyncio.sleep(self.latency)
+                if random.random() < self.failure_rate:
+                    status, body = "503 Service Unavailable", b""
+                else:
+                    status, body = "200 OK", self.body(path)
+                writer.write(
+                    f"HTTP/1.1 {status}\r\nContent-Type: image/jpeg\r\n".encode()
+                    + f"Content-Length: {len(body)}\r\n\r\n".encode()
+                    + body
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def run(self) -> None:
+        """Run the server on its own event loop (thread target)."""
+        asyncio.set_event_loop(self.loop)
+        server = self.loop.run_until_complete(
+            asyncio.start_server(self.handle, "127.0.0.1", 0)
+        )
+        self.port = server.sockets[0].getsockname()[1]
+        self.ready.set()
+        self.loop.run_forever()
+
+    def start(self) -> None:
+        """Start the server in a daemon thread and wait until it listens."""
+        threading.Thread(target=self.run, daemon=True).start()
+        self.ready.wait()
+
+
+@click.command()
+@click.option("--concurrency", default=32, show_default=True)
+@click.option("--per-host", default=8, show_default=True)
+@click.option(
+    "--latency", default=0.02, show_default=True, help="Server delay per request [s]."
+)
+@click.option(
+    "--failure-rate",
+    default=0.05,
+    show_default=True,
+    help="Fraction of requests answered with 503.",
+)
+@click.option("--size", default=4096, show_default=True, help="Image size [bytes].")
+def main(
+    concurrency: int, per_host: int, latency: float, failure_rate: float, size: int
+) -> None:
+    """Fetch every poster URL from a local stand-in server and report images/s."""
+    server = StandInServer(latency, failure_rate, size)
+    server.start()
+
+    # Keep the paths of the real URLs, served by the stand-in server.
+    urls = [
+        f"http://127.0.0.1:{server.port}{urlsplit(url).path}"
+        for url in poster_urls()["poster_link"]
+    ]
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for run in ("cold", "resumed"):
+            report = asyncio.run(
+                fetch_posters(
+                    urls,
+                    PosterCache(cache_dir),
+                    concurrency=concurrency,
+                    per_host=per_host,
+                    backoff=0.01,
+                )
+            )
+            click.echo(f"{run}: {report.summary()}")
+            missing = [url for url in urls if url not in PosterCache(cache_dir)]
+            click.echo(f"{run}: {len(missing)} URLs missing from the cache")
+    click.echo(f"server requests: {server.requests}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""Load test for the catalog query service reporting latency percentiles."""
+
+import asyncio
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import click
+import numpy as np
+
+# Requests cycled through by the clients, one per endpoint of the service.
+default_targets = [
+    "/top-directors?n=3",
+    "/actor-roles?role=leading&n=10",
+    "/actor-roles?role=all&n=10",
+    "/director-pairings?director=Steven%20Spielberg&n=3",
+    "/best-per-year?start=2006&end=2016",
+    "/genre-averages",
+]
+
+
+async def fetch(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter, host: str, target: str
+) -> int:
+    """Send a GET request on a keep-alive connection and read the response.
+
+    Parameters
+    ----------
+    reader : asyncio.StreamReader
+        Stream of the responses.
+    writer : asyncio.StreamWriter
+        Stream of the requests.
+    host : str
+        Value of the Host header.
+    target : str
+        Request target (path and query string).
+
+    Returns
+    -------
+    int
+        Status code of the response.
+    """
+    writer.write(f"GET {target} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode())
+    await writer.drain()
+    head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1")
+    length = re.search(r"(?i)^content-length:\s*(\d+)", head, re.M)
+    await reader.readexactly(int(length.group(1)) if length else 0)
+    return int(head.split(" ", 2)[1])
+
+
+async def client(
+    host: str,
+    port: int,
+    targets: list[str],
+    n_requests: int,
+    offset: int,
+    latencies: list[float],
+    errors: list[str],
+) -> None:
+    """Send `n_requests` requests sequentially over one connection.
+
+    Parameters
+    ----------
+    host : str
+        Service host.
+    port : int
+        Service port.
+    targets : list[str]
+        Request targets, cycled through starting at `offset`.
+    n_requests : int
+        Number of requests to send.
+    offset : int
+        Index of the first target.
+    latencies : list[float]
+        Latencies (in seconds) of successful requests are appended to it.
+    errors : list[str]
+        Descriptions of failed requests are appended to it.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for i in range(n_requests):
+            target = targets[(offset + i) % len(targets)]
+            start = time.perf_counter()
+            status = await fetch(reader, writer, host, target)
+            if status == 200:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors.append(f"{status} {target}")
+    finally:
+        writer.close()
+
+
+async def run_load(
+    host: str, port: int, targets: list[str], clients: int, requests: int
+) -> tuple[list[float], list[str], float]:
+    """Run the concurrent clients.
+
+    Parameters
+    ----------
+    host : str
+        Service host.
+    port : int
+        Service port.
+    targets : list[str]
+        Request targets.
+    clients : int
+        Number of concurrent connections.
+    requests : int
+        Total number of requests.
+
+    Returns
+    -------
+    tuple[list[float], list[str], float]
+        Latencies of the successful requests, errors and total wall time.
+    """
+    latencies: list[float] = []
+    errors: list[str] = []
+    per_client = [
+        requests // clients + (i < requests % clients) for i in range(clients)
+    ]
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            client(host, port, targets, n, i, latencies, errors)
+            for i, n in enumerate(per_client)
+        )
+    )
+    return latencies, errors, time.perf_counter() - start
+
+
+@click.command()
+@click.option(
+    "--url",
+    help="""Base URL of a running service, e.g. http://127.0.0.1:8000. By default a
+    service is started in a subprocess on a free port.""",
+)
+@click.option("-c", "--clients", default=32, show_default=True)
+@click.option("-n", "--requests", default=2000, show_default=True)
+@click.option("--workers", default=4, show_default=True, help="Workers of the service.")
+@click.option(
+    "-t",
+    "--target",
+    "targets",
+    multiple=True,
+    help="Request target, may be repeated. By default every endpoint is requested.",
+)
+def main(
+    url: str | None, clients: int, requests: int, workers: int, targets: tuple[str, ...]
+) -> None:
+    """Load test the catalog query service and report p50/p99 latency."""
+    process = None
+    if url is None:
+        process = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "movie_metadata.service",
+                "--port",
+                "0",
+                "--workers",
+                str(workers),
+            ],
+            cwd=Path(__file__).parent.parent,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        # assert to address mypy [union-attr] error.
+        assert process.stdout is not None
+        match = re.search(r"http://\S+", process.stdout.readline())
+        if match is None:
+            process.kill()
+            raise click.ClickException("The service did not start.")
+        url = match.group(0)
+
+    try:
+        parts = urlsplit(url)
+        # assert to address mypy [arg-type] error.
+        assert parts.hostname is not None and parts.port is not None
+        latencies, errors, wall_time = asyncio.run(
+            run_load(
+                parts.hostname,
+                parts.port,
+                list(targets) or default_targets,
+                clients,
+                requests,
+            )
+        )
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    ms = np.array(latencies) * 1000
+    click.echo(f"url: {url}")
+    click.echo(f"clients: {clients}, requests: {requests}, errors: {len(errors)}")
+    click.echo(f"throughput: {len(latencies) / wall_time:.1f} req/s")
+    if len(ms):
+        p50, p90, p99 = np.percentile(ms, [50, 90, 99])
+        click.echo(
+            f"latency [ms]: p50 {p50:.2f}  p90 {p90:.2f}  p99 {p99:.2f}  "
+            + f"max {ms.max():.2f}"
+        )
+    for error in sorted(set(errors)):
+        click.echo(f"error: {error}")
+    if errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
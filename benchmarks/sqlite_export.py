@@ -0,0 +1,98 @@
+"""Load rate of the SQLite export and indexed lookups versus Polars scans.
+
+The bundled catalog is repeated `--copies` times with distinct titles and names, so
+that the tables grow like a larger catalog would. The same lookups (movies of a
+person, movies of a title) are run as indexed SQLite queries and as filters of the
+eager catalog.
+"""
+
+import random
+import sqlite3
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import click
+import polars as pl
+
+from movie_metadata.catalog import load_catalog
+from movie_metadata.database import export_sqlite, movies_of_person, star_cols
+
+
+def mean_time(lookup: Callable[[str], object], keys: list[str]) -> float:
+    """Return the mean wall time of `lookup` over `keys` in microseconds."""
+    start = time.perf_counter()
+    for key in keys:
+        lookup(key)
+    return (time.perf_counter() - start) / len(keys) * 1e6
+
+
+@click.command()
+@click.option(
+    "-c",
+    "--copies",
+    default=100,
+    show_default=True,
+    help="Number of times the bundled catalog is repeated.",
+)
+@click.option("-n", "--lookups", default=200, show_default=True)
+@click.option("--seed", default=0, show_default=True)
+def main(copies: int, lookups: int, seed: int) -> None:
+    """Time the SQLite export and compare lookups with Polars filters."""
+    mm = load_catalog()
+    mm = pl.concat(
+        mm.with_columns(pl.col("series_title", "director", *star_cols) + f" ({copy})")
+        for copy in range(copies)
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "catalog.sqlite"
+        start = time.perf_counter()
+        counts = export_sqlite(mm, path)
+        wall_time = time.perf_counter() - start
+        rows = sum(counts.values())
+        click.echo(
+            f"export: {rows} rows in {wall_time:.2f}s "
+            + f"({rows / wall_time:,.0f} rows/s), {path.stat().st_size / 1e6:.1f} MB"
+        )
+
+        rng = random.Random(seed)
+        people = rng.choices(
+            mm["director"].to_list() + mm["star1"].to_list(), k=lookups
+        )
+        titles = rng.choices(mm["series_title"].to_list(), k=lookups)
+        connection = sqlite3.connect(path)
+
+        def polars_person(name: str) -> pl.DataFrame:
+            return mm.filter(
+                (pl.col("director") == name)
+                | pl.any_horizontal(pl.col(star_cols) == name)
+            )
+
+        def sqlite_title(title: str) -> list:
+            return connection.execute(
+                "SELECT * FROM movies WHERE series_title = ?", (title,)
+            ).fetchall()
+
+        def polars_title(title: str) -> pl.DataFrame:
+            return mm.filter(pl.col("series_title") == title)
+
+        click.echo(f"lookups over {mm.height} movies (mean per lookup):")
+        for name, (sqlite_lookup, polars_lookup, keys) in {
+            "movies of a person": (
+                lambda key: movies_of_person(connection, key),
+                polars_person,
+                people,
+            ),
+            "movie by title": (sqlite_title, polars_title, titles),
+        }.items():
+            click.echo(
+                f"{name:>20}: sqlite {mean_time(sqlite_lookup, keys):9.1f} µs, "
+                + f"polars {mean_time(polars_lookup, keys):9.1f} µs"
+            )
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Library modules for the movie metadata analysis."""
@@ -0,0 +1,182 @@
+"""Analyses of the cleaned catalog.
+
+The functions mirror the Analysis section of the `movie_metadata` marimo notebook with
+the hard-coded values (number of rows, directors, years) as parameters. They take and
+return eager or lazy frames alike.
+"""
+
+import polars as pl
+
+from movie_metadata.catalog import FrameT
+
+# Columns holding the four credited actors of a movie.
+star_cols = ["star1", "star2", "star3", "star4"]
+
+
+def top_directors(mm: FrameT, n: int = 3) -> FrameT:
+    """Find the directors with the most movies and their average imdb rating.
+
+    Parameters
+    ----------
+    mm : FrameT
+        Cleaned catalog, eager or lazy.
+    n : int, optional
+        Number of directors, by default 3.
+
+    Returns
+    -------
+    FrameT
+        Columns `director`, `movie_count` and `avg_imdb_rating`.
+    """
+    return (
+        mm.group_by("director")
+        .agg(
+            pl.len().alias("movie_count"),
+            pl.mean("imdb_rating").round(2).alias("avg_imdb_rating"),
+        )
+        .sort(by="movie_count", descending=True)
+        .head(n)
+    )
+
+
+def leading_roles(mm: FrameT, n: int = 10) -> FrameT:
+    """Find the actors with the most leading roles (`star1`).
+
+    Parameters
+    ----------
+    mm : FrameT
+        Cleaned catalog, eager or lazy.
+    n : int, optional
+        Number of actors, by default 10.
+
+    Returns
+    -------
+    FrameT
+        Columns `actor` and `leading_roles`.
+    """
+    return (
+        mm.group_by("star1")
+        .len()
+        .sort(by="len", descending=True)
+        .head(n)
+        .select(
+            pl.col("star1").alias("actor"),
+            pl.col("len").alias("leading_roles"),
+        )
+    )
+
+
+def most_roles(mm: FrameT, n: int = 10) -> FrameT:
+    """Find the actors with the most roles (`star1` to `star4`).
+
+    Parameters
+    ----------
+    mm : FrameT
+        Cleaned catalog, eager or lazy.
+    n : int, optional
+        Number of actors, by default 10.
+
+    Returns
+    -------
+    FrameT
+        Columns `actor` and `roles`.
+    """
+    return (
+        mm.select(star_cols)
+        .unpivot()
+        .group_by("value")
+        .len()
+        .sort(by="len", descending=True)
+        .head(n)
+        .select(
+            pl.col("value").alias("actor"),
+            pl.col("len").alias("roles"),
+        )
+    )
+
+
+def director_pairings(mm: FrameT, director: str, n: int = 3) -> FrameT:
+    """Find the actors a director has worked with the most.
+
+    Parameters
+    ----------
+    mm : FrameT
+        Cleaned catalog, eager or lazy.
+    director : str
+        Name of the director, e.g. `"Steven Spielberg"`.
+    n : int, optional
+        Number of actors, by default 3.
+
+    Returns
+    -------
+    FrameT
+        Columns `actor` and `movie_count`.
+    """
+    return (
+        mm.filter(pl.col("director") == director)
+        .select(star_cols)
+        .unpivot()
+        .group_by("value")
+        .len()
+        .sort(by="len", descending=True)
+        .head(n)
+        .select(
+            pl.col("value").alias("actor"),
+            pl.col("len").alias("movie_count"),
+        )
+    )
+
+
+def best_per_year(mm: FrameT, start: int = 2006, end: int = 2016) -> FrameT:
+    """Find the highest rated movies of each year from `start` to `end`.
+
+    Parameters
+    ----------
+    mm : FrameT
+        Cleaned catalog, eager or lazy.
+    start : int, optional
+        First year, by default 2006.
+    end : int, optional
+        Last year (inclusive), by default 2016.
+
+    Returns
+    -------
+    FrameT
+        Columns `released_year`, `highest_rated_movies` and `imdb_rating`.
+    """
+    return (
+        mm.filter(pl.col("released_year").is_between(start, end))
+        .group_by("released_year")
+        .agg(
+            pl.col("series_title")
+            .filter(pl.col("imdb_rating") == pl.col("imdb_rating").max())
+            .alias("highest_rated_movies"),
+            pl.max("imdb_rating"),
+        )
+        .sort(by="released_year")
+    )
+
+
+def genre_averages(mm: FrameT) -> FrameT:
+    """Compute the average imdb rating and the number of movies per genre.
+
+    Parameters
+    ----------
+    mm : FrameT
+        Cleaned catalog, eager or lazy.
+
+    Returns
+    -------
+    FrameT
+        Columns `genre`, `avg_imdb_rating` and `movie_count`.
+    """
+    return (
+        mm.select(pl.col("genre"), pl.col("imdb_rating"))
+        .explode("genre")
+        .group_by("genre")
+        .agg(
+            pl.col("imdb_rating").mean().round(2).alias("avg_imdb_rating"),
+            pl.len().alias("movie_count"),
+        )
+        .sort(by="movie_count", descending=True)
+    )
@@ -0,0 +1,198 @@
+"""Extract and transform the movie metadata catalogs.
+
+The functions mirror the Extract and Transform steps of the `movie_metadata` marimo
+notebook so that the cleaned catalog `mm` can be built outside of the notebook.
+"""
+
+from pathlib import Path
+from typing import TypeVar
+
+import polars as pl
+
+# Frame type preserved by the transformations (eager in, eager out; lazy in, lazy out).
+FrameT = TypeVar("FrameT", pl.DataFrame, pl.LazyFrame)
+
+# Paths to the bundled datasets.
+data_dir = Path(__file__).parent.parent / "notebooks"
+imdb_top_1000_path = data_dir / "imdb_top_1000.csv"
+movie_metadata_path = data_dir / "movie_metadata.csv"
+
+# Column order of the cleaned catalog.
+col_order = [
+    "released_year",
+    "series_title",
+    "director",
+    "genre",
+    "star1",
+    "star2",
+    "star3",
+    "star4",
+    "runtime",
+    "gross",
+    "meta_score",
+    "imdb_rating",
+    "no_of_votes",
+]
+
+
+def extract(source: Path | str = imdb_top_1000_path) -> pl.DataFrame:
+    """Read the IMDB top 1000 CSV and select the columns used in the analysis.
+
+    `Released_Year` is read as a string because at least one value cannot be inferred
+    as an integer (see `transform`).
+
+    Parameters
+    ----------
+    source : Path | str, optional
+        Path to the CSV file, by default the bundled `imdb_top_1000.csv`.
+
+    Returns
+    -------
+    pl.DataFrame
+        `mm_transformed`, the raw columns with lowercase names in `col_order`.
+    """
+    mm_raw = pl.read_csv(source=source, schema_overrides={"Released_Year": pl.String})
+    return (
+        mm_raw
+        .drop(["Poster_Link", "Overview", "Certificate"])
+        .rename(lambda col_name: col_name.lower())
+        .select(col_order)
+    )  # fmt: skip
+
+
+def transform(mm_transformed: FrameT) -> FrameT:
+    """Apply the column transformations to `mm_transformed`.
+
+    Parameters
+    ----------
+    mm_transformed : FrameT
+        Eager or lazy frame returned by `extract`.
+
+    Returns
+    -------
+    FrameT
+        `mm`, the cleaned catalog ready for analysis.
+    """
+    return (
+        mm_transformed
+        .with_columns(
+            pl.when(pl.col("released_year") == "PG")
+              .then(pl.lit("1995"))
+              .otherwise(pl.col("released_year"))
+              .cast(pl.UInt16)
+              .alias("released_year"),
+            pl.col("genre").str.split(", "),
+            pl.col("runtime").str.strip_chars_end(characters=" min").cast(pl.UInt16),
+            pl.col("gross").str.replace_all(pattern=",", value="", literal=True).cast(pl.UInt64),
+            pl.col("meta_score").cast(pl.UInt8),
+            pl.col("no_of_votes").cast(pl.UInt32),
+        )
+    )  # fmt: skip
+
+
+def load_catalog(source: Path | str = imdb_top_1000_path) -> pl.DataFrame:
+    """Extract and transform the IMDB top 1000 CSV into the cleaned catalog `mm`.
+
+    Parameters
+    ----------
+    source : Path | str, optional
+        Path to the CSV file, by default the bundled `imdb_top_1000.csv`.
+
+    Returns
+    -------
+    pl.DataFrame
+        The cleaned catalog `mm`.
+    """
+    return transform(extract(source))
+
+
+def scan_extract(source: Path | str = imdb_top_1000_path) -> pl.LazyFrame:
+    """Lazy counterpart of `extract`, only the columns used are parsed.
+
+    Parameters
+    ----------
+    source : Path | str, optional
+        Path to the CSV file, by default the bundled `imdb_top_1000.csv`.
+
+    Returns
+    -------
+    pl.LazyFrame
+        `mm_transformed`, the raw columns with lowercase names in `col_order`.
+    """
+    return (
+        pl.scan_csv(source=source, schema_overrides={"Released_Year": pl.String})
+        .rename(lambda col_name: col_name.lower())
+        .select(col_order)
+    )
+
+
+def scan_catalog(source: Path | str = imdb_top_1000_path) -> pl.LazyFrame:
+    """Lazy counterpart of `load_catalog`.
+
+    Collecting the result, e.g. with the streaming engine, gives the same frame as
+    `load_catalog` (see `tests/test_equivalence.py`).
+
+    Parameters
+    ----------
+    source : Path | str, optional
+        Path to the CSV file, by default the bundled `imdb_top_1000.csv`.
+
+    Returns
+    -------
+    pl.LazyFrame
+        The cleaned catalog `mm`, lazily.
+    """
+    return transform(scan_extract(source))
+
+
+def load_movie_metadata(
+    source: Path | str = movie_metadata_path, columns: list[str] | None = None
+) -> pl.DataFrame:
+    """Read the `movie_metadata.csv` catalog.
+
+    Parameters
+    ----------
+    source : Path | str, optional
+        Path to the CSV file, by default the bundled `movie_metadata.csv`.
+    columns : list[str] | None, optional
+        Columns to read, by default None (all columns).
+
+    Returns
+    -------
+    pl.DataFrame
+        The raw `movie_metadata.csv` catalog.
+    """
+    return pl.read_csv(source=source, columns=columns)
+
+
+def load_titles(
+    imdb_source: Path | str = imdb_top_1000_path,
+    metadata_source: Path | str = movie_metadata_path,
+) -> pl.DataFrame:
+    """Collect the titles of both catalogs into one frame.
+
+    Parameters
+    ----------
+    imdb_source : Path | str, optional
+        Path to the IMDB top 1000 CSV, by default the bundled file.
+    metadata_source : Path | str, optional
+        Path to the movie metadata CSV, by default the bundled file.
+
+    Returns
+    -------
+    pl.DataFrame
+        Columns `title`, `released_year` and `source` (the name of the catalog).
+    """
+    imdb_titles = load_catalog(imdb_source).select(
+        pl.col("series_title").alias("title"),
+        pl.col("released_year"),
+        pl.lit("imdb_top_1000").alias("source"),
+    )
+    metadata_titles = load_movie_metadata(
+        metadata_source, columns=["movie_title", "title_year"]
+    ).select(
+        pl.col("movie_title").alias("title"),
+        pl.col("title_year").cast(pl.UInt16).alias("released_year"),
+        pl.lit("movie_metadata").alias("source"),
+    )
+    return pl.concat([imdb_titles, metadata_titles])
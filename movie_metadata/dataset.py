@@ -0,0 +1,173 @@
+"""Cleaned catalog stored as a Hive-partitioned Parquet dataset.
+
+Most queries of the analysis filter on time, e.g. `released_year.is_between(2006,
+2016)` or a decade facet, yet reading the CSV parses every row. `write_dataset` stores
+the cleaned catalog `mm` once as Parquet files partitioned by decade and year:
+
+    <root>/decade=2000/released_year=2006/00000000.parquet
+
+with min/max statistics for every row group. `scan_dataset` reads it back lazily with
+`pl.scan_parquet`, which prunes the partitions whose `decade` and `released_year` do
+not match the filters and skips the row groups whose statistics rule them out, so a
+year-range query only reads the files of the years in the range.
+
+The partition columns are also stored in the files, so they keep their types when the
+dataset is read back.
+
+Run `python -m movie_metadata.dataset write` to write the bundled catalog and
+`python -m movie_metadata.dataset query 2006 2016` to query it.
+"""
+
+import shutil
+import tempfile
+from pathlib import Path
+
+import click
+import polars as pl
+
+from movie_metadata.catalog import load_catalog
+
+# Directory the dataset is written to by default.
+default_root = Path(tempfile.gettempdir()) / "movie_metadata_dataset"
+
+
+def decade(year: pl.Expr) -> pl.Expr:
+    """Return the decade of `year`, e.g. 1990 for 1994."""
+    return (year // 10 * 10).alias("decade")
+
+
+def write_dataset(
+    frame: pl.DataFrame,
+    root: Path | str = default_root,
+    *,
+    year: str = "released_year",
+    row_group_size: int | None = None,
+) -> Path:
+    """Write `frame` as a Parquet dataset partitioned by decade and year.
+
+    The dataset is written to a staging directory next to `root` which then replaces
+    `root`, so a dataset is never seen half written.
+
+    Parameters
+    ----------
+    frame : pl.DataFrame
+        Frame with a release year column, e.g. the cleaned catalog `mm`.
+    root : Path | str, optional
+        Directory of the dataset, by default `default_root`.
+    year : str, optional
+        Name of the release year column, by default "released_year".
+    row_group_size : int | None, optional
+        Maximum number of rows of a row group, by default None (Polars default).
+
+    Returns
+    -------
+    Path
+        The directory of the dataset.
+    """
+    root = Path(root)
+    root.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=f".{root.name}-", dir=root.parent))
+    frame.with_columns(decade(pl.col(year))).sort(year).write_parquet(
+        staging,
+        partition_by=["decade", year],
+        statistics=True,
+        row_group_size=row_group_size,
+    )
+
+    if root.exists():
+        previous = root.with_name(f".{root.name}-previous")
+        shutil.rmtree(previous, ignore_errors=True)
+        root.rename(previous)
+        staging.rename(root)
+        shutil.rmtree(previous)
+    else:
+        staging.rename(root)
+    return root
+
+
+def scan_dataset(root: Path | str = default_root) -> pl.LazyFrame:
+    """Scan a dataset written by `write_dataset`.
+
+    Parameters
+    ----------
+    root : Path | str, optional
+        Directory of the dataset, by default `default_root`.
+
+    Returns
+    -------
+    pl.LazyFrame
+        The columns of the written frame followed by `decade`. Filters on the
+        partition columns only read the matching partitions.
+    """
+    return pl.scan_parquet(Path(root), hive_partitioning=True)
+
+
+def scan_years(
+    start: int,
+    end: int,
+    root: Path | str = default_root,
+    *,
+    year: str = "released_year",
+) -> pl.LazyFrame:
+    """Scan the movies released between `start` and `end` (both included).
+
+    Parameters
+    ----------
+    start : int
+        First release year.
+    end : int
+        Last release year.
+    root : Path | str, optional
+        Directory of the dataset, by default `default_root`.
+    year : str, optional
+        Name of the release year column, by default "released_year".
+
+    Returns
+    -------
+    pl.LazyFrame
+        The movies of the years in the range, read from their partitions only.
+    """
+    # The decade filter is implied by the year filter, it prunes whole decade
+    # directories without listing the years they hold.
+    return scan_dataset(root).filter(
+        pl.col("decade").is_between(start // 10 * 10, end // 10 * 10),
+        pl.col(year).is_between(start, end),
+    )
+
+
+@click.group()
+def main() -> None:
+    """Write and query the partitioned Parquet catalog."""
+
+
+@main.command("write")
+@click.option(
+    "--root",
+    type=click.Path(file_okay=False),
+    default=str(default_root),
+    show_default=True,
+)
+def write_command(root: str) -> None:
+    """Write the bundled catalog as a partitioned dataset."""
+    path = write_dataset(load_catalog(), root)
+    files = list(path.rglob("*.parquet"))
+    size = sum(file.stat().st_size for file in files)
+    click.echo(f"Wrote {len(files)} files ({size / 1e6:.2f} MB) to {path}")
+
+
+@main.command("query")
+@click.argument("start", type=int)
+@click.argument("end", type=int)
+@click.option(
+    "--root",
+    type=click.Path(file_okay=False, exists=True),
+    default=str(default_root),
+    show_default=True,
+)
+def query_command(start: int, end: int, root: str) -> None:
+    """Show the movies released between START and END."""
+    click.echo(scan_years(start, end, root).collect())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+"""Fuzzy duplicate detection across catalogs.
+
+Exact `is_duplicated()` checks miss near-duplicates of merged catalogs such as
+trailing spaces ("Avatar "), case and punctuation differences or release years off
+by one. Duplicates are found in three steps:
+
+1. Blocking. Titles are reduced to a match key (accents, punctuation and case
+   removed) and every record is put in one block per key token (stop words aside)
+   and decade. Decades are taken on two grids shifted by five years, so records one
+   year apart always share a decade. Only records sharing a block are compared:
+   all pairs in small blocks, and the neighbors within `window` rows in the
+   match key order in blocks larger than `max_block_size`. The number of
+   comparisons grows linearly with the number of records instead of quadratically.
+2. Matching. Candidate pairs are kept if their release years are close, their titles
+   hold the same numbers (sequels are not duplicates) and the Dice coefficient of the
+   trigrams of their match keys, computed for all pairs at once with Polars list
+   operations, reaches the threshold. Cheap comparisons are made first, trigrams
+   are intersected for the remaining pairs only.
+3. Clustering. Duplicate clusters are the connected components of the kept pairs.
+
+Run it with `python -m movie_metadata.dedupe` to list the duplicate clusters of the
+titles of both bundled catalogs.
+"""
+
+import click
+import numpy as np
+import polars as pl
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+from movie_metadata.catalog import load_titles
+from movie_metadata.title_index import normalize_title, title_trigrams
+
+# Tokens too common to form a block on their own.
+stop_tokens = ["the", "a", "an", "of", "and", "in", "on", "to", "for", "la", "le"]
+
+# Numbers and roman numerals, which tell sequels apart ("Saw II", "Saw 3").
+number_pattern = r"\b(?:\d+|ii|iii|iv|v|vi|vii|viii|ix|x)\b"
+
+
+def match_key(expr: pl.Expr) -> pl.Expr:
+    """Reduce titles to the key they are matched on.
+
+    Parameters
+    ----------
+    expr : pl.Expr
+        String expression of titles.
+
+    Returns
+    -------
+    pl.Expr
+        Normalized titles (see `normalize_title`) without accents and with
+        punctuation replaced by spaces.
+    """
+    return normalize_title(
+        expr.str.normalize("NFKD")
+        .str.replace_all(r"\p{M}", "")
+        .str.replace_all(r"[^\w\s]", " ")
+    )
+
+
+def candidate_pairs(
+    records: pl.DataFrame, *, max_block_size: int = 50, window: int = 8
+) -> pl.DataFrame:
+    """Find the pairs of records sharing a block.
+
+    Parameters
+    ----------
+    records : pl.DataFrame
+        Columns `row` (record id), `key` (match key) and `year` (release year,
+        nullable).
+    max_block_size : int, optional
+        Largest block whose pairs are all compared, by default 50.
+    window : int, optional
+        Number of following records in the match key order each record of a larger
+        block is compared with, by default 8.
+
+    Returns
+    -------
+    pl.DataFrame
+        Unique pairs with the columns `left` and `right` (`left < right`).
+    """
+    blocks = (
+        records.select(
+            "row",
+            # Match keys are compared through their rank in the key order.
+            pl.col("key").rank("dense").cast(pl.UInt32).alias("rank"),
+            pl.col("key")
+            .str.split(" ")
+            .list.eval(pl.element().filter(~pl.element().is_in(stop_tokens)))
+            .alias("token"),
+            pl.concat_list(
+                (pl.col("year") // 10 * 2).alias("decade"),
+                ((pl.col("year") + 5) // 10 * 2 + 1).alias("decade"),
+            ).alias("decade"),
+        )
+        # Keys made only of stop words are blocked on the whole key.
+        .with_columns(
+            pl.when(pl.col("token").list.len() > 0)
+            .then(pl.col("token"))
+            .otherwise(pl.concat_list(records["key"]))
+        )
+        .explode("token")
+        .explode("decade")
+        # Blocks are identified by a hash, a collision only merges two blocks.
+        .select("row", "rank", pl.struct("token", "decade").hash().alias("block"))
+        .unique(subset=["row", "block"])
+        .with_columns(pl.len().over("block").alias("block_size"))
+    )
+
+    small = blocks.filter(pl.col("block_size") <= max_block_size).select("row", "block")
+    all_pairs = (
+        small.join(small, on="block")
+        .filter(pl.col("row") < pl.col("row_right"))
+        .select(pl.col("row").alias("left"), pl.col("row_right").alias("right"))
+    )
+
+    large = blocks.filter(pl.col("block_size") > max_block_size).sort(
+        "block", "rank", "row"
+    )
+    neighbor_pairs = pl.concat(
+        [
+            large.select(
+                pl.col("row"),
+                pl.col("row").shift(-offset).alias("other"),
+                (pl.col("block") == pl.col("block").shift(-offset)).alias("same_block"),
+            )
+            .filter(pl.col("same_block"))
+            .select(
+                pl.min_horizontal("row", "other").alias("left"),
+                pl.max_horizontal("row", "other").alias("right"),
+            )
+            for offset in range(1, window + 1)
+        ]
+    )
+
+    # Pairs found in several blocks are dropped as single UInt64 values, `left` in
+    # the high and `right` in the low 32 bits, much faster than as rows.
+    return (
+        pl.concat([all_pairs, neighbor_pairs.cast(all_pairs.schema)])
+        .select(
+            (pl.col("left").cast(pl.UInt64) * (1 << 32) + pl.col("right"))
+            .unique()
+            .sort()
+            .alias("pair")
+        )
+        .select(
+            (pl.col("pair") // (1 << 32)).cast(pl.UInt32).alias("left"),
+            (pl.col("pair") % (1 << 32)).cast(pl.UInt32).alias("right"),
+        )
+    )
+
+
+def match_features(records: pl.DataFrame) -> pl.DataFrame:
+    """Compute the features pairs of records are compared on.
+
+    Parameters
+    ----------
+    records : pl.DataFrame
+        Columns `row`, `key` and `year`, with `row` equal to the row position.
+
+    Returns
+    -------
+    pl.DataFrame
+        Columns `gram` (trigram codes of the match key), `n_grams` (their number),
+        `number` (hash of the sorted numbers of the match key) and `year`, one row per
+        record.
+    """
+    codes, rows = title_trigrams(records["key"])
+    grams = pl.DataFrame({"row": rows, "gram": codes}).group_by("row").agg("gram")
+    # Titles without trigrams (empty keys) get an empty list.
+    return (
+        records.with_columns(pl.col("row").cast(pl.UInt32))
+        .join(grams, on="row", how="left", maintain_order="left")
+        .select(
+            pl.col("gram").fill_null([]),
+            pl.col("gram").list.len().fill_null(0).alias("n_grams"),
+            pl.col("key")
+            .str.extract_all(number_pattern)
+            .list.sort()
+            .hash()
+            .alias("number"),
+            "year",
+        )
+    )
+
+
+def match_pairs(
+    features: pl.DataFrame,
+    pairs: pl.DataFrame,
+    *,
+    threshold: float = 0.85,
+    max_year_diff: int = 1,
+) -> pl.DataFrame:
+    """Keep the candidate pairs whose records are duplicates.
+
+    The release years, numbers and trigram counts are compared first, and the trigram
+    lists of the remaining pairs only. The Dice coefficient of two sets of sizes `a`
+    and `b` is at most `2 min(a, b) / (a + b)`, so pairs of very different lengths are
+    dropped without intersecting their trigrams.
+
+    Parameters
+    ----------
+    features : pl.DataFrame
+        Features of the records (see `match_features`).
+    pairs : pl.DataFrame
+        Columns `left` and `right`.
+    threshold : float, optional
+        Smallest trigram Dice coefficient of duplicates, by default 0.85.
+    max_year_diff : int, optional
+        Largest release year difference of duplicates, by default 1. Records with a
+        null year match on the title alone.
+
+    Returns
+    -------
+    pl.DataFrame
+        Duplicate pairs with the columns `left`, `right`, `score` (Dice coefficient)
+        and `year_diff` (null if a year is null).
+    """
+    scalars = features.select("n_grams", "number", "year")
+    left = scalars[pairs["left"]]
+    right = scalars[pairs["right"]]
+    pairs = pairs.with_columns(
+        (left["year"] - right["year"]).abs().alias("year_diff")
+    ).filter(
+        pl.col("year_diff").is_null() | (pl.col("year_diff") <= max_year_diff),
+        left["number"] == right["number"],
+        2 * pl.min_horizontal(left["n_grams"], right["n_grams"])
+        >= threshold * (left["n_grams"] + right["n_grams"]),
+    )
+
+    left_grams = features["gram"].gather(pairs["left"])
+    right_grams = features["gram"].gather(pairs["right"])
+    return (
+        pairs.with_columns(
+            (
+                2
+                * left_grams.list.set_intersection(right_grams).list.len()
+                / (left_grams.list.len() + right_grams.list.len())
+            )
+            .fill_nan(0.0)
+            .alias("score")
+        )
+        .filter(pl.col("score") >= threshold)
+        .select("left", "right", "score", "year_diff")
+    )
+
+
+def find_duplicates(
+    frame: pl.DataFrame,
+    *,
+    title: str = "title",
+    year: str = "released_year",
+    threshold: float = 0.85,
+    max_year_diff: int = 1,
+    max_block_size: int = 50,
+    window: int = 8,
+    batch_size: int = 1_000_000,
+) -> tuple[pl.DataFrame, pl.DataFrame]:
+    """Find the clusters of near-duplicate records of `frame`.
+
+    Parameters
+    ----------
+    frame : pl.DataFrame
+        Records with a title and a release year column, e.g. `load_titles()`.
+    title : str, optional
+        Name of the title column, by default "title".
+    year : str, optional
+        Name of the release year column, by default "released_year".
+    threshold : float, optional
+        Smallest trigram Dice coefficient of duplicates, by default 0.85.
+    max_year_diff : int, optional
+        Largest release year difference of duplicates, by default 1. Records with a
+        null year match on the title alone.
+    max_block_size : int, optional
+        Largest block whose pairs are all compared, by default 50.
+    window : int, optional
+        Number of neighbors compared in larger blocks, by default 8.
+    batch_size : int, optional
+        Number of candidate pairs compared at once, by default 1_000_000.
+
+    Returns
+    -------
+    tuple[pl.DataFrame, pl.DataFrame]
+        The duplicate pairs (`left`, `right` row positions, `score`, `year_diff`)
+        and the records of `frame` belonging to a cluster of two or
+        more records, with their row position `row` and their `cluster` id, sorted by
+        cluster.
+    """
+    records = frame.select(
+        pl.int_range(pl.len(), dtype=pl.UInt32).alias("row"),
+        match_key(pl.col(title)).alias("key"),
+        pl.col(year).cast(pl.Int32).alias("year"),
+    )
+    candidates = candidate_pairs(records, max_block_size=max_block_size, window=window)
+    features = match_features(records)
+    # Pairs are compared in batches to bound the memory of their trigram lists.
+    batches = [
+        match_pairs(features, batch, threshold=threshold, max_year_diff=max_year_diff)
+        for batch in candidates.iter_slices(batch_size)
+    ]
+    # Without candidates there is no batch, the empty candidates give the empty
+    # typed frame of pairs.
+    pairs = (
+        pl.concat(batches)
+        if batches
+        else match_pairs(
+            features, candidates, threshold=threshold, max_year_diff=max_year_diff
+        )
+    )
+
+    graph = sparse.coo_matrix(
+        (
+            np.ones(pairs.height, dtype=np.int8),
+            (pairs["left"].to_numpy(), pairs["right"].to_numpy()),
+        ),
+        shape=(frame.height, frame.height),
+    )
+    _, labels = connected_components(graph, directed=False)
+    clusters = (
+        frame.with_columns(
+            pl.int_range(pl.len(), dtype=pl.UInt32).alias("row"),
+            pl.Series("cluster", labels, dtype=pl.UInt32),
+        )
+        .filter(pl.len().over("cluster") > 1)
+        .sort("cluster", "row")
+    )
+    return pairs.sort("left", "right"), clusters
+
+
+@click.command()
+@click.option("--threshold", default=0.85, show_default=True)
+@click.option("--max-year-diff", default=1, show_default=True)
+def main(threshold: float, max_year_diff: int) -> None:
+    """List the duplicate clusters of the titles of both bundled catalogs."""
+    titles = load_titles()
+    pairs, clusters = find_duplicates(
+        titles, threshold=threshold, max_year_diff=max_year_diff
+    )
+    click.echo(
+        f"{titles.height} records, {pairs.height} duplicate pairs, "
+        + f"{clusters['cluster'].n_unique()} clusters"
+    )
+    with pl.Config(tbl_rows=40, fmt_str_lengths=60):
+        click.echo(clusters)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,368 @@
+"""Bulk asynchronous poster fetcher with an on-disk content-addressed cache.
+
+The `Poster_Link` URLs of `imdb_top_1000.csv` (thumbnail renditions of the posters)
+are fetched concurrently through one pooled `httpx.AsyncClient`. The number of
+requests in flight is bounded overall and per host, and failed requests (connection
+errors, timeouts, 429 and 5xx responses) are retried with exponential backoff.
+
+Images are stored once per content under `objects/<sha256[:2]>/<sha256>` and every
+fetched URL is appended to `index.jsonl`, so an interrupted run resumes where it
+stopped and identical images are stored once.
+
+Run it with `python -m movie_metadata.posters`.
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import defaultdict
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import click
+import httpx
+import polars as pl
+
+from movie_metadata.catalog import imdb_top_1000_path
+
+# Status codes of responses that are retried.
+retry_statuses = {429, 500, 502, 503, 504}
+
+
+def poster_urls(source: Path | str = imdb_top_1000_path) -> pl.DataFrame:
+    """Read the poster URLs of the IMDB top 1000 CSV.
+
+    Parameters
+    ----------
+    source : Path | str, optional
+        Path to the CSV file, by default the bundled `imdb_top_1000.csv`.
+
+    Returns
+    -------
+    pl.DataFrame
+        Columns `series_title` and `poster_link`, without missing or repeated URLs.
+    """
+    return (
+        pl.read_csv(source, columns=["Series_Title", "Poster_Link"])
+        .rename(lambda col_name: col_name.lower())
+        .drop_nulls("poster_link")
+        .unique(subset="poster_link", keep="first", maintain_order=True)
+    )
+
+
+class PosterCache:
+    """Content-addressed on-disk cache of fetched images.
+
+    Parameters
+    ----------
+    root : Path | str
+        Directory of the cache. It is created if needed.
+    """
+
+    def __init__(self, root: Path | str) -> None:
+        """Open the cache under `root`, creating it if needed."""
+        self.root = Path(root)
+        self.root.joinpath("objects").mkdir(parents=True, exist_ok=True)
+        self.index_path = self.root / "index.jsonl"
+        self.index: dict[str, str] = {}
+        if self.index_path.exists():
+            with self.index_path.open("rb+") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        # A run killed mid-write leaves at most one partial last
+                        # line, it is cut so that the next entry starts a new line.
+                        f.truncate(f.tell() - len(line))
+                        break
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    self.index[entry["url"]] = entry["sha256"]
+
+    def object_path(self, digest: str) -> Path:
+        """Return the path of the object with the SHA-256 hex `digest`."""
+        return self.root / "objects" / digest[:2] / digest
+
+    def __contains__(self, url: str) -> bool:
+        """Return whether the image of `url` is cached."""
+        digest = self.index.get(url)
+        return digest is not None and self.object_path(digest).exists()
+
+    def get(self, url: str) -> bytes | None:
+        """Return the cached image of `url`, None if it is not cached."""
+        if url not in self:
+            return None
+        return self.object_path(self.index[url]).read_bytes()
+
+    def put(self, url: str, content: bytes) -> str:
+        """Store the image of `url`.
+
+        The object is written to a temporary file and renamed so that readers never
+        see a partial object, then the URL is appended to the index.
+
+        Parameters
+        ----------
+        url : str
+            URL the image was fetched from.
+        content : bytes
+            Image bytes.
+
+        Returns
+        -------
+        str
+            SHA-256 hex digest of `content`.
+        """
+        digest = hashlib.sha256(content).hexdigest()
+        path = self.object_path(digest)
+        if not path.exists():
+            path.parent.mkdir(exist_ok=True)
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_bytes(content)
+            tmp_path.replace(path)
+        with self.index_path.open("a") as f:
+            f.write(json.dumps({"url": url, "sha256": digest}) + "\n")
+        self.index[url] = digest
+        return digest
+
+
+@dataclass
+class FetchReport:
+    """Summary of a fetch run.
+
+    Attributes
+    ----------
+    fetched : int
+        Number of images downloaded.
+    cached : int
+        Number of URLs skipped because their image was already cached.
+    failed : dict[str, str]
+        Mapping from URL to the error of the URLs that could not be fetched.
+    retries : int
+        Number of retried requests.
+    bytes : int
+        Number of image bytes downloaded.
+    wall_time : float
+        Duration of the run in seconds.
+    """
+
+    fetched: int = 0
+    cached: int = 0
+    failed: dict[str, str] = field(default_factory=dict)
+    retries: int = 0
+    bytes: int = 0
+    wall_time: float = 0.0
+
+    @property
+    def images_per_second(self) -> float:
+        """Downloaded images per second of wall time."""
+        return self.fetched / self.wall_time if self.wall_time else 0.0
+
+    def summary(self) -> str:
+        """Return a one-line summary of the run."""
+        return (
+            f"fetched: {self.fetched}, cached: {self.cached}, "
+            + f"failed: {len(self.failed)}, retries: {self.retries}, "
+            + f"{self.bytes / 1e6:.1f} MB in {self.wall_time:.2f}s "
+            + f"({self.images_per_second:.1f} images/s)"
+        )
+
+
+async def fetch_one(
+    client: httpx.AsyncClient,
+    url: str,
+    *,
+    host_limit: asyncio.Semaphore,
+    retries: int,
+    backoff: float,
+    report: FetchReport,
+) -> bytes:
+    """Fetch one URL, retrying transient failures with exponential backoff.
+
+    Parameters
+    ----------
+    client : httpx.AsyncClient
+        Pooled client.
+    url : str
+        Image URL.
+    host_limit : asyncio.Semaphore
+        Limit of requests in flight to the host of `url`, held during a request but
+        not during the backoff delays.
+    retries : int
+        Number of retries after the first attempt.
+    backoff : float
+        Delay before the first retry in seconds, doubled for every retry.
+    report : FetchReport
+        Report whose retry count is updated.
+
+    Returns
+    -------
+    bytes
+        Response body.
+
+    Raises
+    ------
+    httpx.HTTPError
+        If the last attempt failed or the response status is not retried.
+    """
+    for attempt in range(retries + 1):
+        try:
+            async with host_limit:
+                response = await client.get(url)
+            if response.status_code not in retry_statuses:
+                response.raise_for_status()
+                return response.content
+            error: httpx.HTTPError = httpx.HTTPStatusError(
+                f"{response.status_code} for {url}",
+                request=response.request,
+                response=response,
+            )
+        except httpx.TransportError as err:
+            error = err
+        if attempt == retries:
+            raise error
+        report.retries += 1
+        await asyncio.sleep(backoff * 2**attempt)
+    raise AssertionError("unreachable")
+
+
+async def fetch_posters(
+    urls: list[str],
+    cache: PosterCache,
+    *,
+    concurrency: int = 32,
+    per_host: int = 8,
+    retries: int = 3,
+    backoff: float = 0.5,
+    timeout: float = 30.0,
+    progress: bool = False,
+) -> FetchReport:
+    """Fetch the images of `urls` that are not cached yet into `cache`.
+
+    URLs that cannot be fetched or stored are recorded in the `failed` mapping of the
+    report, the other URLs are still fetched.
+
+    Parameters
+    ----------
+    urls : list[str]
+        Image URLs.
+    cache : PosterCache
+        Cache the images are stored in.
+    concurrency : int, optional
+        Maximum number of requests in flight, by default 32.
+    per_host : int, optional
+        Maximum number of requests in flight to one host, by default 8.
+    retries : int, optional
+        Number of retries of a failed request, by default 3.
+    backoff : float, optional
+        Delay before the first retry in seconds, by default 0.5.
+    timeout : float, optional
+        Timeout of a request in seconds, by default 30.0.
+    progress : bool, optional
+        Show a progress bar, by default False.
+
+    Returns
+    -------
+    FetchReport
+        Summary of the run.
+    """
+    report = FetchReport()
+    start = time.perf_counter()
+    unique_urls = list(dict.fromkeys(urls))
+    pending = [url for url in unique_urls if url not in cache]
+    report.cached = len(unique_urls) - len(pending)
+
+    queue: asyncio.Queue[str] = asyncio.Queue()
+    for url in pending:
+        queue.put_nowait(url)
+    host_limits: defaultdict[str, asyncio.Semaphore] = defaultdict(
+        lambda: asyncio.Semaphore(per_host)
+    )
+
+    limits = httpx.Limits(
+        max_connections=concurrency, max_keepalive_connections=concurrency
+    )
+    bar_context = (
+        click.progressbar(length=len(pending), label="Fetching posters")
+        if progress
+        else nullcontext()
+    )
+
+    async with httpx.AsyncClient(
+        limits=limits, timeout=timeout, follow_redirects=True
+    ) as client:
+
+        async def worker() -> None:
+            """Fetch queued URLs until the queue is empty."""
+            while True:
+                try:
+                    url = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    content = await fetch_one(
+                        client,
+                        url,
+                        host_limit=host_limits[urlsplit(url).netloc],
+                        retries=retries,
+                        backoff=backoff,
+                        report=report,
+                    )
+                    cache.put(url, content)
+                # A malformed URL or a failed cache write only fails its own URL.
+                except (httpx.HTTPError, httpx.InvalidURL, OSError) as err:
+                    report.failed[url] = repr(err)
+                else:
+                    report.fetched += 1
+                    report.bytes += len(content)
+                if bar is not None:
+                    bar.update(1)
+
+        with bar_context as bar:
+            await asyncio.gather(
+                *(worker() for _ in range(min(concurrency, len(pending))))
+            )
+
+    report.wall_time = time.perf_counter() - start
+    return report
+
+
+@click.command()
+@click.option(
+    "--cache",
+    "cache_dir",
+    type=click.Path(file_okay=False),
+    default="posters",
+    show_default=True,
+    help="Directory of the poster cache.",
+)
+@click.option("--concurrency", default=32, show_default=True)
+@click.option("--per-host", default=8, show_default=True)
+@click.option("--retries", default=3, show_default=True)
+@click.option("--limit", type=int, help="Fetch only the first LIMIT posters.")
+def main(
+    cache_dir: str, concurrency: int, per_host: int, retries: int, limit: int | None
+) -> None:
+    """Fetch the posters of the IMDB top 1000 CSV into the poster cache."""
+    urls = poster_urls()["poster_link"]
+    if limit is not None:
+        urls = urls.head(limit)
+    report = asyncio.run(
+        fetch_posters(
+            urls.to_list(),
+            PosterCache(cache_dir),
+            concurrency=concurrency,
+            per_host=per_host,
+            retries=retries,
+            progress=True,
+        )
+    )
+    click.echo(report.summary())
+    for url, error in report.failed.items():
+        click.echo(f"failed: {url} {error}", err=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,427 @@
+"""Single pass, constant memory column profiler.
+
+`profile` replaces the dtype census, `null_count()`, strict cast checks and
+`describe()` passes of the notebook with one streaming pass over a CSV file or a
+LazyFrame. The input is collected in batches, and for every column the profiler keeps:
+
+- the number of values and of nulls,
+- the minimum and maximum (numeric for string columns whose values all cast to
+  Float64, e.g. the numbers of a CSV file read as strings),
+- a HyperLogLog sketch of the distinct values,
+- a t-digest of the values cast to Float64, for approximate quantiles,
+- the number of values failing a cast to each candidate type (or changed by the
+  round trip back to their type), with an example.
+
+The sketches have a fixed size, so memory does not grow with the number of rows.
+
+Run it with `python -m movie_metadata.profiler [CSV]`.
+"""
+
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import click
+import numpy as np
+import polars as pl
+from polars._typing import PolarsDataType
+
+from movie_metadata.catalog import imdb_top_1000_path
+
+# Types every column is checked against by default.
+default_candidates: tuple[PolarsDataType, ...] = (pl.Int64, pl.Float64)
+
+# Quantiles reported by default.
+default_quantiles = (0.01, 0.25, 0.5, 0.75, 0.99)
+
+
+class HyperLogLog:
+    """HyperLogLog sketch estimating the number of distinct 64-bit hashes.
+
+    Parameters
+    ----------
+    precision : int, optional
+        Number of index bits, the sketch has `2**precision` one byte registers and a
+        relative standard error of about `1.04 / sqrt(2**precision)`, by default 14.
+    """
+
+    def __init__(self, precision: int = 14) -> None:
+        """Create an empty sketch with `2**precision` registers."""
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, hashes: np.ndarray) -> None:
+        """Add 64-bit hashes to the sketch."""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        index = hashes >> np.uint64(64 - self.precision)
+        # Rank of the first set bit of the remaining bits, capped for all-zero bits.
+        rest = pl.Series(hashes << np.uint64(self.precision))
+        rank = np.minimum(rest.bitwise_leading_zeros().to_numpy(), 64 - self.precision)
+        np.maximum.at(self.registers, index, (rank + 1).astype(np.uint8))
+
+    def estimate(self) -> float:
+        """Return the estimated number of distinct hashes."""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m**2 / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        zeros = np.count_nonzero(self.registers == 0)
+        # Linear counting is more accurate for small cardinalities.
+        if estimate <= 2.5 * m and zeros:
+            return float(m * np.log(m / zeros))
+        return float(estimate)
+
+
+class TDigest:
+    """Merging t-digest of a stream of values, for approximate quantiles.
+
+    Values are buffered with the centroids and merged with the arcsine scale
+    function, so centroids are small near the tails and the extreme quantiles stay
+    accurate.
+
+    Parameters
+    ----------
+    compression : float, optional
+        Bound on the number of centroids (about `compression / 2`), by default 200.
+    """
+
+    def __init__(self, compression: float = 200) -> None:
+        """Create an empty digest."""
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values: np.ndarray) -> None:
+        """Add values to the digest, NaN values are ignored."""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+
+        means = np.concatenate([self.means, values])
+        weights = np.concatenate([self.weights, np.ones(len(values))])
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+
+        # Merge neighbors whose cumulative midpoints fall in the same unit of the
+        # scale function k(q) = compression / (2 pi) * asin(2q - 1).
+        cumulative = np.cumsum(weights)
+        midpoints = (cumulative - weights / 2) / cumulative[-1]
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * midpoints - 1)
+        buckets = np.floor(k - k[0]).astype(np.int64)
+        starts = np.flatnonzero(np.diff(buckets, prepend=-1))
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def quantile(self, q: Sequence[float]) -> np.ndarray:
+        """Return the approximate quantiles `q` (NaN if the digest is empty)."""
+        if not len(self.means):
+            return np.full(len(q), np.nan)
+        cumulative = np.cumsum(self.weights)
+        midpoints = cumulative - self.weights / 2
+        return np.interp(
+            np.asarray(q) * cumulative[-1],
+            np.concatenate([[0], midpoints, [cumulative[-1]]]),
+            np.concatenate([[self.min], self.means, [self.max]]),
+        )
+
+
+@dataclass
+class ColumnProfile:
+    """Running statistics of one column.
+
+    Attributes
+    ----------
+    name : str
+        Name of the column.
+    dtype : pl.DataType
+        Type of the column.
+    distinct : HyperLogLog
+        Sketch of the distinct values.
+    digest : TDigest
+        Digest of the values cast to Float64.
+    cast_failures : dict[PolarsDataType, int]
+        Number of values failing a cast to each candidate type.
+    cast_examples : dict[PolarsDataType, str | None]
+        First value failing a cast to each candidate type.
+    count : int
+        Number of non-null values.
+    null_count : int
+        Number of null values.
+    min : Any
+        Minimum value, None until a value is seen.
+    max : Any
+        Maximum value, None until a value is seen.
+    """
+
+    name: str
+    dtype: pl.DataType
+    distinct: HyperLogLog
+    digest: TDigest
+    cast_failures: dict[PolarsDataType, int]
+    cast_examples: dict[PolarsDataType, str | None]
+    count: int = 0
+    null_count: int = 0
+    min: Any = None
+    max: Any = None
+
+
+def aggregations(
+    name: str, dtype: pl.DataType, candidates: Sequence[PolarsDataType]
+) -> dict[str, pl.Expr]:
+    """Return the batch aggregations of the column `name`.
+
+    A value fails the cast to a candidate type if the cast gives a null or, for
+    columns other than strings and categoricals, if casting the result back changes
+    the value (e.g. 8.5 truncated to the Int64 8). Strings and categories are parsed,
+    so "10" casts to Float64 although the Float64 10.0 is written "10.0".
+
+    Parameters
+    ----------
+    name : str
+        Name of the column.
+    dtype : pl.DataType
+        Type of the column.
+    candidates : Sequence[PolarsDataType]
+        Types the cast-ability is checked against (not checked for nested types).
+
+    Returns
+    -------
+    dict[str, pl.Expr]
+        Mapping from statistic (`count`, `null_count`, `min`, `max`, and the
+        candidate types for the failure counts and `<type> example` for the examples)
+        to the expression computing it on a batch.
+    """
+    col = pl.col(name)
+    exprs = {"count": col.count(), "null_count": col.null_count()}
+    if dtype.is_nested():
+        return exprs
+    exprs |= {"min": col.min(), "max": col.max()}
+    # Strings and categories are parsed, other types are cast and cast back.
+    parsed = dtype == pl.String or isinstance(dtype, (pl.Categorical, pl.Enum))
+    for candidate in candidates:
+        if parsed:
+            failed = (
+                col.is_not_null()
+                & col.cast(pl.String).cast(candidate, strict=False).is_null()
+            )
+        else:
+            round_trip = col.cast(candidate, strict=False).cast(dtype, strict=False)
+            # A null comparison (the cast failed) counts as a failure.
+            failed = col.is_not_null() & (round_trip != col).fill_null(True)
+        exprs[str(candidate)] = failed.sum()
+        exprs[f"{candidate} example"] = col.filter(failed).first().cast(pl.String)
+    return exprs
+
+
+class Profiler:
+    """Accumulator of the column statistics of a stream of batches.
+
+    Parameters
+    ----------
+    schema : pl.Schema
+        Schema of the batches.
+    candidates : Sequence[PolarsDataType], optional
+        Types the cast-ability is checked against, by default `default_candidates`.
+    precision : int, optional
+        Precision of the HyperLogLog sketches, by default 14.
+    compression : float, optional
+        Compression of the t-digests, by default 200.
+    """
+
+    def __init__(
+        self,
+        schema: pl.Schema,
+        candidates: Sequence[PolarsDataType] = default_candidates,
+        precision: int = 14,
+        compression: float = 200,
+    ) -> None:
+        """Create empty column statistics for `schema`."""
+        # Float64 cast failures decide whether quantiles are reported.
+        self.candidates: list[PolarsDataType] = list(
+            dict.fromkeys([*candidates, pl.Float64])
+        )
+        self.columns = {
+            name: ColumnProfile(
+                name,
+                dtype,
+                distinct=HyperLogLog(precision),
+                digest=TDigest(compression),
+                cast_failures=dict.fromkeys(self.candidates, 0),
+                cast_examples=dict.fromkeys(self.candidates),
+            )
+            for name, dtype in schema.items()
+        }
+        # One row of statistics per batch, aliased by position.
+        self.keys: list[tuple[str, str]] = []
+        self.exprs: list[pl.Expr] = []
+        for name, dtype in schema.items():
+            for statistic, expr in aggregations(name, dtype, self.candidates).items():
+                self.exprs.append(expr.alias(str(len(self.keys))))
+                self.keys.append((name, statistic))
+        self.rows = 0
+
+    def update(self, batch: pl.DataFrame) -> None:
+        """Add the rows of `batch` to the statistics."""
+        self.rows += batch.height
+        stats: dict[str, dict[str, Any]] = {name: {} for name in self.columns}
+        for (name, statistic), value in zip(self.keys, batch.select(self.exprs).row(0)):
+            stats[name][statistic] = value
+
+        for name, column in self.columns.items():
+            column.count += stats[name]["count"]
+            column.null_count += stats[name]["null_count"]
+            if stats[name].get("min") is not None:
+                column.min = (
+                    stats[name]["min"]
+                    if column.min is None
+                    else min(column.min, stats[name]["min"])
+                )
+                column.max = (
+                    stats[name]["max"]
+                    if column.max is None
+                    else max(column.max, stats[name]["max"])
+                )
+            for candidate in self.candidates:
+                column.cast_failures[candidate] += stats[name].get(str(candidate), 0)
+                if column.cast_examples[candidate] is None:
+                    column.cast_examples[candidate] = stats[name].get(
+                        f"{candidate} example"
+                    )
+
+            values = batch[name].drop_nulls()
+            column.distinct.update(values.hash(seed=0).to_numpy())
+            if column.dtype.is_numeric() or column.dtype == pl.String:
+                column.digest.update(values.cast(pl.Float64, strict=False).to_numpy())
+
+    def result(self, quantiles: Sequence[float] = default_quantiles) -> pl.DataFrame:
+        """Return the profile of every column.
+
+        Parameters
+        ----------
+        quantiles : Sequence[float], optional
+            Quantiles reported, by default `default_quantiles`.
+
+        Returns
+        -------
+        pl.DataFrame
+            One row per column with the columns `column`, `dtype`, `count`,
+            `null_count`, `distinct_approx`, `min`, `max` (as strings, compared as
+            numbers for string columns whose values all cast to Float64), a
+            `p<quantile>` column per quantile (null unless every value casts to
+            Float64), and `<type>_failures` and `<type>_example` columns per
+            candidate type.
+        """
+        rows = []
+        for column in self.columns.values():
+            castable = column.cast_failures[pl.Float64] == 0 and column.count > 0
+            if castable and column.dtype == pl.String:
+                # Numbers read as strings, compare them as numbers ("99" < "100").
+                low, high = column.digest.min, column.digest.max
+                low, high = (int(v) if v.is_integer() else v for v in (low, high))
+            else:
+                low, high = column.min, column.max
+            row = {
+                "column": column.name,
+                "dtype": str(column.dtype),
+                "count": column.count,
+                "null_count": column.null_count,
+                # The sketch can overestimate, there are at most `count` values.
+                "distinct_approx": min(round(column.distinct.estimate()), column.count),
+                "min": None if low is None else str(low),
+                "max": None if high is None else str(high),
+            }
+            values = column.digest.quantile(quantiles)
+            for q, value in zip(quantiles, values):
+                row[f"p{q * 100:g}"] = float(value) if castable else None
+            for candidate in self.candidates:
+                type_name = str(candidate).lower()
+                row[f"{type_name}_failures"] = column.cast_failures[candidate]
+                row[f"{type_name}_example"] = column.cast_examples[candidate]
+            rows.append(row)
+        return pl.DataFrame(rows, infer_schema_length=None)
+
+
+def batches(
+    source: pl.LazyFrame | pl.DataFrame | Path | str, chunk_size: int
+) -> tuple[pl.Schema, Iterable[pl.DataFrame]]:
+    """Return the schema and the batches of `source`.
+
+    Parameters
+    ----------
+    source : pl.LazyFrame | pl.DataFrame | Path | str
+        Frame or CSV file. CSV columns are read as strings, so that the profile shows
+        which types they can be cast to.
+    chunk_size : int
+        Number of rows per batch.
+
+    Returns
+    -------
+    tuple[pl.Schema, Iterable[pl.DataFrame]]
+        Schema and lazily computed batches.
+    """
+    if isinstance(source, (Path, str)):
+        lf = pl.scan_csv(source, infer_schema=False)
+    else:
+        lf = source.lazy()
+    return lf.collect_schema(), lf.collect_batches(chunk_size=chunk_size)
+
+
+def profile(
+    source: pl.LazyFrame | pl.DataFrame | Path | str = imdb_top_1000_path,
+    *,
+    candidates: Sequence[PolarsDataType] = default_candidates,
+    quantiles: Sequence[float] = default_quantiles,
+    chunk_size: int = 100_000,
+    precision: int = 14,
+    compression: float = 200,
+) -> pl.DataFrame:
+    """Profile every column of `source` in one streaming pass.
+
+    Parameters
+    ----------
+    source : pl.LazyFrame | pl.DataFrame | Path | str, optional
+        Frame or CSV file (columns read as strings), by default the bundled
+        `imdb_top_1000.csv`.
+    candidates : Sequence[PolarsDataType], optional
+        Types the cast-ability is checked against, by default `default_candidates`.
+    quantiles : Sequence[float], optional
+        Quantiles reported, by default `default_quantiles`.
+    chunk_size : int, optional
+        Number of rows per batch, by default 100_000.
+    precision : int, optional
+        Precision of the HyperLogLog sketches, by default 14.
+    compression : float, optional
+        Compression of the t-digests, by default 200.
+
+    Returns
+    -------
+    pl.DataFrame
+        One row per column, see `Profiler.result`.
+    """
+    schema, stream = batches(source, chunk_size)
+    profiler = Profiler(schema, candidates, precision, compression)
+    for batch in stream:
+        profiler.update(batch)
+    return profiler.result(quantiles)
+
+
+@click.command()
+@click.argument(
+    "source",
+    type=click.Path(exists=True, dir_okay=False),
+    default=str(imdb_top_1000_path),
+)
+@click.option("--chunk-size", default=100_000, show_default=True)
+def main(source: str, chunk_size: int) -> None:
+    """Profile the columns of a CSV file in one streaming pass."""
+    with pl.Config(tbl_rows=-1, tbl_cols=-1, tbl_width_chars=200):
+        click.echo(profile(source, chunk_size=chunk_size))
+
+
+if __name__ == "__main__":
+    main()
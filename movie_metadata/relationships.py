@@ -0,0 +1,428 @@
+"""Correlations, binned means and per-decade regressions of the catalog measures.
+
+The "Relationship between" sections of the notebook are scatter plots and
+histograms. This module puts numbers on them:
+
+- `correlation_matrix` computes the Pearson or Spearman correlation of every pair of
+  numeric columns at once. Nulls are dropped pairwise: every pair uses the rows where
+  both values are present, computed with a handful of matrix products over the
+  value and presence matrices instead of one pass per pair. Spearman ranks depend on
+  the rows kept, so only the pairs involving a column with nulls are ranked again
+  one by one.
+- `binned_means` averages a measure over bins of another (e.g. `gross` over
+  `imdb_rating` bins), with standard errors, optionally per group.
+- `fit_regressions` fits `log10(gross)` (or any target) on one or more predictors
+  for every decade. The normal equations of all the decades are summed in one pass
+  over the rows and solved together as a stack of small matrices, which also gives
+  the coefficient standard errors and R² without a second pass. `fitted_lines`
+  evaluates the fits to draw them on the charts.
+
+`summarize` runs them all and, given a cache directory, stores the results as
+Parquet files under a fingerprint of the data and parameters, so re-running a
+notebook reuses them until the catalog changes.
+
+Run it with `python -m movie_metadata.relationships`.
+"""
+
+import hashlib
+import json
+import shutil
+import tempfile
+from collections.abc import Sequence
+from itertools import combinations
+from pathlib import Path
+
+import click
+import numpy as np
+import polars as pl
+import polars.selectors as cs
+
+from movie_metadata.catalog import load_catalog
+from movie_metadata.dataset import decade
+
+# Version of the computations, part of the cache key so that a change of the results
+# (e.g. the pairwise Spearman ranks of version 2) is not hidden by older entries.
+cache_version = 2
+
+
+def pairwise_pearson(values: np.ndarray) -> np.ndarray:
+    """Compute the Pearson correlation of every pair of columns of `values`.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        Two-dimensional array with NaN for the missing values.
+
+    Returns
+    -------
+    np.ndarray
+        Square matrix of the correlations, each pair using the rows where both
+        values are present. Pairs without variance are NaN.
+    """
+    present = ~np.isnan(values)
+    # Centering keeps the sums of squares small.
+    values = np.where(present, values - np.nanmean(values, axis=0), 0.0)
+    weights = present.astype(np.float64)
+
+    # Entry [i, j] of every matrix is taken over the rows where columns i and j are
+    # both present, e.g. sums[i, j] is the sum of column i over those rows.
+    counts = weights.T @ weights
+    sums = values.T @ weights
+    squares = (values**2).T @ weights
+    products = values.T @ values
+    with np.errstate(divide="ignore", invalid="ignore"):
+        covariances = products - sums * sums.T / counts
+        variances = squares - sums**2 / counts
+        return covariances / np.sqrt(variances * variances.T)
+
+
+def correlation_matrix(frame: pl.DataFrame, method: str = "pearson") -> pl.DataFrame:
+    """Compute the correlation of every pair of numeric columns.
+
+    Parameters
+    ----------
+    frame : pl.DataFrame
+        Frame whose numeric columns (`cs.numeric()`) are correlated.
+    method : str, optional
+        "pearson" or "spearman" (Pearson correlation of the ranks, each pair being
+        ranked over the rows where both values are present), by default "pearson".
+
+    Returns
+    -------
+    pl.DataFrame
+        Square matrix with a first `column` column naming the rows. Each pair uses
+        the rows where both values are present; pairs without variance are NaN.
+
+    Raises
+    ------
+    ValueError
+        If `method` is not "pearson" or "spearman".
+    """
+    if method not in ("pearson", "spearman"):
+        raise ValueError(f"Unknown correlation method '{method}'.")
+    numeric = frame.select(cs.numeric())
+
+    def ranked(columns: pl.DataFrame) -> np.ndarray:
+        """Return the values of `columns`, ranked for Spearman, nulls as NaN."""
+        if method == "spearman":
+            columns = columns.select(pl.all().rank("average"))
+        return columns.cast(pl.Float64).to_numpy()
+
+    correlations = pairwise_pearson(ranked(numeric))
+    if method == "spearman":
+        # Columns without nulls keep their ranks in every pair, the pairs with a
+        # column with nulls are ranked over the rows where both values are present.
+        with_nulls = {name for name in numeric.columns if numeric[name].null_count()}
+        for (i, x), (j, y) in combinations(enumerate(numeric.columns), 2):
+            if x in with_nulls or y in with_nulls:
+                values = ranked(numeric.select(x, y).drop_nulls())
+                correlations[i, j] = correlations[j, i] = pairwise_pearson(values)[0, 1]
+    return pl.DataFrame(correlations, schema=numeric.columns).insert_column(
+        0, pl.Series("column", numeric.columns)
+    )
+
+
+def binned_means(
+    frame: pl.DataFrame,
+    x: str,
+    y: str,
+    breaks: Sequence[float],
+    *,
+    by: str | Sequence[str] | None = None,
+) -> pl.DataFrame:
+    """Average `y` over the bins of `x` delimited by `breaks`.
+
+    Parameters
+    ----------
+    frame : pl.DataFrame
+        Frame with the columns `x`, `y` and `by`.
+    x : str
+        Name of the binned column.
+    y : str
+        Name of the averaged column.
+    breaks : Sequence[float]
+        Increasing bin edges, e.g. `np.linspace(7.5, 9.5, 5)`. Bins are left closed
+        (`[lower, upper)`), the first and last bins are open ended.
+    by : str | Sequence[str] | None, optional
+        Columns the bins are computed within, by default None.
+
+    Returns
+    -------
+    pl.DataFrame
+        Columns `by`, `bin` (label), `lower`, `upper`, `count`, `mean`, `std` and
+        `se` (standard error of the mean), one row per non-empty bin, sorted. Rows
+        with a null `x` or `y` are ignored.
+    """
+    by = [] if by is None else [by] if isinstance(by, str) else list(by)
+    edges = pl.Series([-np.inf, *breaks, np.inf], dtype=pl.Float64)
+    data = frame.select(*by, x, y).drop_nulls()
+    # Bin i holds the values in [edges[i], edges[i + 1]).
+    bins = pl.Series("bin", breaks, dtype=pl.Float64).search_sorted(
+        data[x].cast(pl.Float64), side="right"
+    )
+    return (
+        data.with_columns(bins)
+        .group_by(*by, "bin")
+        .agg(
+            pl.len().alias("count"),
+            pl.col(y).mean().alias("mean"),
+            pl.col(y).std().alias("std"),
+        )
+        .with_columns(
+            pl.lit(edges).gather(pl.col("bin")).alias("lower"),
+            pl.lit(edges).gather(pl.col("bin") + 1).alias("upper"),
+            (pl.col("std") / pl.col("count").sqrt()).alias("se"),
+        )
+        .sort(*by, "bin")
+        .select(
+            *by,
+            pl.format("[{}, {})", "lower", "upper").alias("bin"),
+            "lower",
+            "upper",
+            "count",
+            "mean",
+            "std",
+            "se",
+        )
+    )
+
+
+def fit_regressions(
+    frame: pl.DataFrame,
+    predictors: Sequence[str] = ("runtime",),
+    *,
+    target: str = "gross",
+    by: str | pl.Expr = decade(pl.col("released_year")),
+    log_target: bool = True,
+) -> pl.DataFrame:
+    """Fit a least-squares regression of `target` on `predictors` per group.
+
+    Parameters
+    ----------
+    frame : pl.DataFrame
+        Frame with the columns `target`, `predictors` and those of `by`.
+    predictors : Sequence[str], optional
+        Names of the predictor columns, by default ("runtime",).
+    target : str, optional
+        Name of the target column, by default "gross".
+    by : str | pl.Expr, optional
+        Group column or expression, by default the decade of `released_year`.
+    log_target : bool, optional
+        Whether `log10(target)` is fitted, as on the log scale charts, by default
+        True. Rows with a target that is not positive are then ignored.
+
+    Returns
+    -------
+    pl.DataFrame
+        One row per group with the columns `by`, `n` (rows), `intercept` and one
+        column per predictor (coefficients), each followed by its standard error
+        (`<name>_se`), `r2` and `rmse` (residual standard error), sorted by group.
+        Groups without a unique fit (e.g. fewer rows than coefficients) get null
+        coefficients. Rows with a null value are ignored.
+    """
+    by_expr = pl.col(by) if isinstance(by, str) else by
+    group = by_expr.meta.output_name()
+    data = (
+        frame.lazy()
+        .select(by_expr, pl.col(target).cast(pl.Float64), *predictors)
+        .drop_nulls()
+        .filter(pl.col(target) > 0 if log_target else pl.lit(True))
+        .sort(group, maintain_order=True)
+        .collect()
+    )
+    groups = data.group_by(group, maintain_order=True).len("n")
+    counts = groups["n"].to_numpy().astype(np.int64)
+    starts = np.cumsum(counts) - counts
+
+    y = data[target].to_numpy()
+    if log_target:
+        y = np.log10(y)
+    design = np.column_stack(
+        [np.ones(data.height), data.select(predictors).cast(pl.Float64).to_numpy()]
+    )
+    n_params = design.shape[1]
+
+    # Normal equations of every group, summed in one pass over the rows.
+    gram = np.add.reduceat(design[:, :, np.newaxis] * design[:, np.newaxis], starts)
+    moments = np.add.reduceat(design * y[:, np.newaxis], starts)
+    square_sums = np.add.reduceat(y**2, starts)
+
+    inverse = np.linalg.pinv(gram)
+    coefs = np.einsum("gij,gj->gi", inverse, moments)
+    coefs[np.linalg.matrix_rank(gram) < n_params] = np.nan
+    residuals = np.maximum(
+        square_sums
+        - 2 * np.einsum("gi,gi->g", coefs, moments)
+        + np.einsum("gi,gij,gj->g", coefs, gram, coefs),
+        0.0,
+    )
+    dof = counts - n_params
+    with np.errstate(divide="ignore", invalid="ignore"):
+        variance = np.where(dof > 0, residuals / dof, np.nan)
+        errors = np.sqrt(variance[:, np.newaxis] * np.diagonal(inverse, 0, 1, 2))
+        # moments[:, 0] is the sum of y.
+        r2 = 1 - residuals / (square_sums - moments[:, 0] ** 2 / counts)
+
+    columns = {}
+    for i, name in enumerate(["intercept", *predictors]):
+        columns[name] = coefs[:, i]
+        columns[f"{name}_se"] = errors[:, i]
+    return groups.with_columns(
+        **{name: pl.Series(values).fill_nan(None) for name, values in columns.items()},
+        r2=pl.Series(r2).fill_nan(None),
+        rmse=pl.Series(np.sqrt(variance)).fill_nan(None),
+    )
+
+
+def fitted_lines(
+    fits: pl.DataFrame,
+    frame: pl.DataFrame,
+    predictor: str = "runtime",
+    *,
+    by: str | pl.Expr = decade(pl.col("released_year")),
+    log_target: bool = True,
+    n_points: int = 2,
+) -> pl.DataFrame:
+    """Evaluate single-predictor fits over the range of the predictor of each group.
+
+    Parameters
+    ----------
+    fits : pl.DataFrame
+        Result of `fit_regressions` with `predictor` as the only predictor.
+    frame : pl.DataFrame
+        Frame the fits were computed on.
+    predictor : str, optional
+        Name of the predictor, by default "runtime".
+    by : str | pl.Expr, optional
+        Group column or expression used for the fits, by default the decade of
+        `released_year`.
+    log_target : bool, optional
+        Whether the fits are of `log10(target)`, in which case the fitted values are
+        returned on the original scale, by default True.
+    n_points : int, optional
+        Number of points per group, by default 2 (the ends of a straight line).
+
+    Returns
+    -------
+    pl.DataFrame
+        Columns `by`, `predictor` and `fitted`, ready to be drawn over the scatter
+        plot of each group.
+    """
+    by_expr = pl.col(by) if isinstance(by, str) else by
+    group = by_expr.meta.output_name()
+    steps = pl.Series("step", np.linspace(0, 1, n_points))
+    lines = (
+        frame.group_by(by_expr)
+        .agg(
+            pl.col(predictor).min().alias("low"), pl.col(predictor).max().alias("high")
+        )
+        .join(fits.select(group, "intercept", predictor), on=group)
+        .join(steps.to_frame(), how="cross")
+        .with_columns(
+            (pl.col("low") + pl.col("step") * (pl.col("high") - pl.col("low"))).alias(
+                "x"
+            )
+        )
+        .select(
+            group,
+            pl.col("x").alias(predictor),
+            (pl.col("intercept") + pl.col(predictor) * pl.col("x")).alias("fitted"),
+        )
+        .sort(group, predictor)
+    )
+    if log_target:
+        lines = lines.with_columns(pl.lit(10.0).pow(pl.col("fitted")).alias("fitted"))
+    return lines
+
+
+def fingerprint(frame: pl.DataFrame, **params: object) -> str:
+    """Return a key identifying `frame` and `params`.
+
+    The row hashes of Polars are not stable across versions, so the version is part
+    of the key, as is `cache_version`.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{cache_version} {pl.__version__}".encode())
+    digest.update(str(frame.schema).encode())
+    digest.update(frame.hash_rows(seed=0).to_numpy().tobytes())
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def summarize(
+    frame: pl.DataFrame,
+    *,
+    x: str = "imdb_rating",
+    y: str = "gross",
+    breaks: Sequence[float] = (7.5, 8.0, 8.5, 9.0, 9.5),
+    predictors: Sequence[str] = ("runtime",),
+    cache_dir: Path | str | None = None,
+) -> dict[str, pl.DataFrame]:
+    """Compute all the relationship tables of `frame`, cached on disk if requested.
+
+    Parameters
+    ----------
+    frame : pl.DataFrame
+        The cleaned catalog `mm`.
+    x : str, optional
+        Binned column of `binned_means`, by default "imdb_rating".
+    y : str, optional
+        Averaged column of `binned_means` and target of the regressions, by default
+        "gross".
+    breaks : Sequence[float], optional
+        Bin edges of `binned_means`, by default (7.5, 8.0, 8.5, 9.0, 9.5).
+    predictors : Sequence[str], optional
+        Predictors of the per-decade regressions, by default ("runtime",).
+    cache_dir : Path | str | None, optional
+        Directory the tables are cached in, by default None (no cache).
+
+    Returns
+    -------
+    dict[str, pl.DataFrame]
+        Tables `pearson`, `spearman`, `binned_means` and `regressions`.
+    """
+    params = {"x": x, "y": y, "breaks": list(breaks), "predictors": list(predictors)}
+    if cache_dir is not None:
+        entry = Path(cache_dir) / fingerprint(frame, **params)
+        if entry.is_dir():
+            return {
+                path.stem: pl.read_parquet(path) for path in entry.glob("*.parquet")
+            }
+
+    tables = {
+        "pearson": correlation_matrix(frame, "pearson"),
+        "spearman": correlation_matrix(frame, "spearman"),
+        "binned_means": binned_means(frame, x, y, breaks),
+        "regressions": fit_regressions(frame, predictors, target=y),
+    }
+    if cache_dir is not None:
+        # Entries are written aside and renamed, so a partial entry is never read.
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=".", dir=entry.parent))
+        for name, table in tables.items():
+            table.write_parquet(staging / f"{name}.parquet")
+        try:
+            staging.rename(entry)
+        except OSError:
+            # Another process cached the same entry first.
+            shutil.rmtree(staging)
+    return tables
+
+
+@click.command()
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False),
+    help="Directory the tables are cached in.",
+)
+def main(cache_dir: str | None) -> None:
+    """Show the relationships between the measures of the bundled catalog."""
+    tables = summarize(load_catalog(), cache_dir=cache_dir)
+    with pl.Config(tbl_cols=-1, tbl_width_chars=200, float_precision=3):
+        for name, table in tables.items():
+            click.echo(name)
+            click.echo(table)
+
+
+if __name__ == "__main__":
+    main()
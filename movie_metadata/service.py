@@ -0,0 +1,376 @@
+"""Async HTTP query service over the cleaned catalog.
+
+The service loads the cleaned catalog `mm` once (or memory-maps a saved Arrow IPC
+file, or attaches to the shared catalog of `movie_metadata.shared`) and exposes the
+analyses of `movie_metadata.analysis` as JSON endpoints. The HTTP/1.1 server runs on
+asyncio with keep-alive connections, and the Polars work of each request runs on a
+bounded thread pool so the event loop keeps accepting requests.
+
+Endpoints (all GET, parameters are query parameters):
+
+    /top-directors          n=3
+    /actor-roles            role=leading|all, n=10
+    /director-pairings      director (required), n=3
+    /best-per-year          start=2006, end=2016
+    /genre-averages
+    /health
+
+Run it with `python -m movie_metadata.service`.
+"""
+
+import asyncio
+import json
+import traceback
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import click
+import polars as pl
+
+from movie_metadata import analysis
+from movie_metadata.catalog import load_catalog
+from movie_metadata.dataset import scan_dataset
+from movie_metadata.shared import SharedCatalog, map_ipc
+
+# Reason phrases of the status codes the service responds with.
+reasons = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Content Too Large",
+    500: "Internal Server Error",
+}
+
+# Largest request head (request line and headers) accepted, in bytes.
+max_head_size = 16 * 1024
+
+# Largest request body accepted, in bytes.
+max_body_size = 64 * 1024
+
+
+class BadRequest(Exception):
+    """Raised when a request has missing or invalid query parameters."""
+
+
+def int_param(params: dict[str, list[str]], name: str, default: int) -> int:
+    """Read an integer query parameter.
+
+    Parameters
+    ----------
+    params : dict[str, list[str]]
+        Parsed query parameters.
+    name : str
+        Name of the parameter.
+    default : int
+        Value used if the parameter is missing.
+
+    Returns
+    -------
+    int
+        Value of the parameter.
+
+    Raises
+    ------
+    BadRequest
+        If the value is not a non-negative integer.
+    """
+    value = params.get(name, [str(default)])[-1]
+    if not value.isdigit():
+        raise BadRequest(f"'{name}' must be a non-negative integer, got '{value}'.")
+    return int(value)
+
+
+def top_directors(mm: pl.DataFrame, params: dict[str, list[str]]) -> pl.DataFrame:
+    """Handle `/top-directors`."""
+    return analysis.top_directors(mm, n=int_param(params, "n", 3))
+
+
+def actor_roles(mm: pl.DataFrame, params: dict[str, list[str]]) -> pl.DataFrame:
+    """Handle `/actor-roles`."""
+    role = params.get("role", ["all"])[-1]
+    n = int_param(params, "n", 10)
+    if role == "leading":
+        return analysis.leading_roles(mm, n=n)
+    if role == "all":
+        return analysis.most_roles(mm, n=n)
+    raise BadRequest(f"'role' must be 'leading' or 'all', got '{role}'.")
+
+
+def director_pairings(mm: pl.DataFrame, params: dict[str, list[str]]) -> pl.DataFrame:
+    """Handle `/director-pairings`."""
+    if "director" not in params:
+        raise BadRequest("'director' is required.")
+    return analysis.director_pairings(
+        mm, director=params["director"][-1], n=int_param(params, "n", 3)
+    )
+
+
+def best_per_year(mm: pl.DataFrame, params: dict[str, list[str]]) -> pl.DataFrame:
+    """Handle `/best-per-year`."""
+    return analysis.best_per_year(
+        mm, start=int_param(params, "start", 2006), end=int_param(params, "end", 2016)
+    )
+
+
+def genre_averages(mm: pl.DataFrame, params: dict[str, list[str]]) -> pl.DataFrame:
+    """Handle `/genre-averages`."""
+    return analysis.genre_averages(mm)
+
+
+# Mapping from endpoint path to the handler computing its frame.
+routes: dict[str, Callable[[pl.DataFrame, dict[str, list[str]]], pl.DataFrame]] = {
+    "/top-directors": top_directors,
+    "/actor-roles": actor_roles,
+    "/director-pairings": director_pairings,
+    "/best-per-year": best_per_year,
+    "/genre-averages": genre_averages,
+}
+
+
+def read_catalog(path: Path | str | None = None) -> pl.DataFrame:
+    """Load the cleaned catalog served by the service.
+
+    Parameters
+    ----------
+    path : Path | str | None, optional
+        Saved catalog, an Arrow IPC file (`.arrow`, `.ipc`, `.feather`, memory-mapped),
+        a Parquet file or a partitioned dataset directory (see
+        `movie_metadata.dataset`), by default None (extract and transform the bundled
+        CSV).
+
+    Returns
+    -------
+    pl.DataFrame
+        The cleaned catalog `mm`.
+    """
+    if path is None:
+        return load_catalog()
+    path = Path(path)
+    if path.is_dir():
+        return scan_dataset(path).drop("decade").collect()
+    if path.suffix in (".arrow", ".ipc", ".feather"):
+        return map_ipc(path)
+    return pl.read_parquet(path)
+
+
+def query(mm: pl.DataFrame, path: str, params: dict[str, list[str]]) -> bytes:
+    """Run the handler of `path` and serialize its frame as JSON.
+
+    Parameters
+    ----------
+    mm : pl.DataFrame
+        Cleaned catalog.
+    path : str
+        Endpoint path.
+    params : dict[str, list[str]]
+        Parsed query parameters.
+
+    Returns
+    -------
+    bytes
+        JSON array of row objects.
+    """
+    return routes[path](mm, params).write_json().encode()
+
+
+class CatalogService:
+    """HTTP service answering catalog queries.
+
+    Parameters
+    ----------
+    mm : pl.DataFrame | SharedCatalog
+        Cleaned catalog shared by all requests, or a shared catalog whose current
+        generation answers each request.
+    workers : int, optional
+        Number of threads running Polars queries, by default 4.
+    """
+
+    def __init__(self, mm: pl.DataFrame | SharedCatalog, workers: int = 4) -> None:
+        """Create a service answering from `mm` with `workers` threads."""
+        self.mm = mm
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="catalog"
+        )
+
+    def catalog(self) -> pl.DataFrame:
+        """Return the catalog the next request is answered from."""
+        return self.mm.current() if isinstance(self.mm, SharedCatalog) else self.mm
+
+    async def respond(self, method: str, target: str) -> tuple[int, bytes]:
+        """Compute the response to a request.
+
+        Parameters
+        ----------
+        method : str
+            HTTP method.
+        target : str
+            Request target (path and query string).
+
+        Returns
+        -------
+        tuple[int, bytes]
+            Status code and JSON body.
+        """
+        url = urlsplit(target)
+        if url.path == "/health":
+            return 200, json.dumps({"rows": self.catalog().height}).encode()
+        if url.path not in routes:
+            return (
+                404,
+                json.dumps({"error": f"Unknown endpoint '{url.path}'."}).encode(),
+            )
+        if method != "GET":
+            return 405, json.dumps({"error": "Only GET is supported."}).encode()
+
+        params = parse_qs(url.query)
+        loop = asyncio.get_running_loop()
+        try:
+            body = await loop.run_in_executor(
+                self.executor, partial(query, self.catalog(), url.path, params)
+            )
+        except BadRequest as err:
+            return 400, json.dumps({"error": str(err)}).encode()
+        except Exception:
+            # The details stay in the server log, they are not sent to the client.
+            traceback.print_exc()
+            return 500, json.dumps({"error": "Internal server error."}).encode()
+        return 200, body
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve the requests of one connection until it is closed.
+
+        Parameters
+        ----------
+        reader : asyncio.StreamReader
+            Stream of the client requests.
+        writer : asyncio.StreamWriter
+            Stream of the responses.
+        """
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ")
+                except ValueError:
+                    break
+                headers = {
+                    name.strip().lower(): value.strip()
+                    for name, _, value in (line.partition(":") for line in lines[1:])
+                    if name
+                }
+                keep_alive = headers.get("connection", "").lower() != "close" and (
+                    version == "HTTP/1.1"
+                    or headers.get("connection", "").lower() == "keep-alive"
+                )
+                content_length = headers.get("content-length", "0")
+                if not content_length.isdigit():
+                    # The end of the body is unknown, the connection cannot be reused.
+                    keep_alive = False
+                    status, body = (
+                        400,
+                        json.dumps(
+                            {"error": f"Invalid Content-Length '{content_length}'."}
+                        ).encode(),
+                    )
+                elif int(content_length) > max_body_size:
+                    # The body is not read, the connection cannot be reused.
+                    keep_alive = False
+                    status, body = (
+                        413,
+                        json.dumps(
+                            {"error": f"Bodies are limited to {max_body_size} bytes."}
+                        ).encode(),
+                    )
+                else:
+                    # Bodies are not used by any endpoint, but are consumed so the
+                    # next request on the connection starts at the right position.
+                    if int(content_length):
+                        await reader.readexactly(int(content_length))
+                    status, body = await self.respond(method, target)
+                writer.write(
+                    (
+                        f"HTTP/1.1 {status} {reasons[status]}\r\n"
+                        "Content-Type: application/json\r\n"
+                        f"Content-Length: {len(body)}\r\n"
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+                        "\r\n"
+                    ).encode()
+                    + body
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            # The client closed the connection, e.g. before sending the whole body.
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8000) -> None:
+        """Serve requests until cancelled.
+
+        Parameters
+        ----------
+        host : str, optional
+            Interface to listen on, by default "127.0.0.1".
+        port : int, optional
+            Port to listen on, 0 picks a free port, by default 8000.
+        """
+        server = await asyncio.start_server(
+            self.handle, host, port, limit=max_head_size
+        )
+        host, port = server.sockets[0].getsockname()[:2]
+        click.echo(f"Serving {self.catalog().height} movies on http://{host}:{port}")
+        async with server:
+            try:
+                await server.serve_forever()
+            finally:
+                self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+@click.command()
+@click.option("--host", default="127.0.0.1", show_default=True)
+@click.option("--port", default=8000, show_default=True, help="0 picks a free port.")
+@click.option(
+    "--workers",
+    default=4,
+    show_default=True,
+    help="Number of threads running Polars queries.",
+)
+@click.option(
+    "--catalog",
+    type=click.Path(exists=True),
+    help="""Saved cleaned catalog (Arrow IPC files are memory-mapped, directories are
+    partitioned Parquet datasets, otherwise Parquet). By default the bundled CSV is
+    extracted and transformed.""",
+)
+@click.option(
+    "--shared",
+    type=click.Path(exists=True, file_okay=False),
+    help="""Directory of a shared catalog published with `movie_metadata.shared`.
+    Newly published generations are served without a restart.""",
+)
+def main(
+    host: str, port: int, workers: int, catalog: str | None, shared: str | None
+) -> None:
+    """Serve the catalog analyses as JSON endpoints."""
+    mm = SharedCatalog(shared) if shared else read_catalog(catalog)
+    service = CatalogService(mm, workers=workers)
+    try:
+        asyncio.run(service.serve(host, port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""Cleaned catalog shared between processes through memory-mapped Arrow IPC files.
+
+A publisher writes the cleaned catalog `mm` once as an uncompressed Arrow IPC file
+into a shared directory (`/dev/shm/movie_metadata` when the system has a memory-backed
+`/dev/shm`). Every other process (marimo sessions, batch workers, the query service)
+attaches to it with `map_ipc`, so all of them read the same pages of memory instead of
+holding their own copy of `mm`.
+
+Each publish writes a new generation `catalog-<generation>.arrow` and then atomically
+replaces the `CURRENT` pointer file, so readers always see a complete generation.
+Readers keep using the generation they attached to until they refresh; old
+generations are removed once more than `keep` newer ones exist (the pages of a removed
+file stay valid for the processes that still map it).
+
+Run `python -m movie_metadata.shared publish` to publish the bundled catalog.
+"""
+
+import os
+import re
+import tempfile
+from pathlib import Path
+
+import click
+import polars as pl
+import pyarrow as pa
+from pyarrow import ipc
+
+from movie_metadata.catalog import load_catalog
+
+# Directory the catalog is published to by default.
+default_root = (
+    Path("/dev/shm/movie_metadata")
+    if Path("/dev/shm").is_dir()
+    else Path(tempfile.gettempdir()) / "movie_metadata"
+)
+
+# Name of the file pointing to the current generation.
+pointer_name = "CURRENT"
+
+# Pattern of the generation file names.
+generation_pattern = re.compile(r"catalog-(\d+)\.arrow")
+
+
+def map_ipc(path: Path | str) -> pl.DataFrame:
+    """Read an uncompressed Arrow IPC file without copying its buffers.
+
+    The file is memory-mapped and the columns of the frame point into the mapping,
+    which stays alive as long as the frame does.
+
+    Parameters
+    ----------
+    path : Path | str
+        Arrow IPC file written without compression.
+
+    Returns
+    -------
+    pl.DataFrame
+        The memory-mapped frame.
+    """
+    table = ipc.open_file(pa.memory_map(str(path))).read_all()
+    frame = pl.from_arrow(table, rechunk=False)
+    # assert to address mypy [return-value] error.
+    assert isinstance(frame, pl.DataFrame)
+    return frame
+
+
+def generation_path(root: Path, generation: int) -> Path:
+    """Return the path of the file of `generation`."""
+    return root / f"catalog-{generation:06d}.arrow"
+
+
+def current_generation(root: Path | str = default_root) -> int:
+    """Return the current generation published in `root`.
+
+    Parameters
+    ----------
+    root : Path | str, optional
+        Directory of the shared catalog, by default `default_root`.
+
+    Returns
+    -------
+    int
+        Current generation, 0 if nothing has been published.
+    """
+    try:
+        name = Path(root, pointer_name).read_text().strip()
+    except FileNotFoundError:
+        return 0
+    match = generation_pattern.fullmatch(name)
+    return int(match.group(1)) if match else 0
+
+
+def publish(mm: pl.DataFrame, root: Path | str = default_root, keep: int = 2) -> int:
+    """Publish `mm` as the new generation of the shared catalog.
+
+    Parameters
+    ----------
+    mm : pl.DataFrame
+        Cleaned catalog.
+    root : Path | str, optional
+        Directory of the shared catalog, by default `default_root`.
+    keep : int, optional
+        Number of generations kept, including the new one, by default 2.
+
+    Returns
+    -------
+    int
+        The published generation.
+
+    Raises
+    ------
+    ValueError
+        If `keep` is less than 1.
+    """
+    if keep < 1:
+        raise ValueError("'keep' must be at least 1, the new generation is kept.")
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    existing = sorted(
+        int(match.group(1))
+        for path in root.iterdir()
+        if (match := generation_pattern.fullmatch(path.name))
+    )
+
+    # Claim the generation number with an exclusive create of its (empty) file, so
+    # concurrent publishers never write the same generation. Readers only open the
+    # file once the pointer names it, after it has been replaced by the full file.
+    generation = max([current_generation(root), *existing], default=0) + 1
+    while True:
+        path = generation_path(root, generation)
+        try:
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL))
+            break
+        except FileExistsError:
+            generation += 1
+
+    # Uncompressed, so readers can map the buffers without copying them.
+    mm.write_ipc(path.with_suffix(".tmp"), compression="uncompressed")
+    path.with_suffix(".tmp").replace(path)
+
+    pointer_tmp = root / f"{pointer_name}.{generation}.tmp"
+    pointer_tmp.write_text(path.name)
+    pointer_tmp.replace(root / pointer_name)
+
+    for old in existing:
+        if old <= generation - keep:
+            generation_path(root, old).unlink(missing_ok=True)
+    return generation
+
+
+class SharedCatalog:
+    """Reader attached to a shared catalog.
+
+    Parameters
+    ----------
+    root : Path | str, optional
+        Directory of the shared catalog, by default `default_root`.
+    """
+
+    def __init__(self, root: Path | str = default_root) -> None:
+        """Attach to the current generation under `root`."""
+        self.root = Path(root)
+        self.generation = 0
+        self._frame: pl.DataFrame | None = None
+        self._pointer_stat: tuple[int, int] | None = None
+        self.refresh()
+
+    def refresh(self) -> bool:
+        """Attach to the current generation if it changed.
+
+        Returns
+        -------
+        bool
+            Whether a new generation was attached.
+
+        Raises
+        ------
+        FileNotFoundError
+            If nothing has been published in `root`.
+        """
+        pointer = self.root / pointer_name
+        for _ in range(10):
+            try:
+                stat = pointer.stat()
+            except FileNotFoundError:
+                raise FileNotFoundError(
+                    f"No catalog has been published in '{self.root}'."
+                ) from None
+            # The pointer is replaced (new inode) on every publish.
+            pointer_stat = (stat.st_ino, stat.st_mtime_ns)
+            if pointer_stat == self._pointer_stat:
+                return False
+            generation = current_generation(self.root)
+            if generation == self.generation:
+                self._pointer_stat = pointer_stat
+                return False
+            try:
+                frame = map_ipc(generation_path(self.root, generation))
+            except FileNotFoundError:
+                # The generation was replaced and removed meanwhile, read the pointer
+                # again.
+                continue
+            self._frame, self.generation = frame, generation
+            self._pointer_stat = pointer_stat
+            return True
+        raise RuntimeError(f"Could not attach to the catalog in '{self.root}'.")
+
+    def current(self) -> pl.DataFrame:
+        """Return the catalog of the current generation.
+
+        The check for a new generation is a `stat` of the pointer file, cheap enough
+        to be done before every query.
+
+        Returns
+        -------
+        pl.DataFrame
+            The memory-mapped cleaned catalog.
+        """
+        self.refresh()
+        # assert to address mypy [return-value] error.
+        assert self._frame is not None
+        return self._frame
+
+
+@click.group()
+def main() -> None:
+    """Publish and inspect the shared cleaned catalog."""
+
+
+@main.command("publish")
+@click.option(
+    "--root",
+    type=click.Path(file_okay=False),
+    default=str(default_root),
+    show_default=True,
+)
+@click.option(
+    "--keep",
+    type=click.IntRange(min=1),
+    default=2,
+    show_default=True,
+    help="Generations kept.",
+)
+def publish_command(root: str, keep: int) -> None:
+    """Publish the bundled catalog as a new generation."""
+    generation = publish(load_catalog(), root, keep=keep)
+    click.echo(f"Published generation {generation} to {root}")
+
+
+@main.command("info")
+@click.option(
+    "--root",
+    type=click.Path(file_okay=False),
+    default=str(default_root),
+    show_default=True,
+)
+def info_command(root: str) -> None:
+    """Show the current generation and its size."""
+    generation = current_generation(root)
+    if not generation:
+        raise click.ClickException(f"No catalog has been published in '{root}'.")
+    path = generation_path(Path(root), generation)
+    frame = SharedCatalog(root).current()
+    click.echo(f"generation: {generation}")
+    click.echo(f"file: {path} ({path.stat().st_size / 1e6:.2f} MB)")
+    click.echo(f"rows: {frame.height}, columns: {frame.width}")
+
+
+if __name__ == "__main__":
+    main()
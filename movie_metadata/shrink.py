@@ -0,0 +1,351 @@
+"""Minimal data type inference and downcasting.
+
+The notebook casts `released_year` and `runtime` to UInt16, `gross` to UInt64,
+`meta_score` to UInt8 and `no_of_votes` to UInt32 by hand, picking the smallest type
+that holds the values. `infer_dtypes` makes that choice for every column of a frame
+in one lazy aggregation:
+
+- integer columns get the narrowest integer type (unsigned if the minimum is not
+  negative) holding their range widened by the headroom,
+- float columns get Float32 if every value prints the same as a Float32,
+- string columns get Categorical if few of their values are distinct and the strings
+  are longer than the 4 byte category codes replacing them.
+
+`shrink` applies the types, and refuses (raises `ValueError`) to apply a plan inferred
+earlier to new data whose values do not fit, whether integers out of range or floats
+that Float32 would round. `memory_report` compares the memory use before and after.
+
+Run it with `python -m movie_metadata.shrink [CSV ...]`.
+"""
+
+from collections.abc import Mapping
+
+import click
+import polars as pl
+from polars._typing import PolarsDataType
+from polars.datatypes import IntegerType
+
+from movie_metadata.catalog import imdb_top_1000_path, movie_metadata_path
+
+# Integer types from the narrowest to the widest.
+unsigned_types: list[PolarsDataType] = [pl.UInt8, pl.UInt16, pl.UInt32, pl.UInt64]
+signed_types: list[PolarsDataType] = [pl.Int8, pl.Int16, pl.Int32, pl.Int64]
+
+
+def integer_bounds(dtype: PolarsDataType) -> tuple[int, int]:
+    """Return the smallest and largest value of the integer type `dtype`."""
+    # The dtype of a Series is an instance, also when `dtype` is a class.
+    dtype = pl.Series(dtype=dtype).dtype
+    # assert to address mypy [attr-defined] error.
+    assert isinstance(dtype, IntegerType)
+    return pl.select(dtype.min().alias("min"), dtype.max().alias("max")).row(0)
+
+
+def narrowest_integer(low: int, high: int, headroom: float) -> PolarsDataType:
+    """Return the narrowest integer type holding `[low, high]` widened by `headroom`.
+
+    Parameters
+    ----------
+    low : int
+        Smallest value.
+    high : int
+        Largest value.
+    headroom : float
+        Fraction by which the magnitude of both bounds may grow, e.g. 0.5 requires
+        the type to hold 1.5 times the largest value.
+
+    Returns
+    -------
+    PolarsDataType
+        Unsigned type if `low` is not negative, signed type otherwise, Int64 or
+        UInt64 if no narrower type fits.
+    """
+    widened_low = min(low, 0) * (1 + headroom)
+    widened_high = max(high, 0) * (1 + headroom)
+    candidates = unsigned_types if widened_low >= 0 else signed_types
+    for dtype in candidates:
+        type_low, type_high = integer_bounds(dtype)
+        if type_low <= widened_low and widened_high <= type_high:
+            return dtype
+    return candidates[-1]
+
+
+def infer_dtypes(
+    source: pl.LazyFrame | pl.DataFrame,
+    *,
+    headroom: float = 0.5,
+    max_categorical_ratio: float = 0.5,
+) -> dict[str, PolarsDataType]:
+    """Infer the narrowest safe type of every column with one lazy aggregation.
+
+    Parameters
+    ----------
+    source : pl.LazyFrame | pl.DataFrame
+        Frame whose columns are inspected.
+    headroom : float, optional
+        Fraction by which integer values may grow beyond the observed range before
+        overflowing the chosen type, by default 0.5.
+    max_categorical_ratio : float, optional
+        String columns whose number of distinct values is at most this fraction of
+        their number of values become Categorical if that saves memory, by default
+        0.5.
+
+    Returns
+    -------
+    dict[str, PolarsDataType]
+        Type of every column, unchanged for columns that cannot be narrowed (nested,
+        boolean, temporal or all-null columns).
+    """
+    lf = source.lazy()
+    schema = lf.collect_schema()
+    exprs = []
+    for name, dtype in schema.items():
+        col = pl.col(name)
+        if dtype.is_integer():
+            exprs += [col.min().alias(f"{name} min"), col.max().alias(f"{name} max")]
+        elif dtype == pl.Float64:
+            same = col.cast(pl.Float32).cast(pl.String) == col.cast(pl.String)
+            exprs.append(same.all().alias(f"{name} float32"))
+        elif dtype == pl.String:
+            exprs += [
+                col.n_unique().alias(f"{name} n_unique"),
+                col.count().alias(f"{name} count"),
+                col.str.len_bytes().mean().alias(f"{name} length"),
+            ]
+    stats = lf.select(exprs).collect().row(0, named=True) if exprs else {}
+
+    dtypes: dict[str, PolarsDataType] = dict(schema)
+    for name, dtype in schema.items():
+        if dtype.is_integer() and stats[f"{name} min"] is not None:
+            dtypes[name] = narrowest_integer(
+                stats[f"{name} min"], stats[f"{name} max"], headroom
+            )
+        elif dtype == pl.Float64 and stats[f"{name} float32"]:
+            dtypes[name] = pl.Float32
+        elif dtype == pl.String and stats[f"{name} count"]:
+            distinct_ratio = stats[f"{name} n_unique"] / stats[f"{name} count"]
+            # Each value becomes a 4 byte code, each distinct string is kept once.
+            if (
+                distinct_ratio <= max_categorical_ratio
+                and stats[f"{name} length"] * (1 - distinct_ratio) > 4
+            ):
+                dtypes[name] = pl.Categorical
+    return dtypes
+
+
+def overflows(
+    source: pl.LazyFrame | pl.DataFrame, dtypes: Mapping[str, PolarsDataType]
+) -> dict[str, tuple[int, int]]:
+    """Find the integer columns whose values do not fit their planned type.
+
+    Parameters
+    ----------
+    source : pl.LazyFrame | pl.DataFrame
+        Frame the types are applied to.
+    dtypes : Mapping[str, PolarsDataType]
+        Planned type of the columns.
+
+    Returns
+    -------
+    dict[str, tuple[int, int]]
+        Observed minimum and maximum of every column that does not fit.
+    """
+    lf = source.lazy()
+    schema = lf.collect_schema()
+    names = [
+        name
+        for name, dtype in dtypes.items()
+        if dtype.is_integer() and name in schema and schema[name].is_numeric()
+    ]
+    if not names:
+        return {}
+    stats = (
+        lf.select(
+            *(pl.col(name).min().alias(f"{name} min") for name in names),
+            *(pl.col(name).max().alias(f"{name} max") for name in names),
+        )
+        .collect()
+        .row(0, named=True)
+    )
+    result = {}
+    for name in names:
+        low, high = stats[f"{name} min"], stats[f"{name} max"]
+        type_low, type_high = integer_bounds(dtypes[name])
+        if low is not None and (low < type_low or high > type_high):
+            result[name] = (low, high)
+    return result
+
+
+def float32_losses(
+    source: pl.LazyFrame | pl.DataFrame, dtypes: Mapping[str, PolarsDataType]
+) -> dict[str, tuple[int, float]]:
+    """Find the Float64 columns planned as Float32 whose values would be rounded.
+
+    A value is kept if it prints the same as a Float32, the check of `infer_dtypes`.
+
+    Parameters
+    ----------
+    source : pl.LazyFrame | pl.DataFrame
+        Frame the types are applied to.
+    dtypes : Mapping[str, PolarsDataType]
+        Planned type of the columns.
+
+    Returns
+    -------
+    dict[str, tuple[int, float]]
+        Number of rounded values and the first of them, for every column with
+        rounded values.
+    """
+    lf = source.lazy()
+    schema = lf.collect_schema()
+    names = [
+        name
+        for name, dtype in dtypes.items()
+        if dtype == pl.Float32 and schema.get(name) == pl.Float64
+    ]
+    if not names:
+        return {}
+    exprs = []
+    for name in names:
+        col = pl.col(name)
+        lost = col.cast(pl.Float32).cast(pl.String) != col.cast(pl.String)
+        exprs += [
+            lost.sum().alias(f"{name} count"),
+            col.filter(lost).first().alias(f"{name} example"),
+        ]
+    stats = lf.select(exprs).collect().row(0, named=True)
+    return {
+        name: (stats[f"{name} count"], stats[f"{name} example"])
+        for name in names
+        if stats[f"{name} count"]
+    }
+
+
+def shrink(
+    frame: pl.DataFrame,
+    dtypes: Mapping[str, PolarsDataType] | None = None,
+    *,
+    headroom: float = 0.5,
+    max_categorical_ratio: float = 0.5,
+) -> pl.DataFrame:
+    """Cast the columns of `frame` to their narrowest safe types.
+
+    Parameters
+    ----------
+    frame : pl.DataFrame
+        Frame to shrink.
+    dtypes : Mapping[str, PolarsDataType] | None, optional
+        Types inferred earlier with `infer_dtypes`, e.g. on a previous version of the
+        data, by default None (inferred from `frame`).
+    headroom : float, optional
+        Headroom of `infer_dtypes` if `dtypes` is None, by default 0.5.
+    max_categorical_ratio : float, optional
+        Categorical threshold of `infer_dtypes` if `dtypes` is None, by default 0.5.
+
+    Returns
+    -------
+    pl.DataFrame
+        `frame` with the new types.
+
+    Raises
+    ------
+    ValueError
+        If values of `frame` do not fit the integer types of `dtypes`, or would be
+        rounded by its Float32 types.
+    """
+    if dtypes is None:
+        dtypes = infer_dtypes(
+            frame, headroom=headroom, max_categorical_ratio=max_categorical_ratio
+        )
+    else:
+        failures = [
+            f"'{name}' [{low}, {high}] in {dtypes[name]}"
+            for name, (low, high) in overflows(frame, dtypes).items()
+        ] + [
+            f"'{name}' {count} values rounded in Float32 (e.g. {example!r})"
+            for name, (count, example) in float32_losses(frame, dtypes).items()
+        ]
+        if failures:
+            raise ValueError(
+                "Values do not fit the planned types: " + ", ".join(failures)
+            )
+    return frame.cast({name: dtypes[name] for name in frame.columns if name in dtypes})
+
+
+def column_size(series: pl.Series) -> int:
+    """Return the estimated memory use of `series` in bytes.
+
+    `estimated_size` only counts the 4 byte codes of a Categorical column, the
+    strings of its distinct values are added.
+    """
+    size = series.estimated_size()
+    if series.dtype == pl.Categorical:
+        size += series.drop_nulls().unique().cast(pl.String).estimated_size()
+    # `estimated_size` is typed as a float for the units other than bytes.
+    return int(size)
+
+
+def memory_report(before: pl.DataFrame, after: pl.DataFrame) -> pl.DataFrame:
+    """Compare the memory use of the columns of two versions of a frame.
+
+    Parameters
+    ----------
+    before : pl.DataFrame
+        Original frame.
+    after : pl.DataFrame
+        Shrunk frame with the same columns.
+
+    Returns
+    -------
+    pl.DataFrame
+        Columns `column`, `dtype_before`, `dtype_after`, `bytes_before`,
+        `bytes_after` and `saved` (fraction), with a final `total` row. The bytes of
+        Categorical columns include their distinct strings (see `column_size`).
+    """
+    report = pl.DataFrame(
+        {
+            "column": before.columns,
+            "dtype_before": [str(dtype) for dtype in before.dtypes],
+            "dtype_after": [str(after[name].dtype) for name in before.columns],
+            "bytes_before": [column_size(series) for series in before],
+            "bytes_after": [column_size(after[name]) for name in before.columns],
+        },
+        schema_overrides={"bytes_before": pl.Int64, "bytes_after": pl.Int64},
+    )
+    total = pl.DataFrame(
+        {
+            "column": ["total"],
+            "bytes_before": [sum(column_size(series) for series in before)],
+            "bytes_after": [sum(column_size(series) for series in after)],
+        },
+        schema_overrides={"bytes_before": pl.Int64, "bytes_after": pl.Int64},
+    )
+    return pl.concat([report, total], how="diagonal").with_columns(
+        (1 - pl.col("bytes_after") / pl.col("bytes_before")).round(3).alias("saved")
+    )
+
+
+@click.command()
+@click.argument("sources", nargs=-1, type=click.Path(exists=True, dir_okay=False))
+@click.option("--headroom", default=0.5, show_default=True)
+@click.option("--max-categorical-ratio", default=0.5, show_default=True)
+def main(
+    sources: tuple[str, ...], headroom: float, max_categorical_ratio: float
+) -> None:
+    """Shrink the columns of CSV files and report the memory saved.
+
+    By default both bundled CSVs are shrunk.
+    """
+    for source in sources or (str(imdb_top_1000_path), str(movie_metadata_path)):
+        # Types are inferred from every row, e.g. `Released_Year` stays a string.
+        frame = pl.read_csv(source, infer_schema_length=None)
+        shrunk = shrink(
+            frame, headroom=headroom, max_categorical_ratio=max_categorical_ratio
+        )
+        click.echo(source)
+        with pl.Config(tbl_rows=-1):
+            click.echo(memory_report(frame, shrunk))
+
+
+if __name__ == "__main__":
+    main()
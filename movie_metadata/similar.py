@@ -0,0 +1,351 @@
+"""Similar movie recommendations from genre, cast, director and plot keywords.
+
+Every movie of the cleaned catalog `mm` is described by a sparse feature vector with
+one column per genre, director, star (`star1`-`star4`) and plot keyword (from
+`movie_metadata.csv`). Features are weighted per feature group and by their inverse
+document frequency, so that sharing a rare director counts more than sharing a common
+genre, and rows are L2 normalized so that a sparse matrix product gives the cosine
+similarities.
+
+All pairs of neighbors are computed in one batch job over blocks of rows (the block
+similarities are the only dense arrays) and kept as a neighbor table. Single title
+queries are answered from that table.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+from scipy import sparse
+
+from movie_metadata.catalog import load_catalog, load_movie_metadata
+from movie_metadata.title_index import normalize_title
+
+# Default weight of each feature group.
+default_weights = {"genre": 1.0, "director": 1.0, "star": 1.0, "keyword": 1.0}
+
+
+def attach_keywords(mm: pl.DataFrame, metadata: pl.DataFrame) -> pl.DataFrame:
+    """Add the plot keywords of `movie_metadata.csv` to the movies of `mm`.
+
+    Movies are matched on their normalized title and release year.
+
+    Parameters
+    ----------
+    mm : pl.DataFrame
+        Cleaned catalog.
+    metadata : pl.DataFrame
+        `movie_metadata.csv` with the columns `movie_title`, `title_year` and
+        `plot_keywords`.
+
+    Returns
+    -------
+    pl.DataFrame
+        `mm` with a `keywords` list column (null for unmatched movies).
+    """
+    keywords = (
+        metadata.select(
+            normalize_title(pl.col("movie_title")).alias("_title"),
+            pl.col("title_year").cast(pl.UInt16).alias("released_year"),
+            pl.col("plot_keywords").str.split("|").alias("keywords"),
+        )
+        .drop_nulls("keywords")
+        .unique(subset=["_title", "released_year"], keep="first")
+    )
+    return (
+        mm.with_columns(normalize_title(pl.col("series_title")).alias("_title"))
+        .join(keywords, on=["_title", "released_year"], how="left")
+        .drop("_title")
+    )
+
+
+def feature_matrix(
+    movies: pl.DataFrame, weights: dict[str, float] | None = None
+) -> sparse.csr_matrix:
+    """Build the L2 normalized, IDF weighted sparse feature matrix of `movies`.
+
+    Parameters
+    ----------
+    movies : pl.DataFrame
+        Movies with the columns `genre`, `director`, `star1`-`star4` and optionally
+        `keywords`.
+    weights : dict[str, float] | None, optional
+        Weight of each feature group, by default `default_weights`.
+
+    Returns
+    -------
+    sparse.csr_matrix
+        One row per movie and one column per feature.
+    """
+    weights = default_weights | (weights or {})
+    groups = {
+        "genre": pl.col("genre"),
+        "director": pl.concat_list("director"),
+        "star": pl.concat_list("star1", "star2", "star3", "star4"),
+    }
+    if "keywords" in movies.columns:
+        groups["keyword"] = pl.col("keywords")
+
+    # One row per (movie, feature) pair, features are prefixed by their group.
+    pairs = (
+        pl.concat(
+            [
+                movies.select(
+                    pl.int_range(pl.len(), dtype=pl.UInt32).alias("row"),
+                    expr.list.eval(pl.lit(f"{group}:") + pl.element()).alias("feature"),
+                    pl.lit(weights[group]).alias("weight"),
+                )
+                for group, expr in groups.items()
+            ]
+        )
+        .explode("feature")
+        .drop_nulls("feature")
+        .unique(subset=["row", "feature"])
+        .with_columns(
+            (pl.col("feature").rank("dense") - 1).cast(pl.UInt32).alias("col")
+        )
+    )
+
+    rows = pairs["row"].to_numpy()
+    cols = pairs["col"].to_numpy()
+    n_features = int(cols.max()) + 1 if len(cols) else 0
+    idf = np.log((1 + movies.height) / (1 + np.bincount(cols, minlength=n_features)))
+    values = pairs["weight"].to_numpy() * (idf[cols] + 1)
+
+    matrix = sparse.csr_matrix(
+        (values, (rows, cols)),
+        shape=(movies.height, n_features),
+        dtype=np.float32,
+    )
+    norms = np.sqrt(matrix.multiply(matrix).sum(axis=1)).A1
+    norms[norms == 0] = 1
+    return sparse.csr_matrix(sparse.diags(1 / norms) @ matrix)
+
+
+def top_k_neighbors(
+    matrix: sparse.csr_matrix, k: int = 10, max_elements: int = 1 << 22
+) -> tuple[np.ndarray, np.ndarray]:
+    """Find the `k` most similar rows of every row of `matrix`.
+
+    Parameters
+    ----------
+    matrix : sparse.csr_matrix
+        L2 normalized row vectors.
+    k : int, optional
+        Number of neighbors per row, by default 10.
+    max_elements : int, optional
+        Maximum number of similarities computed at once, by default 2**22. Blocks
+        have at least one row.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        Neighbor rows and cosine similarities, each of shape `(n_rows, k)` and
+        sorted by descending similarity. `k` is at most `n_rows - 1`, a single row
+        has no neighbors.
+    """
+    n_rows = matrix.shape[0]
+    k = max(min(k, n_rows - 1), 0)
+    neighbors = np.empty((n_rows, k), dtype=np.uint32)
+    scores = np.empty((n_rows, k), dtype=np.float32)
+    if k == 0:
+        return neighbors, scores
+    transposed = matrix.T.tocsc()
+
+    # Each row of a block holds the similarities to all of the `n_rows` rows.
+    block_size = max(1, max_elements // n_rows)
+    for start in range(0, n_rows, block_size):
+        stop = min(start + block_size, n_rows)
+        block = (matrix[start:stop] @ transposed).toarray()
+        # A movie is not its own neighbor.
+        block[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+
+        top = np.argpartition(-block, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(block, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        neighbors[start:stop] = np.take_along_axis(top, order, axis=1)
+        scores[start:stop] = np.take_along_axis(top_scores, order, axis=1)
+
+    return neighbors, scores
+
+
+class SimilarMovies:
+    """Precomputed similar movie neighbors.
+
+    Parameters
+    ----------
+    movies : pl.DataFrame
+        Movies with at least the columns `series_title` and `released_year`. The row
+        position of a movie is its movie id.
+    neighbors : pl.DataFrame
+        Neighbor table with the columns `movie_id`, `rank`, `neighbor_id` and
+        `score`, sorted by `movie_id` and `rank`.
+    """
+
+    def __init__(self, movies: pl.DataFrame, neighbors: pl.DataFrame) -> None:
+        """Create the lookup from the movies and their neighbor table."""
+        self.movies = movies
+        self.neighbors = neighbors
+        # Sorted movie ids of the neighbor table, to slice the rows of a movie.
+        self._neighbor_movie_ids = neighbors["movie_id"].to_numpy()
+        self._titles = movies.select(
+            normalize_title(pl.col("series_title")).alias("title")
+        ).to_series()
+
+    @classmethod
+    def build(
+        cls,
+        movies: pl.DataFrame,
+        *,
+        k: int = 10,
+        weights: dict[str, float] | None = None,
+        max_elements: int = 1 << 22,
+    ) -> "SimilarMovies":
+        """Compute the `k` nearest neighbors of every movie.
+
+        Parameters
+        ----------
+        movies : pl.DataFrame
+            Movies with the columns used by `feature_matrix`.
+        k : int, optional
+            Number of neighbors kept per movie, by default 10.
+        weights : dict[str, float] | None, optional
+            Weight of each feature group, by default `default_weights`.
+        max_elements : int, optional
+            Maximum number of similarities computed at once, by default 2**22.
+
+        Returns
+        -------
+        SimilarMovies
+            Neighbors of every movie.
+        """
+        neighbor_ids, scores = top_k_neighbors(
+            feature_matrix(movies, weights), k=k, max_elements=max_elements
+        )
+        n_rows, k = neighbor_ids.shape
+        neighbors = pl.DataFrame(
+            {
+                "movie_id": np.repeat(np.arange(n_rows, dtype=np.uint32), k),
+                "rank": np.tile(np.arange(1, k + 1, dtype=np.uint16), n_rows),
+                "neighbor_id": neighbor_ids.ravel(),
+                "score": scores.ravel(),
+            }
+        )
+        return cls(movies, neighbors)
+
+    def movie_ids(self, title: str, released_year: int | None = None) -> np.ndarray:
+        """Find the movie ids of `title`.
+
+        Parameters
+        ----------
+        title : str
+            Movie title, matched after case and whitespace normalization.
+        released_year : int | None, optional
+            Release year, to disambiguate movies sharing a title, by default None.
+
+        Returns
+        -------
+        np.ndarray
+            Matching movie ids.
+
+        Raises
+        ------
+        KeyError
+            If no movie matches.
+        """
+        query = pl.select(normalize_title(pl.lit(title))).item()
+        mask = self._titles == query
+        if released_year is not None:
+            mask &= self.movies["released_year"] == released_year
+        ids = np.flatnonzero(mask.to_numpy())
+        if not len(ids):
+            raise KeyError(f"No movie titled '{title}'.")
+        return ids
+
+    def similar(
+        self, title: str, k: int = 10, released_year: int | None = None
+    ) -> pl.DataFrame:
+        """Return the movies most similar to `title`.
+
+        Parameters
+        ----------
+        title : str
+            Movie title, matched after case and whitespace normalization.
+        k : int, optional
+            Number of similar movies, at most the `k` of `build`, by default 10.
+        released_year : int | None, optional
+            Release year, to disambiguate movies sharing a title, by default None.
+
+        Returns
+        -------
+        pl.DataFrame
+            For each matching movie, its `k` neighbors ranked by descending `score`
+            with their catalog columns.
+        """
+        ids = self.movie_ids(title, released_year)
+        starts = np.searchsorted(self._neighbor_movie_ids, ids, side="left")
+        ends = np.searchsorted(self._neighbor_movie_ids, ids, side="right")
+        # The rows of a movie are sorted by rank, keep the first `k`.
+        rows = np.concatenate(
+            [
+                np.arange(start, min(end, start + max(k, 0)))
+                for start, end in zip(starts, ends)
+            ]
+        )
+        table = self.neighbors[rows]
+        return table.select("movie_id", "rank", "score").hstack(
+            self.movies[table["neighbor_id"].to_numpy()]
+        )
+
+    def save(self, path: Path | str) -> None:
+        """Save the movies and the neighbor table to the directory `path`.
+
+        Parameters
+        ----------
+        path : Path | str
+            Directory the tables are written to. It is created if needed.
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        self.movies.write_parquet(path / "movies.parquet")
+        self.neighbors.write_parquet(path / "neighbors.parquet")
+
+    @classmethod
+    def load(cls, path: Path | str) -> "SimilarMovies":
+        """Load the tables saved with `save`.
+
+        Parameters
+        ----------
+        path : Path | str
+            Directory the tables were saved to.
+
+        Returns
+        -------
+        SimilarMovies
+            The loaded neighbors.
+        """
+        path = Path(path)
+        return cls(
+            pl.read_parquet(path / "movies.parquet"),
+            pl.read_parquet(path / "neighbors.parquet"),
+        )
+
+
+def build_similar_movies(**kwargs) -> SimilarMovies:
+    """Compute the neighbors of the cleaned catalog with the bundled plot keywords.
+
+    Parameters
+    ----------
+    **kwargs
+        Keyword arguments passed to `SimilarMovies.build`.
+
+    Returns
+    -------
+    SimilarMovies
+        Neighbors of every movie of `mm`.
+    """
+    movies = attach_keywords(
+        load_catalog(),
+        load_movie_metadata(columns=["movie_title", "title_year", "plot_keywords"]),
+    )
+    return SimilarMovies.build(movies, **kwargs)
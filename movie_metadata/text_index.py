@@ -0,0 +1,464 @@
+"""Inverted full-text index with BM25 scoring over overviews and plot keywords.
+
+Each movie of the two catalogs is a document made of its `Overview` (from
+`imdb_top_1000.csv`) and its `plot_keywords` (from `movie_metadata.csv`). Documents are
+tokenized into lowercase word tokens and the index stores, for every term, a posting
+list of document ids and term frequencies. The posting lists are laid out as flat
+arrays (`offsets`, `doc_ids`, `tfs`) that `TextIndex.load` memory-maps, together with
+the normalized text used for phrase matching, so a saved index opens without reading
+its postings or its text. Only the columns used to filter and return results are
+read into memory.
+
+The postings are built in parallel over chunks of documents and merged with one sort.
+Queries combine BM25 ranked search with any Polars filter over the document columns
+(e.g. `released_year` or `genre`), and quoted phrases must appear verbatim.
+"""
+
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+
+from movie_metadata.catalog import (
+    imdb_top_1000_path,
+    load_catalog,
+    load_movie_metadata,
+    movie_metadata_path,
+)
+from movie_metadata.shared import map_ipc
+
+# Version of the on-disk layout written by `TextIndex.save`.
+format_version = 2
+
+# Pattern of the tokens in documents and queries.
+token_pattern = r"\w+"
+
+
+def tokenize(expr: pl.Expr) -> pl.Expr:
+    """Split text into lowercase word tokens.
+
+    Parameters
+    ----------
+    expr : pl.Expr
+        String expression of text.
+
+    Returns
+    -------
+    pl.Expr
+        List of tokens for each value.
+    """
+    return expr.fill_null("").str.to_lowercase().str.extract_all(token_pattern)
+
+
+def normalize_text(expr: pl.Expr) -> pl.Expr:
+    """Join the tokens of text with single spaces, for phrase matching.
+
+    Keywords keep their `|` separators so that phrases do not match across keywords.
+
+    Parameters
+    ----------
+    expr : pl.Expr
+        String expression of text.
+
+    Returns
+    -------
+    pl.Expr
+        Space separated tokens, with ` | ` between keywords.
+    """
+    return (
+        expr.fill_null("")
+        .str.split("|")
+        .list.eval(tokenize(pl.element()).list.join(" "))
+        .list.join(" | ")
+    )
+
+
+def load_documents(
+    imdb_source: Path | str = imdb_top_1000_path,
+    metadata_source: Path | str = movie_metadata_path,
+) -> pl.DataFrame:
+    """Collect the documents of both catalogs into one frame.
+
+    Parameters
+    ----------
+    imdb_source : Path | str, optional
+        Path to the IMDB top 1000 CSV, by default the bundled file.
+    metadata_source : Path | str, optional
+        Path to the movie metadata CSV, by default the bundled file.
+
+    Returns
+    -------
+    pl.DataFrame
+        Columns `title`, `released_year`, `genre`, `director`, `source`, `overview`
+        and `keywords`.
+    """
+    # `extract` drops `Overview`, read it separately (same row order).
+    overview = pl.read_csv(imdb_source, columns=["Overview"])
+    imdb = load_catalog(imdb_source).select(
+        pl.col("series_title").alias("title"),
+        pl.col("released_year"),
+        pl.col("genre"),
+        pl.col("director"),
+        pl.lit("imdb_top_1000").alias("source"),
+        overview.to_series().alias("overview"),
+        pl.lit(None, dtype=pl.String).alias("keywords"),
+    )
+    metadata = load_movie_metadata(
+        metadata_source,
+        columns=[
+            "movie_title",
+            "title_year",
+            "genres",
+            "director_name",
+            "plot_keywords",
+        ],
+    ).select(
+        pl.col("movie_title").str.strip_chars().alias("title"),
+        pl.col("title_year").cast(pl.UInt16).alias("released_year"),
+        pl.col("genres").str.split("|").alias("genre"),
+        pl.col("director_name").alias("director"),
+        pl.lit("movie_metadata").alias("source"),
+        pl.lit(None, dtype=pl.String).alias("overview"),
+        pl.col("plot_keywords").alias("keywords"),
+    )
+    return pl.concat([imdb, metadata])
+
+
+def chunk_postings(chunk: pl.DataFrame, keyword_weight: float) -> pl.DataFrame:
+    """Compute the term frequencies of a chunk of documents.
+
+    Parameters
+    ----------
+    chunk : pl.DataFrame
+        Documents with the columns `doc_id`, `overview` and `keywords`.
+    keyword_weight : float
+        Weight of a keyword token relative to an overview token.
+
+    Returns
+    -------
+    pl.DataFrame
+        One row per `(term, doc_id)` pair with its weighted term frequency `tf`.
+    """
+    return (
+        pl.concat(
+            [
+                chunk.select(
+                    pl.col("doc_id"),
+                    tokenize(pl.col(field)).alias("term"),
+                    pl.lit(weight, dtype=pl.Float32).alias("weight"),
+                )
+                for field, weight in (("overview", 1.0), ("keywords", keyword_weight))
+            ]
+        )
+        .explode("term")
+        .drop_nulls("term")
+        .group_by("term", "doc_id")
+        .agg(pl.col("weight").sum().alias("tf"))
+    )
+
+
+def parse_query(query: str) -> tuple[list[str], list[str]]:
+    """Split a query into its terms and quoted phrases.
+
+    Parameters
+    ----------
+    query : str
+        Query such as `heist "bank robbery"`.
+
+    Returns
+    -------
+    tuple[list[str], list[str]]
+        All terms of the query (including the terms of the phrases) and the
+        normalized phrases.
+    """
+    phrases = [
+        " ".join(re.findall(token_pattern, phrase.lower()))
+        for phrase in re.findall(r'"([^"]*)"', query)
+    ]
+    terms = re.findall(token_pattern, query.lower())
+    return list(dict.fromkeys(terms)), [phrase for phrase in phrases if phrase]
+
+
+class TextIndex:
+    """Inverted index with BM25 scoring.
+
+    Parameters
+    ----------
+    documents : pl.DataFrame
+        Columns of the indexed documents returned with the results. The row position
+        of a document is its document id.
+    text : pl.Series
+        Normalized text of each document, used to match phrases.
+    terms : pl.Series
+        Sorted terms of the index.
+    offsets : np.ndarray
+        Start of the posting list of each term, with a final entry for the end of the
+        last posting list.
+    doc_ids : np.ndarray
+        Document ids of the posting lists, sorted within each list.
+    tfs : np.ndarray
+        Weighted term frequency of each posting.
+    doc_lengths : np.ndarray | None, optional
+        Weighted number of tokens of each document, by default None (computed from
+        the postings).
+    k1 : float, optional
+        BM25 term frequency saturation, by default 1.2.
+    b : float, optional
+        BM25 document length normalization, by default 0.75.
+    """
+
+    def __init__(
+        self,
+        documents: pl.DataFrame,
+        text: pl.Series,
+        terms: pl.Series,
+        offsets: np.ndarray,
+        doc_ids: np.ndarray,
+        tfs: np.ndarray,
+        doc_lengths: np.ndarray | None = None,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ) -> None:
+        """Create an index from its documents and posting arrays."""
+        self.documents = documents
+        self.text = text
+        self.terms = terms
+        self.offsets = offsets
+        self.doc_ids = doc_ids
+        self.tfs = tfs
+        self.k1 = k1
+        self.b = b
+
+        if doc_lengths is None:
+            doc_lengths = np.bincount(doc_ids, weights=tfs, minlength=len(documents))
+        self.doc_lengths = doc_lengths
+        self._avg_doc_length = max(float(doc_lengths.mean()), 1e-9)
+
+    def __len__(self) -> int:
+        """Return the number of indexed documents."""
+        return self.documents.height
+
+    @classmethod
+    def build(
+        cls,
+        documents: pl.DataFrame,
+        *,
+        keyword_weight: float = 1.0,
+        chunk_size: int = 100_000,
+        workers: int | None = None,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ) -> "TextIndex":
+        """Build an index over `documents`.
+
+        Parameters
+        ----------
+        documents : pl.DataFrame
+            Documents with `overview` and `keywords` columns. The other columns can
+            be used to filter queries and are returned with the results.
+        keyword_weight : float, optional
+            Weight of a keyword token relative to an overview token, by default 1.0.
+        chunk_size : int, optional
+            Number of documents tokenized per task, by default 100_000.
+        workers : int | None, optional
+            Number of threads tokenizing chunks, by default None (as many as
+            `ThreadPoolExecutor` chooses).
+        k1 : float, optional
+            BM25 term frequency saturation, by default 1.2.
+        b : float, optional
+            BM25 document length normalization, by default 0.75.
+
+        Returns
+        -------
+        TextIndex
+            The index.
+        """
+        documents = documents.with_row_index("doc_id")
+        chunks = [
+            documents.slice(offset, chunk_size).select("doc_id", "overview", "keywords")
+            for offset in range(0, documents.height, chunk_size)
+        ]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            partials = list(
+                executor.map(
+                    lambda chunk: chunk_postings(chunk, keyword_weight), chunks
+                )
+            )
+
+        postings = pl.concat(partials).sort("term", "doc_id")
+        counts = postings.group_by("term", maintain_order=True).len()
+        offsets = np.zeros(counts.height + 1, dtype=np.int64)
+        np.cumsum(counts["len"].to_numpy(), out=offsets[1:])
+
+        text = documents.select(
+            pl.concat_str(
+                normalize_text(pl.col("overview")),
+                normalize_text(pl.col("keywords")),
+                separator=" | ",
+            ).alias("text")
+        ).to_series()
+        return cls(
+            documents.drop("doc_id", "overview", "keywords"),
+            text,
+            counts["term"],
+            offsets,
+            postings["doc_id"].to_numpy().astype(np.uint32),
+            postings["tf"].to_numpy().astype(np.float32),
+            k1=k1,
+            b=b,
+        )
+
+    def postings(self, term: str) -> tuple[np.ndarray, np.ndarray]:
+        """Return the posting list of `term`.
+
+        Parameters
+        ----------
+        term : str
+            Lowercase term.
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray]
+            Document ids and term frequencies, empty if the term is not indexed.
+        """
+        i = self.terms.search_sorted(term)
+        if i >= len(self.terms) or self.terms[i] != term:
+            return np.empty(0, dtype=np.uint32), np.empty(0, dtype=np.float32)
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return self.doc_ids[start:end], self.tfs[start:end]
+
+    def search(
+        self, query: str, k: int = 10, where: pl.Expr | None = None
+    ) -> pl.DataFrame:
+        """Rank the documents matching `query` by BM25.
+
+        Documents match if they contain any term of the query and every quoted
+        phrase of the query.
+
+        Parameters
+        ----------
+        query : str
+            Terms and quoted phrases, e.g. `heist "bank robbery"`.
+        k : int, optional
+            Maximum number of results, by default 10.
+        where : pl.Expr | None, optional
+            Filter over the document columns, e.g.
+            `pl.col("released_year").is_between(1990, 1999)`, by default None.
+
+        Returns
+        -------
+        pl.DataFrame
+            Up to `k` documents ranked by descending `score`.
+        """
+        terms, phrases = parse_query(query)
+        scores = np.zeros(len(self), dtype=np.float64)
+        n_docs = len(self)
+        for term in terms:
+            doc_ids, tfs = self.postings(term)
+            if not len(doc_ids):
+                continue
+            idf = np.log1p((n_docs - len(doc_ids) + 0.5) / (len(doc_ids) + 0.5))
+            norm = self.k1 * (
+                1 - self.b + self.b * self.doc_lengths[doc_ids] / self._avg_doc_length
+            )
+            scores[doc_ids] += idf * tfs * (self.k1 + 1) / (tfs + norm)
+
+        candidates = np.flatnonzero(scores)
+        if where is not None:
+            selected = self.documents.select(
+                pl.int_range(pl.len(), dtype=pl.UInt32).alias("doc_id"),
+                pl.all(),
+            )[candidates]
+            candidates = selected.filter(where)["doc_id"].to_numpy()
+        if phrases:
+            # Only the text of the remaining candidates is read.
+            text = " " + self.text[candidates] + " "
+            matches = np.ones(len(candidates), dtype=bool)
+            for phrase in phrases:
+                matches &= text.str.contains(f" {phrase} ", literal=True).to_numpy()
+            candidates = candidates[matches]
+
+        candidate_scores = scores[candidates]
+        if len(candidates) > k:
+            top = np.argpartition(-candidate_scores, k - 1)[:k]
+            candidates, candidate_scores = candidates[top], candidate_scores[top]
+        order = np.lexsort((candidates, -candidate_scores))
+        return self.documents[candidates[order]].with_columns(
+            pl.Series("score", candidate_scores[order])
+        )
+
+    def save(self, path: Path | str) -> None:
+        """Save the index to the directory `path`.
+
+        Parameters
+        ----------
+        path : Path | str
+            Directory the index is written to. It is created if needed.
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        self.documents.write_parquet(path / "documents.parquet")
+        # Uncompressed so that `load` can memory-map it.
+        self.text.to_frame().write_ipc(path / "text.arrow", compression="uncompressed")
+        self.terms.to_frame().write_parquet(path / "terms.parquet")
+        for name in ("offsets", "doc_ids", "tfs", "doc_lengths"):
+            np.save(path / f"{name}.npy", getattr(self, name))
+        (path / "index.json").write_text(
+            json.dumps({"format_version": format_version, "k1": self.k1, "b": self.b})
+        )
+
+    @classmethod
+    def load(cls, path: Path | str) -> "TextIndex":
+        """Load an index saved with `save`, memory-mapping the postings and the text.
+
+        Parameters
+        ----------
+        path : Path | str
+            Directory the index was saved to.
+
+        Returns
+        -------
+        TextIndex
+            The loaded index.
+        """
+        path = Path(path)
+        meta = json.loads((path / "index.json").read_text())
+        if meta["format_version"] != format_version:
+            raise ValueError(
+                f"Unsupported text index format version {meta['format_version']}."
+            )
+        offsets = np.load(path / "offsets.npy", mmap_mode="r")
+        doc_ids = np.load(path / "doc_ids.npy", mmap_mode="r")
+        tfs = np.load(path / "tfs.npy", mmap_mode="r")
+        doc_lengths = np.load(path / "doc_lengths.npy", mmap_mode="r")
+        return cls(
+            documents=pl.read_parquet(path / "documents.parquet"),
+            text=map_ipc(path / "text.arrow").to_series(),
+            terms=pl.read_parquet(path / "terms.parquet").to_series(),
+            offsets=offsets,
+            doc_ids=doc_ids,
+            tfs=tfs,
+            doc_lengths=doc_lengths,
+            k1=meta["k1"],
+            b=meta["b"],
+        )
+
+
+def build_text_index(**kwargs) -> TextIndex:
+    """Build a text index over the documents of both bundled catalogs.
+
+    Parameters
+    ----------
+    **kwargs
+        Keyword arguments passed to `TextIndex.build`.
+
+    Returns
+    -------
+    TextIndex
+        Index over `Overview` of `imdb_top_1000.csv` and `plot_keywords` of
+        `movie_metadata.csv`.
+    """
+    return TextIndex.build(load_documents(), **kwargs)
@@ -0,0 +1,449 @@
+"""Trigram index for fuzzy and prefix title search.
+
+Titles are normalized (lowercase, trimmed, runs of whitespace collapsed to a single
+space) and split into trigrams of their UTF-8 bytes, padded so that the start and the
+end of a title form trigrams of their own. Each trigram is encoded as a 24-bit integer
+so the index is built with integer array operations over one buffer holding every
+title. For each trigram the index stores a sorted posting list of title ids, laid out
+as one array of postings and one array of offsets.
+
+Fuzzy queries count the trigrams shared between the query and each title from the
+posting lists of the query trigrams and rank the titles by their Dice coefficient.
+Prefix queries are binary searches over the sorted normalized titles.
+
+New titles are inserted as additional segments, so inserts do not rebuild the whole
+index. Segments are merged by `TitleIndex.compact`.
+"""
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+
+from movie_metadata.catalog import load_titles
+
+# Version of the on-disk layout written by `TitleIndex.save`.
+format_version = 1
+
+
+def normalize_title(expr: pl.Expr) -> pl.Expr:
+    """Normalize titles for indexing and querying.
+
+    Parameters
+    ----------
+    expr : pl.Expr
+        String expression of titles.
+
+    Returns
+    -------
+    pl.Expr
+        Lowercase titles with runs of whitespace collapsed and leading/trailing
+        whitespace removed.
+    """
+    return (
+        expr.fill_null("")
+        .str.to_lowercase()
+        .str.replace_all(r"\s+", " ")
+        .str.strip_chars()
+    )
+
+
+def encode_trigrams(buffer: np.ndarray) -> np.ndarray:
+    """Encode every run of three bytes of `buffer` as a 24-bit integer.
+
+    Parameters
+    ----------
+    buffer : np.ndarray
+        Bytes as a `uint8` array.
+
+    Returns
+    -------
+    np.ndarray
+        `len(buffer) - 2` trigram codes.
+    """
+    buffer = buffer.astype(np.uint32)
+    return (buffer[:-2] << 16) | (buffer[1:-1] << 8) | buffer[2:]
+
+
+def title_trigrams(normalized: pl.Series) -> tuple[np.ndarray, np.ndarray]:
+    """Split normalized titles into their unique padded trigrams.
+
+    Parameters
+    ----------
+    normalized : pl.Series
+        Normalized titles.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        The trigram codes and the row of the title in `normalized` of every unique
+        `(gram, row)` pair, sorted by trigram code then row.
+    """
+    padded = "  " + normalized + " "
+    lengths = padded.str.len_bytes().to_numpy().astype(np.int64)
+    buffer = np.frombuffer(padded.str.join("").item().encode(), dtype=np.uint8)
+
+    # Row of every byte, a trigram is kept if its first and last byte share a row.
+    rows = np.repeat(np.arange(len(lengths), dtype=np.uint64), lengths)
+    codes = encode_trigrams(buffer).astype(np.uint64)
+    keep = rows[:-2] == rows[2:]
+
+    # Pack each pair into one integer so that a single sort orders and deduplicates.
+    pairs = np.sort((codes[keep] << np.uint64(32)) | rows[:-2][keep])
+    pairs = pairs[np.concatenate(([True], pairs[1:] != pairs[:-1]))]
+    return (pairs >> np.uint64(32)).astype(np.uint32), (
+        pairs & np.uint64(0xFFFFFFFF)
+    ).astype(np.uint32)
+
+
+def query_trigrams(query: str) -> tuple[str, np.ndarray]:
+    """Normalize a query and split it into its unique padded trigrams.
+
+    Parameters
+    ----------
+    query : str
+        Title query.
+
+    Returns
+    -------
+    tuple[str, np.ndarray]
+        The normalized query and its sorted unique trigram codes.
+    """
+    normalized = pl.select(normalize_title(pl.lit(query))).item()
+    buffer = np.frombuffer(f"  {normalized} ".encode(), dtype=np.uint8)
+    return normalized, np.unique(encode_trigrams(buffer))
+
+
+@dataclass
+class Segment:
+    """Posting lists and sorted titles for a contiguous range of title ids.
+
+    Attributes
+    ----------
+    grams : np.ndarray
+        Sorted unique trigram codes of the segment.
+    offsets : np.ndarray
+        Start of the posting list of each trigram in `postings`, with a final entry
+        for the end of the last posting list.
+    postings : np.ndarray
+        Title ids of the posting lists, sorted within each list.
+    order : np.ndarray
+        Title ids of the segment sorted by normalized title.
+    """
+
+    grams: np.ndarray
+    offsets: np.ndarray
+    postings: np.ndarray
+    order: np.ndarray
+
+    @classmethod
+    def build(cls, normalized: pl.Series, base: int) -> "Segment":
+        """Build a segment from normalized titles.
+
+        Parameters
+        ----------
+        normalized : pl.Series
+            Normalized titles of the segment.
+        base : int
+            Title id of the first title in `normalized`.
+
+        Returns
+        -------
+        Segment
+            The segment with title ids `base` to `base + len(normalized) - 1`.
+        """
+        codes, rows = title_trigrams(normalized)
+        # `codes` is sorted, each posting list starts where the code changes.
+        starts = np.flatnonzero(np.concatenate(([True], codes[1:] != codes[:-1])))
+        grams = codes[starts]
+        offsets = np.append(starts, len(codes)).astype(np.int64)
+
+        return cls(
+            grams=grams,
+            offsets=offsets,
+            postings=rows + np.uint32(base),
+            order=(normalized.arg_sort().to_numpy() + base).astype(np.uint32),
+        )
+
+    def lookup(self, grams: np.ndarray) -> np.ndarray:
+        """Concatenate the posting lists of `grams`.
+
+        Parameters
+        ----------
+        grams : np.ndarray
+            Sorted unique query trigram codes.
+
+        Returns
+        -------
+        np.ndarray
+            Title ids, repeated once for every trigram of `grams` the title contains.
+        """
+        idx = np.searchsorted(self.grams, grams)
+        found = idx < len(self.grams)
+        found[found] = self.grams[idx[found]] == grams[found]
+        idx = idx[found]
+        if not len(idx):
+            return np.empty(0, dtype=np.uint32)
+        return np.concatenate(
+            [self.postings[self.offsets[i] : self.offsets[i + 1]] for i in idx]
+        )
+
+
+class TitleIndex:
+    """Trigram index over movie titles.
+
+    Parameters
+    ----------
+    titles : pl.DataFrame
+        Indexed titles with at least the columns `title` and `normalized`. The row
+        position of a title is its title id.
+    segments : list[Segment]
+        Segments covering all of the title ids.
+    max_segments : int, optional
+        Number of segments above which inserts compact the index, by default 8.
+    """
+
+    def __init__(
+        self, titles: pl.DataFrame, segments: list[Segment], max_segments: int = 8
+    ) -> None:
+        """Create an index from its titles and segments."""
+        self.titles = titles
+        self.segments = segments
+        self.max_segments = max_segments
+        self._refresh()
+
+    def _refresh(self) -> None:
+        """Cache the per-title arrays used for ranking."""
+        # Number of unique trigrams of each title.
+        self._gram_counts = np.zeros(self.titles.height, dtype=np.int64)
+        for segment in self.segments:
+            self._gram_counts += np.bincount(
+                segment.postings, minlength=self.titles.height
+            )
+        self._lengths = self.titles["normalized"].str.len_chars().to_numpy()
+        self._sorted = [
+            self.titles["normalized"].gather(segment.order) for segment in self.segments
+        ]
+
+    def __len__(self) -> int:
+        """Return the number of indexed titles."""
+        return self.titles.height
+
+    @classmethod
+    def build(cls, titles: pl.DataFrame, max_segments: int = 8) -> "TitleIndex":
+        """Build an index over `titles`.
+
+        Parameters
+        ----------
+        titles : pl.DataFrame
+            Titles to index, with at least a `title` column. Other columns (e.g.
+            `released_year` and `source`) are returned with the query results.
+        max_segments : int, optional
+            Number of segments above which inserts compact the index, by default 8.
+
+        Returns
+        -------
+        TitleIndex
+            Index with a single segment.
+        """
+        titles = titles.with_columns(
+            normalize_title(pl.col("title")).alias("normalized")
+        )
+        return cls(titles, [Segment.build(titles["normalized"], 0)], max_segments)
+
+    def insert(self, titles: pl.DataFrame) -> None:
+        """Insert new titles as a new segment.
+
+        Parameters
+        ----------
+        titles : pl.DataFrame
+            Titles to insert, with the same columns as the indexed titles (without
+            `normalized`).
+        """
+        titles = titles.with_columns(
+            normalize_title(pl.col("title")).alias("normalized")
+        ).select(self.titles.columns)
+        base = self.titles.height
+        segment = Segment.build(titles["normalized"], base)
+        self.segments.append(segment)
+        self.titles = pl.concat([self.titles, titles], how="vertical_relaxed")
+
+        if len(self.segments) > self.max_segments:
+            self.compact()
+            return
+
+        # Extend the cached arrays with the new segment only.
+        self._gram_counts = np.concatenate(
+            [self._gram_counts, np.bincount(segment.postings - base)]
+        )
+        self._lengths = np.concatenate(
+            [self._lengths, titles["normalized"].str.len_chars().to_numpy()]
+        )
+        self._sorted.append(self.titles["normalized"].gather(segment.order))
+
+    def compact(self) -> None:
+        """Merge all segments into one."""
+        self.segments = [Segment.build(self.titles["normalized"], 0)]
+        self._refresh()
+
+    def _results(self, ids: np.ndarray, scores: np.ndarray) -> pl.DataFrame:
+        """Create the result frame for ranked title ids.
+
+        Parameters
+        ----------
+        ids : np.ndarray
+            Ranked title ids.
+        scores : np.ndarray
+            Score of each title id.
+
+        Returns
+        -------
+        pl.DataFrame
+            Indexed title columns (without `normalized`) and a `score` column.
+        """
+        return (
+            self.titles.gather(ids)
+            .drop("normalized")
+            .with_columns(pl.Series("score", scores, dtype=pl.Float64))
+        )
+
+    def search(self, query: str, k: int = 10, min_score: float = 0.0) -> pl.DataFrame:
+        """Find the titles most similar to `query`.
+
+        Similarity is the Dice coefficient of the trigram sets of the normalized
+        query and title: `2 * shared / (query trigrams + title trigrams)`.
+
+        Parameters
+        ----------
+        query : str
+            Title query.
+        k : int, optional
+            Maximum number of results, by default 10.
+        min_score : float, optional
+            Minimum similarity of the results, by default 0.0.
+
+        Returns
+        -------
+        pl.DataFrame
+            Up to `k` titles ranked by descending `score`.
+        """
+        _, grams = query_trigrams(query)
+        postings = np.concatenate([s.lookup(grams) for s in self.segments])
+        if not len(postings):
+            return self._results(np.empty(0, dtype=np.uint32), np.empty(0))
+        postings.sort()
+        starts = np.flatnonzero(np.concatenate(([True], postings[1:] != postings[:-1])))
+        ids = postings[starts]
+        shared = np.diff(np.append(starts, len(postings)))
+        scores = 2 * shared / (len(grams) + self._gram_counts[ids])
+
+        keep = scores >= min_score
+        ids, scores = ids[keep], scores[keep]
+        if len(ids) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            ids, scores = ids[top], scores[top]
+        # Sort by descending score, ties broken by title id.
+        order = np.lexsort((ids, -scores))
+        return self._results(ids[order], scores[order])
+
+    def prefix_search(self, prefix: str, k: int = 10) -> pl.DataFrame:
+        """Find the titles starting with `prefix`.
+
+        Parameters
+        ----------
+        prefix : str
+            Title prefix.
+        k : int, optional
+            Maximum number of results, by default 10.
+
+        Returns
+        -------
+        pl.DataFrame
+            Up to `k` matching titles, shortest (closest to the prefix) first. The
+            `score` is the fraction of the title covered by the prefix.
+        """
+        normalized, _ = query_trigrams(prefix)
+        matches = []
+        for segment, sorted_titles in zip(self.segments, self._sorted):
+            lo = sorted_titles.search_sorted(normalized, side="left")
+            hi = sorted_titles.search_sorted(normalized + "\U0010ffff", side="left")
+            matches.append(segment.order[lo:hi])
+        ids = np.sort(np.concatenate(matches))
+
+        lengths = self._lengths[ids]
+        order = np.argsort(lengths, kind="stable")[:k]
+        scores = len(normalized) / np.maximum(lengths[order], 1)
+        return self._results(ids[order], scores)
+
+    def save(self, path: Path | str) -> None:
+        """Save the index to the directory `path`.
+
+        Parameters
+        ----------
+        path : Path | str
+            Directory the index is written to. It is created if needed.
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        self.titles.write_parquet(path / "titles.parquet")
+        for i, segment in enumerate(self.segments):
+            for name in ("grams", "offsets", "postings", "order"):
+                np.save(path / f"segment-{i}-{name}.npy", getattr(segment, name))
+        (path / "index.json").write_text(
+            json.dumps(
+                {
+                    "format_version": format_version,
+                    "segments": len(self.segments),
+                    "max_segments": self.max_segments,
+                }
+            )
+        )
+
+    @classmethod
+    def load(cls, path: Path | str) -> "TitleIndex":
+        """Load an index saved with `save`.
+
+        The posting arrays are memory-mapped, so loading does not read them.
+
+        Parameters
+        ----------
+        path : Path | str
+            Directory the index was saved to.
+
+        Returns
+        -------
+        TitleIndex
+            The loaded index.
+        """
+        path = Path(path)
+        meta = json.loads((path / "index.json").read_text())
+        if meta["format_version"] != format_version:
+            raise ValueError(
+                f"Unsupported title index format version {meta['format_version']}."
+            )
+        segments = [
+            Segment(
+                **{
+                    name: np.load(path / f"segment-{i}-{name}.npy", mmap_mode="r")
+                    for name in ("grams", "offsets", "postings", "order")
+                }
+            )
+            for i in range(meta["segments"])
+        ]
+        return cls(
+            pl.read_parquet(path / "titles.parquet"), segments, meta["max_segments"]
+        )
+
+
+def build_title_index() -> TitleIndex:
+    """Build a title index over the titles of both bundled catalogs.
+
+    Returns
+    -------
+    TitleIndex
+        Index over `series_title` of `imdb_top_1000.csv` and `movie_title` of
+        `movie_metadata.csv`.
+    """
+    return TitleIndex.build(load_titles())
@@ -17,19 +17,14 @@ def _():
     from pathlib import Path
 
     import marimo as mo
-    import matplotlib.pyplot as plt
-    import numpy as np
-    import plotly.express as px
-    import plotly.graph_objects as go
     import polars as pl
     import polars.selectors as cs
-    import seaborn as sns
-    from great_tables import GT
-    from plotly.subplots import make_subplots
     from itertools import product
 
+    # Plotting libraries (and numpy) are imported next to the cells that use them, so
+    # they are only loaded once a chart runs.
     pl.Config.set_tbl_rows(25)
-    return Path, cs, go, make_subplots, mo, np, pl, product, px
+    return Path, cs, mo, pl, product
 
 
 @app.cell(hide_code=True)
@@ -295,6 +290,14 @@ def _(mo):
     return
 
 
+@app.cell
+def _():
+    import plotly.express as px
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+    return go, make_subplots, px
+
+
 @app.cell
 def _(cs, go, make_subplots, mm, mo, product):
     # Select only the numeric columns.
@@ -623,7 +626,9 @@ def _(mo):
 
 
 @app.cell
-def _(mm, np, pl):
+def _(mm, pl):
+    import numpy as _np
+
     min = 7.5
     max = 9.5
     # min = mm["imdb_rating"].min()
@@ -631,7 +636,7 @@ def _(mm, np, pl):
     width = 0.5
     n_bins = 5
 
-    breaks = np.linspace(min, max, n_bins)
+    breaks = _np.linspace(min, max, n_bins)
 
     a = (
         mm.select(
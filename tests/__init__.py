@@ -0,0 +1 @@
+"""Tests of the movie_metadata package."""
@@ -0,0 +1,36 @@
+"""Fixtures shared by the equivalence and performance tests."""
+
+from pathlib import Path
+
+import pytest
+
+from movie_metadata.catalog import imdb_top_1000_path
+from tests.synthetic import write_synthetic_catalog
+
+# Number of rows of the synthetic catalog.
+synthetic_rows = 20_000
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Add the `--update-baselines` option of `test_performance.py`."""
+    parser.addoption(
+        "--update-baselines",
+        action="store_true",
+        help="Record the measured timings and peak memory as the new baselines.",
+    )
+
+
+@pytest.fixture(scope="session")
+def synthetic_path(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Path of a synthetic catalog in the format of `imdb_top_1000.csv`."""
+    return write_synthetic_catalog(
+        tmp_path_factory.mktemp("synthetic") / "synthetic.csv", synthetic_rows
+    )
+
+
+@pytest.fixture(scope="session", params=["imdb_top_1000", "synthetic"])
+def imdb_source(request: pytest.FixtureRequest) -> Path:
+    """Each catalog in the format of `imdb_top_1000.csv`."""
+    if request.param == "synthetic":
+        return request.getfixturevalue("synthetic_path")
+    return imdb_top_1000_path
@@ -0,0 +1,81 @@
+"""Cases measured by `test_performance.py`, each run in a fresh interpreter.
+
+Run a case with `python -m tests.perf_cases CASE SOURCE`. It prints, in JSON, the peak
+resident memory of the interpreter after one run of the case and the median wall time
+of the following repeats. The `startup` case only imports the modules and runs a
+trivial query, its peak memory is the share of the other cases that does not depend
+on them.
+"""
+
+import json
+import statistics
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import click
+import polars as pl
+
+from movie_metadata import analysis
+from movie_metadata.catalog import load_catalog, scan_catalog
+from movie_metadata.shrink import shrink
+
+
+def run_analyses(mm: pl.DataFrame) -> None:
+    """Run the analyses of the notebook on `mm`."""
+    analysis.top_directors(mm)
+    analysis.leading_roles(mm)
+    analysis.most_roles(mm)
+    analysis.director_pairings(mm, director=mm["director"][0])
+    analysis.best_per_year(mm)
+    analysis.genre_averages(mm)
+
+
+# Measured cases, called with the path of a catalog in the format of
+# `imdb_top_1000.csv`.
+cases: dict[str, Callable[[Path], object]] = {
+    "startup": lambda source: pl.DataFrame({"a": [1]}).lazy().sum().collect(),
+    "eager_catalog": load_catalog,
+    "lazy_catalog": lambda source: scan_catalog(source).collect(),
+    "streaming_catalog": lambda source: scan_catalog(source).collect(
+        engine="streaming"
+    ),
+    "eager_analyses": lambda source: run_analyses(load_catalog(source)),
+    "shrunk_analyses": lambda source: run_analyses(shrink(load_catalog(source))),
+}
+
+
+def peak_resident_mb() -> float:
+    """Return the peak resident memory of the process in MB."""
+    # `ru_maxrss` is inherited from the forking parent (e.g. pytest) across exec,
+    # `VmHWM` belongs to the address space of this interpreter only.
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 2**10
+    raise RuntimeError("VmHWM is missing from /proc/self/status.")
+
+
+def measure(case: Callable[[Path], object], source: Path, repeat: int) -> dict:
+    """Measure the peak memory of one run of `case` and its median wall time."""
+    case(source)
+    peak_mb = peak_resident_mb()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        case(source)
+        times.append(time.perf_counter() - start)
+    return {"seconds": statistics.median(times), "peak_mb": peak_mb}
+
+
+@click.command()
+@click.argument("case", type=click.Choice(list(cases)))
+@click.argument("source", type=click.Path(exists=True, dir_okay=False))
+@click.option("-r", "--repeat", default=5, show_default=True)
+def main(case: str, source: str, repeat: int) -> None:
+    """Measure CASE on the catalog SOURCE."""
+    click.echo(json.dumps(measure(cases[case], Path(source), repeat)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Synthetic catalogs in the format of `imdb_top_1000.csv`."""
+
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+
+genres = [
+    "Action", "Adventure", "Animation", "Biography", "Comedy", "Crime", "Drama",
+    "Family", "Fantasy", "Film-Noir", "History", "Horror", "Music", "Musical",
+    "Mystery", "Romance", "Sci-Fi", "Sport", "Thriller", "War", "Western",
+]  # fmt: skip
+certificates = ["A", "U", "UA", "R", "PG-13", "PG", "G", "Passed", "Approved", None]
+
+
+def synthetic_catalog(n: int, seed: int = 0) -> pl.DataFrame:
+    """Generate `n` raw rows in the format of `imdb_top_1000.csv`.
+
+    The rows cover the quirks the transformations handle: a "PG" release year,
+    runtimes with a " min" suffix, comma separated genres and gross values, missing
+    gross values and meta scores, and titles with commas, quotes and accents.
+
+    Parameters
+    ----------
+    n : int
+        Number of rows.
+    seed : int, optional
+        Seed of the random generator, by default 0.
+
+    Returns
+    -------
+    pl.DataFrame
+        String columns named as in `imdb_top_1000.csv`.
+    """
+    rng = np.random.default_rng(seed)
+    people = [f"Person {i}" for i in range(max(50, n // 4))]
+    years = rng.integers(1920, 2024, n).astype(str).astype(object)
+    years[rng.random(n) < 0.001] = "PG"
+    gross = [f"{value:,}" for value in rng.integers(1_000, 900_000_000, n)]
+    patterns = ["Movie {}", "Amélie {}", 'The "Quoted" {}', "Title, with {}"]
+    titles = [str(rng.choice(patterns)).format(i) for i in range(n)]
+    frame = pl.DataFrame(
+        {
+            "Poster_Link": [f"https://example.com/posters/{i}.jpg" for i in range(n)],
+            "Series_Title": titles,
+            "Released_Year": years.tolist(),
+            "Certificate": rng.choice(np.array(certificates, dtype=object), n),
+            "Runtime": [f"{runtime} min" for runtime in rng.integers(45, 240, n)],
+            "Genre": [
+                ", ".join(rng.choice(genres, rng.integers(1, 4), replace=False))
+                for _ in range(n)
+            ],
+            "IMDB_Rating": rng.integers(76, 94, n) / 10,
+            "Overview": [f"Overview of movie {i}, a story." for i in range(n)],
+            "Meta_score": rng.integers(28, 101, n),
+            "Director": rng.choice(people, n),
+            "Star1": rng.choice(people, n),
+            "Star2": rng.choice(people, n),
+            "Star3": rng.choice(people, n),
+            "Star4": rng.choice(people, n),
+            "No_of_Votes": rng.integers(25_000, 2_500_000, n),
+            "Gross": gross,
+        }
+    )
+    return frame.with_columns(
+        pl.when(pl.Series(rng.random(n) < 0.15))
+        .then(None)
+        .otherwise(pl.col("Gross"))
+        .alias("Gross"),
+        pl.when(pl.Series(rng.random(n) < 0.15))
+        .then(None)
+        .otherwise(pl.col("Meta_score"))
+        .alias("Meta_score"),
+    )
+
+
+def write_synthetic_catalog(path: Path, n: int, seed: int = 0) -> Path:
+    """Write `synthetic_catalog(n, seed)` as a CSV file at `path`."""
+    synthetic_catalog(n, seed).write_csv(path)
+    return path
@@ -0,0 +1,119 @@
+"""Normalized tables of the catalog and their SQLite export."""
+
+import sqlite3
+from pathlib import Path
+
+import polars as pl
+import pytest
+
+from movie_metadata.catalog import load_catalog
+from movie_metadata.database import export_sqlite, movies_of_person, normalize
+
+
+@pytest.fixture(scope="module")
+def mm() -> pl.DataFrame:
+    """Small catalog where people direct and star in several movies."""
+    return pl.DataFrame(
+        {
+            "series_title": ["Heat", "The Insider", "Ronin", "Collateral"],
+            "released_year": [1995, 1999, 1998, 2004],
+            "runtime": [170, 157, 122, 120],
+            "gross": [67_436_818, 28_965_197, None, 101_005_703],
+            "meta_score": [76, 84, 67, 84],
+            "imdb_rating": [8.3, 7.8, 7.2, 7.5],
+            "no_of_votes": [577_113, 162_161, 196_416, 533_316],
+            "director": ["Michael Mann", "Michael Mann", "John Frankenheimer", None],
+            "star1": ["Al Pacino", "Al Pacino", "Robert De Niro", "Tom Cruise"],
+            "star2": ["Robert De Niro", "Russell Crowe", "Jean Reno", "Jamie Foxx"],
+            "star3": ["Val Kilmer", "Christopher Plummer", None, "Michael Mann"],
+            "star4": ["Jon Voight", "Diane Venora", "Natascha McElhone", None],
+            "genre": [
+                ["Action", "Crime", "Drama"],
+                ["Biography", "Drama", "Drama"],
+                ["Action", "Crime", "Thriller"],
+                ["Action", None, "Crime"],
+            ],
+        }
+    )
+
+
+def test_people_are_unique(mm: pl.DataFrame) -> None:
+    """Every person is stored once, numbered in name order."""
+    people = normalize(mm)["people"]
+    assert people["name"].is_unique().all()
+    assert people["name"].is_sorted()
+    assert people["person_id"].to_list() == list(range(1, people.height + 1))
+    names = pl.concat(
+        [mm[col] for col in ["director", "star1", "star2", "star3", "star4"]]
+    )
+    assert people["name"].to_list() == names.drop_nulls().unique().sort().to_list()
+
+
+def test_roles_carry_the_billing_order(mm: pl.DataFrame) -> None:
+    """Directors are billed 0 and the stars 1 to 4 in column order."""
+    tables = normalize(mm)
+    credits = tables["movie_people"].join(tables["people"], on="person_id")
+    directors = credits.filter(pl.col("role") == "director")
+    assert directors["billing"].to_list() == [0, 0, 0]
+    stars = credits.filter(pl.col("movie_id") == 3, pl.col("role") == "star").sort(
+        "billing"
+    )
+    assert stars.select("billing", "name").rows() == [
+        (1, "Robert De Niro"),
+        (2, "Jean Reno"),
+        (4, "Natascha McElhone"),
+    ]
+    # The same person can be credited with both roles.
+    mann = credits.filter(pl.col("name") == "Michael Mann").sort("movie_id")
+    assert mann.select("movie_id", "role", "billing").rows() == [
+        (1, "director", 0),
+        (2, "director", 0),
+        (4, "star", 3),
+    ]
+    assert not credits.select("movie_id", "role", "billing").is_duplicated().any()
+
+
+def test_genres_are_unique(mm: pl.DataFrame) -> None:
+    """Repeated and null genres of a movie are dropped."""
+    genres = normalize(mm)["movie_genres"]
+    assert not genres.is_duplicated().any()
+    assert genres.filter(pl.col("movie_id") == 2)["genre"].to_list() == [
+        "Biography",
+        "Drama",
+    ]
+    assert genres.filter(pl.col("movie_id") == 4)["genre"].to_list() == [
+        "Action",
+        "Crime",
+    ]
+
+
+def test_export_row_counts(tmp_path: Path) -> None:
+    """Every table of the bundled catalog is loaded with all of its rows."""
+    catalog = load_catalog()
+    path = tmp_path / "catalog.sqlite"
+    counts = export_sqlite(catalog, path, batch_size=300)
+    assert counts == {name: table.height for name, table in normalize(catalog).items()}
+    assert counts["movies"] == catalog.height
+    with sqlite3.connect(path) as connection:
+        for name, count in counts.items():
+            assert connection.execute(f"SELECT COUNT(*) FROM {name}").fetchone() == (
+                count,
+            )
+    assert [p.name for p in tmp_path.iterdir()] == ["catalog.sqlite"]
+
+
+def test_movies_of_person(mm: pl.DataFrame, tmp_path: Path) -> None:
+    """A person's movies are listed by release year with their roles."""
+    path = tmp_path / "catalog.sqlite"
+    export_sqlite(mm, path)
+    with sqlite3.connect(path) as connection:
+        assert movies_of_person(connection, "Michael Mann") == [
+            ("Heat", 1995, "director", 0),
+            ("The Insider", 1999, "director", 0),
+            ("Collateral", 2004, "star", 3),
+        ]
+        assert movies_of_person(connection, "Robert De Niro") == [
+            ("Heat", 1995, "star", 2),
+            ("Ronin", 1998, "star", 1),
+        ]
+        assert movies_of_person(connection, "Nobody") == []
@@ -0,0 +1,29 @@
+"""Duplicate detection on small frames."""
+
+import polars as pl
+
+from movie_metadata.dedupe import find_duplicates
+
+
+def test_no_candidate_pairs() -> None:
+    """Records sharing no block give empty pairs and clusters."""
+    frame = pl.DataFrame(
+        {"title": ["Avatar", "Titanic"], "released_year": [2009, 1997]}
+    )
+    pairs, clusters = find_duplicates(frame)
+    assert pairs.is_empty()
+    assert pairs.columns == ["left", "right", "score", "year_diff"]
+    assert clusters.is_empty()
+
+
+def test_duplicates_are_clustered() -> None:
+    """Case, spacing and a one year difference still match."""
+    frame = pl.DataFrame(
+        {
+            "title": ["The Matrix", "THE MATRIX ", "Titanic", "the matrix"],
+            "released_year": [1999, 1999, 1997, 2000],
+        }
+    )
+    _, clusters = find_duplicates(frame)
+    assert clusters["row"].to_list() == [0, 1, 3]
+    assert clusters["cluster"].n_unique() == 1
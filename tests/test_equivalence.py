@@ -0,0 +1,178 @@
+"""The optimized pipelines produce the same frames as the eager notebook logic.
+
+The eager `load_catalog` and the `analysis` functions are the reference. Every other
+way of building or reading the catalog (lazy and streaming scans, the shared Arrow
+generations, the partitioned dataset, the shrunk and categorical types, the cached
+relationship tables) must give the same frame, on the bundled catalogs and on a
+synthetic catalog (see the `imdb_source` fixture).
+"""
+
+from pathlib import Path
+from typing import Literal
+
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from movie_metadata import analysis
+from movie_metadata.catalog import (
+    FrameT,
+    extract,
+    load_catalog,
+    load_movie_metadata,
+    movie_metadata_path,
+    scan_catalog,
+    scan_extract,
+    transform,
+)
+from movie_metadata.dataset import scan_dataset, write_dataset
+from movie_metadata.relationships import summarize
+from movie_metadata.shared import generation_path, map_ipc, publish
+from movie_metadata.shrink import shrink
+
+# Columns of people, cast to categorical in the categorical variant of the catalog.
+people_cols = ["director", "star1", "star2", "star3", "star4"]
+
+# Analyses compared by `test_analysis`.
+analyses = [
+    "top_directors",
+    "leading_roles",
+    "most_roles",
+    "director_pairings",
+    "best_per_year",
+    "genre_averages",
+]
+
+
+def run_analysis(name: str, mm: FrameT, eager: pl.DataFrame) -> FrameT:
+    """Run the analysis `name` on a variant `mm` of the catalog.
+
+    The parameters are taken from the eager catalog. `n` is large enough to return
+    every row so that ties in the counts cannot change which rows are kept.
+    """
+    if name == "top_directors":
+        return analysis.top_directors(mm, n=eager.height)
+    if name == "leading_roles":
+        return analysis.leading_roles(mm, n=eager.height)
+    if name == "most_roles":
+        return analysis.most_roles(mm, n=4 * eager.height)
+    if name == "director_pairings":
+        director = eager["director"].mode().sort()[0]
+        return analysis.director_pairings(mm, director=director, n=4 * eager.height)
+    if name == "best_per_year":
+        return analysis.best_per_year(mm, 1900, 2100)
+    if name == "genre_averages":
+        return analysis.genre_averages(mm)
+    raise ValueError(f"Unknown analysis '{name}'.")
+
+
+def assert_same_rows(left: pl.DataFrame, right: pl.DataFrame, **kwargs) -> None:
+    """Assert that two frames hold the same rows, in any order."""
+    assert_frame_equal(left, right, check_row_order=False, **kwargs)
+
+
+@pytest.fixture(scope="module")
+def eager(imdb_source: Path) -> pl.DataFrame:
+    """Build the reference catalog eagerly, as in the notebook."""
+    return load_catalog(imdb_source)
+
+
+@pytest.mark.parametrize("engine", ["in-memory", "streaming"])
+def test_scan_catalog(
+    imdb_source: Path, eager: pl.DataFrame, engine: Literal["in-memory", "streaming"]
+) -> None:
+    """The lazy catalog collects to the eager one on both engines."""
+    assert_frame_equal(scan_catalog(imdb_source).collect(engine=engine), eager)
+
+
+def test_scan_extract(imdb_source: Path) -> None:
+    """The lazy extract collects to the eager one."""
+    assert_frame_equal(scan_extract(imdb_source).collect(), extract(imdb_source))
+
+
+def test_lazy_transform_of_eager_extract(
+    imdb_source: Path, eager: pl.DataFrame
+) -> None:
+    """The transformations give the same frame on a lazy frame."""
+    assert_frame_equal(transform(extract(imdb_source).lazy()).collect(), eager)
+
+
+def test_runtime_suffix(imdb_source: Path) -> None:
+    """Stripping the runtime characters removes exactly the " min" suffix."""
+    # `strip_chars_end` removes any trailing " ", "m", "i" and "n" characters, not the
+    # " min" suffix. Both agree as long as every runtime is digits followed by " min".
+    runtime = extract(imdb_source)["runtime"]
+    assert runtime.str.contains(r"^\d+ min$").all()
+    assert_frame_equal(
+        runtime.str.strip_chars_end(characters=" min").to_frame(),
+        runtime.str.strip_suffix(" min").to_frame(),
+    )
+
+
+def test_shared_generation(
+    imdb_source: Path, eager: pl.DataFrame, tmp_path: Path
+) -> None:
+    """A published generation maps back to the catalog."""
+    generation = publish(eager, tmp_path)
+    assert_frame_equal(map_ipc(generation_path(tmp_path, generation)), eager)
+
+
+def test_dataset(eager: pl.DataFrame, tmp_path: Path) -> None:
+    """The partitioned dataset holds the rows of the catalog."""
+    write_dataset(eager, tmp_path / "dataset")
+    dataset = scan_dataset(tmp_path / "dataset").drop("decade").collect()
+    assert_same_rows(dataset.select(eager.columns), eager)
+
+
+def test_shrink(eager: pl.DataFrame) -> None:
+    """The shrunk catalog is smaller and casts back to the catalog."""
+    shrunk = shrink(eager, max_categorical_ratio=1.0)
+    assert shrunk.estimated_size() < eager.estimated_size()
+    # The Float32 ratings only match the Float64 ones up to single precision.
+    assert_frame_equal(shrunk.cast(eager.schema), eager, rel_tol=1e-6)
+
+
+@pytest.mark.parametrize("name", analyses)
+@pytest.mark.parametrize("variant", ["lazy", "categorical", "shrunk"])
+def test_analysis(eager: pl.DataFrame, name: str, variant: str) -> None:
+    """Every analysis gives the same rows on the variants of the catalog."""
+    expected = run_analysis(name, eager, eager)
+    if variant == "lazy":
+        result = run_analysis(name, eager.lazy(), eager).collect()
+    elif variant == "categorical":
+        result = run_analysis(
+            name, eager.with_columns(pl.col(people_cols).cast(pl.Categorical)), eager
+        )
+    else:
+        # Averages of the single precision ratings can round differently, only the
+        # other columns are shrunk.
+        shrunk = shrink(eager, max_categorical_ratio=1.0)
+        result = run_analysis(name, shrunk.with_columns(eager["imdb_rating"]), eager)
+    # The engines sum the ratings in different orders, a mean close to a rounding
+    # boundary (e.g. 8.075) can round to either side.
+    assert_same_rows(result.cast(expected.schema), expected, abs_tol=0.0101)
+
+
+def test_relationship_cache(eager: pl.DataFrame, tmp_path: Path) -> None:
+    """Cached relationship tables equal the computed ones."""
+    expected = summarize(eager)
+    for _ in range(2):  # Fill the cache, then read from it.
+        cached = summarize(eager, cache_dir=tmp_path)
+        assert cached.keys() == expected.keys()
+        for name, table in expected.items():
+            assert_frame_equal(cached[name], table)
+
+
+@pytest.mark.parametrize("engine", ["in-memory", "streaming"])
+def test_scan_movie_metadata(engine: Literal["in-memory", "streaming"]) -> None:
+    """The lazy `movie_metadata.csv` collects to the eager one on both engines."""
+    eager = load_movie_metadata()
+    assert_frame_equal(pl.scan_csv(movie_metadata_path).collect(engine=engine), eager)
+
+
+def test_shrink_movie_metadata() -> None:
+    """The shrunk `movie_metadata.csv` is smaller and casts back to the original."""
+    eager = load_movie_metadata()
+    shrunk = shrink(eager, max_categorical_ratio=1.0)
+    assert shrunk.estimated_size() < eager.estimated_size()
+    assert_frame_equal(shrunk.cast(eager.schema), eager, rel_tol=1e-6)
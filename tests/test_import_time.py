@@ -0,0 +1,14 @@
+"""Import times of the notebook and library modules within their budgets."""
+
+import pytest
+from click.testing import CliRunner
+
+from benchmarks import import_time
+
+pytestmark = pytest.mark.performance
+
+
+def test_import_time_budgets() -> None:
+    """Every target imports within its default budget."""
+    result = CliRunner().invoke(import_time.main, ["--repeat", "3"])
+    assert result.exit_code == 0, result.output
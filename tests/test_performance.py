@@ -0,0 +1,106 @@
+"""Timing and memory of the pipelines against the stored baselines.
+
+Every case of `perf_cases.py` runs in a fresh interpreter on a synthetic catalog. Its
+memory is the peak resident memory of the interpreter minus the peak of the `startup`
+case (imports and engine start-up), so only what the case allocates is compared. A
+case fails if its median time or its memory exceeds the baseline in `baselines.json`
+by more than the tolerance.
+
+The baselines depend on the machine, so the tests are deselected by default. Run them
+with `python -m pytest -m performance`, and record new baselines after an intended
+change or on a new machine with `python -m pytest -m performance --update-baselines`.
+Cases without a baseline are skipped.
+"""
+
+import json
+import subprocess
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from tests.perf_cases import cases
+from tests.synthetic import write_synthetic_catalog
+
+pytestmark = pytest.mark.performance
+
+# File of the stored baselines.
+baselines_path = Path(__file__).parent / "baselines.json"
+
+# Number of rows of the synthetic catalog the cases run on.
+perf_rows = 100_000
+
+# Allowed slowdown: a factor and an absolute margin for the noise of short cases.
+time_factor = 2.0
+time_margin = 0.05
+
+# Allowed memory growth: a factor and an absolute margin in MB for allocator noise.
+memory_factor = 1.5
+memory_margin = 32.0
+
+
+def run_case(case: str, source: Path) -> dict[str, float]:
+    """Measure `case` on `source` in a fresh interpreter."""
+    output = subprocess.run(
+        [sys.executable, "-m", "tests.perf_cases", case, str(source)],
+        capture_output=True,
+        check=True,
+        text=True,
+        cwd=Path(__file__).parent.parent,
+    ).stdout
+    return json.loads(output)
+
+
+@pytest.fixture(scope="module")
+def perf_source(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Path of the synthetic catalog the cases run on."""
+    return write_synthetic_catalog(
+        tmp_path_factory.mktemp("performance") / "synthetic.csv", perf_rows
+    )
+
+
+@pytest.fixture(scope="module")
+def startup_mb(perf_source: Path) -> float:
+    """Peak memory of an interpreter that only starts up, in MB."""
+    return run_case("startup", perf_source)["peak_mb"]
+
+
+@pytest.fixture(scope="module")
+def baselines(request: pytest.FixtureRequest) -> Iterator[dict]:
+    """Load the stored baselines, written back at the end with `--update-baselines`."""
+    stored = json.loads(baselines_path.read_text()) if baselines_path.exists() else {}
+    yield stored
+    if request.config.getoption("--update-baselines"):
+        baselines_path.write_text(json.dumps(stored, indent=2, sort_keys=True) + "\n")
+
+
+@pytest.mark.parametrize("case", [case for case in cases if case != "startup"])
+def test_performance(
+    case: str,
+    perf_source: Path,
+    startup_mb: float,
+    baselines: dict,
+    request: pytest.FixtureRequest,
+) -> None:
+    """The time and memory of `case` stay within the tolerance of its baseline."""
+    measured = run_case(case, perf_source)
+    seconds = measured["seconds"]
+    allocated_mb = max(measured["peak_mb"] - startup_mb, 0.0)
+
+    if request.config.getoption("--update-baselines"):
+        baselines[case] = {
+            "seconds": round(seconds, 4),
+            "allocated_mb": round(allocated_mb, 1),
+        }
+        return
+    if case not in baselines:
+        pytest.skip(f"no baseline for {case}")
+
+    baseline = baselines[case]
+    time_limit = baseline["seconds"] * time_factor + time_margin
+    memory_limit = baseline["allocated_mb"] * memory_factor + memory_margin
+    assert seconds <= time_limit, f"{case} took {seconds:.3f}s, limit {time_limit:.3f}s"
+    assert (
+        allocated_mb <= memory_limit
+    ), f"{case} allocated {allocated_mb:.1f} MB, limit {memory_limit:.1f} MB"
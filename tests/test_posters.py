@@ -0,0 +1,129 @@
+"""Poster fetcher against a local stand-in server, and its command line."""
+
+import asyncio
+import hashlib
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from benchmarks.poster_fetch import StandInServer
+from movie_metadata import posters
+from movie_metadata.posters import PosterCache
+
+# Size of the images served by the stand-in server, in bytes.
+image_size = 256
+
+
+@pytest.fixture(scope="module")
+def server() -> Iterator[StandInServer]:
+    """Stand-in server answering instantly, its failure rate is set per test."""
+    server = StandInServer(latency=0.0, failure_rate=0.0, size=image_size)
+    server.start()
+    yield server
+    server.failure_rate = 0.0
+
+
+def urls_of(server: StandInServer, n: int) -> list[str]:
+    """Return `n` distinct image URLs of `server`."""
+    return [f"http://127.0.0.1:{server.port}/posters/{i}.jpg" for i in range(n)]
+
+
+def fetch(urls: list[str], cache_dir: Path, **kwargs) -> posters.FetchReport:
+    """Fetch `urls` into the cache at `cache_dir`."""
+    return asyncio.run(posters.fetch_posters(urls, PosterCache(cache_dir), **kwargs))
+
+
+def test_retries_with_backoff(server: StandInServer, tmp_path: Path) -> None:
+    """Failed requests are retried after doubling delays, then reported."""
+    server.failure_rate = 1.0
+    urls = urls_of(server, 3)
+    requests = server.requests
+    start = time.perf_counter()
+    report = fetch(urls, tmp_path, retries=2, backoff=0.05)
+    elapsed = time.perf_counter() - start
+    server.failure_rate = 0.0
+
+    assert report.fetched == 0
+    assert sorted(report.failed) == urls
+    assert all("503" in error for error in report.failed.values())
+    assert report.retries == 2 * len(urls)
+    assert server.requests - requests == 3 * len(urls)
+    # Delays of 0.05s then 0.1s before the two retries.
+    assert elapsed >= 0.15
+
+
+def test_resume(server: StandInServer, tmp_path: Path) -> None:
+    """A new run fetches only the URLs missing from the cache of the last run."""
+    urls = urls_of(server, 6)
+    first = fetch(urls[:4], tmp_path)
+    assert (first.fetched, first.cached) == (4, 0)
+
+    # A run killed while appending to the index leaves a partial line.
+    with (tmp_path / "index.jsonl").open("a") as f:
+        f.write('{"url": "http://127.0.0.1')
+    requests = server.requests
+    resumed = fetch(urls, tmp_path)
+    assert (resumed.fetched, resumed.cached) == (2, 4)
+    assert server.requests - requests == 2
+    cache = PosterCache(tmp_path)
+    assert all(url in cache for url in urls)
+    assert cache.get(urls[0]) == server.body("/posters/0.jpg")
+
+
+def test_identical_images_are_stored_once(
+    server: StandInServer, tmp_path: Path
+) -> None:
+    """URLs serving the same bytes share one object of the cache."""
+    # The fragment is not sent, both URLs are served the same image.
+    urls = [f"{urls_of(server, 1)[0]}#{i}" for i in range(3)]
+    report = fetch([*urls, urls[0]], tmp_path)
+    assert report.fetched == 3
+    assert report.bytes == 3 * image_size
+    objects = [path for path in (tmp_path / "objects").rglob("*") if path.is_file()]
+    assert len(objects) == 1
+    assert objects[0].name == hashlib.sha256(server.body("/posters/0.jpg")).hexdigest()
+
+
+def test_failures_do_not_stop_the_run(server: StandInServer, tmp_path: Path) -> None:
+    """Invalid URLs and failed cache writes fail their URL only."""
+    urls = urls_of(server, 3)
+    # A file where the object directory of the first image goes fails its write.
+    digest = hashlib.sha256(server.body("/posters/0.jpg")).hexdigest()
+    PosterCache(tmp_path)
+    (tmp_path / "objects" / digest[:2]).write_bytes(b"")
+    invalid = "http://127.0.0.1:port/poster.jpg"
+
+    report = fetch([invalid, *urls], tmp_path)
+    assert sorted(report.failed) == sorted([invalid, urls[0]])
+    assert "InvalidURL" in report.failed[invalid]
+    assert "FileExistsError" in report.failed[urls[0]]
+    assert report.fetched == 2
+
+
+@pytest.fixture
+def fetched(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    """URLs passed to `fetch_posters`, which is replaced by a stand-in."""
+    urls: list[str] = []
+
+    async def fetch_posters(
+        urls_to_fetch: list[str], cache: posters.PosterCache, **kwargs
+    ) -> posters.FetchReport:
+        urls.extend(urls_to_fetch)
+        return posters.FetchReport()
+
+    monkeypatch.setattr(posters, "fetch_posters", fetch_posters)
+    return urls
+
+
+@pytest.mark.parametrize("limit", [None, 5])
+def test_main(fetched: list[str], tmp_path: Path, limit: int | None) -> None:
+    """`--limit` fetches the first posters only."""
+    args = ["--cache", str(tmp_path / "posters")]
+    if limit is not None:
+        args += ["--limit", str(limit)]
+    result = CliRunner().invoke(posters.main, args)
+    assert result.exit_code == 0, result.output
+    assert len(fetched) == (limit or posters.poster_urls().height)
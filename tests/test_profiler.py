@@ -0,0 +1,61 @@
+"""Column profiles of frames and CSV files."""
+
+from pathlib import Path
+
+import polars as pl
+
+from movie_metadata.profiler import profile
+
+
+def test_numeric_strings_min_max() -> None:
+    """Strings that all cast to numbers are compared as numbers."""
+    frame = pl.DataFrame(
+        {
+            "score": ["99", "100", None, "7"],
+            "rating": ["8.5", "10", "9.25", "7.5"],
+            "runtime": ["99 min", "100 min", "7 min", None],
+        }
+    )
+    result = profile(frame).select("column", "min", "max").rows()
+    assert result == [
+        ("score", "7", "100"),
+        ("rating", "7.5", "10"),
+        # Values that are not numbers are compared as strings.
+        ("runtime", "100 min", "99 min"),
+    ]
+
+
+def test_csv_columns_are_compared_as_numbers(tmp_path: Path) -> None:
+    """CSV columns are read as strings, their numbers are compared as numbers."""
+    path = tmp_path / "scores.csv"
+    pl.DataFrame({"Meta_score": [100, 99, 45]}).write_csv(path)
+    assert profile(path).select("min", "max").row(0) == ("45", "100")
+
+
+def test_casts_that_change_values_fail() -> None:
+    """Values truncated, out of range or rounded by a cast count as failures."""
+    frame = pl.DataFrame(
+        {
+            "rating": [8.5, 9.25, 1e30, None],
+            "votes": [2**53 + 1, 1, 2, 3],
+            "year": [1999.0, 2000.0, 2001.0, None],
+            "score": ["10", "8.5", "x", None],
+        }
+    )
+    result = profile(frame).select(
+        "int64_failures", "int64_example", "float64_failures", "float64_example"
+    )
+    assert result.rows() == [
+        (3, "8.5", 0, None),
+        (0, None, 1, str(2**53 + 1)),
+        (0, None, 0, None),
+        # Strings are parsed, "10" is an integer and a float.
+        (2, "8.5", 1, "x"),
+    ]
+
+
+def test_distinct_is_at_most_count() -> None:
+    """The distinct estimate never exceeds the number of values."""
+    # A sketch of 16 registers estimates these 5 values as 6.
+    frame = pl.DataFrame({"id": [0, 1, 2, 3, 4, None]})
+    assert profile(frame, precision=4)["distinct_approx"].item() == 5
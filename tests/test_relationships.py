@@ -0,0 +1,59 @@
+"""Correlations of the catalog measures against `scipy.stats`."""
+
+from itertools import combinations
+
+import numpy as np
+import polars as pl
+import pytest
+from scipy import stats
+
+from movie_metadata.catalog import load_catalog
+from movie_metadata.relationships import correlation_matrix
+
+# Correlation functions of `scipy.stats` by method.
+references = {"pearson": stats.pearsonr, "spearman": stats.spearmanr}
+
+
+@pytest.fixture(scope="module")
+def measures() -> pl.DataFrame:
+    """Numeric columns of the bundled catalog, `gross` and `meta_score` with nulls."""
+    return load_catalog().select(
+        "released_year", "runtime", "gross", "meta_score", "imdb_rating", "no_of_votes"
+    )
+
+
+@pytest.mark.parametrize("method", ["pearson", "spearman"])
+def test_matches_scipy_on_complete_pairs(measures: pl.DataFrame, method: str) -> None:
+    """Every pair matches scipy on the rows where both values are present."""
+    assert measures["gross"].null_count() and measures["meta_score"].null_count()
+    matrix = correlation_matrix(measures, method)
+    assert matrix["column"].to_list() == measures.columns
+    for x, y in combinations(measures.columns, 2):
+        pair = measures.select(x, y).drop_nulls()
+        expected = references[method](pair[x], pair[y]).statistic
+        result = matrix.filter(pl.col("column") == x)[y].item()
+        assert result == pytest.approx(expected, abs=1e-12), (x, y)
+        assert matrix.filter(pl.col("column") == y)[x].item() == result
+
+
+def test_spearman_reranks_pairs_with_nulls() -> None:
+    """Ranks of a column are taken over the rows kept in each pair."""
+    frame = pl.DataFrame(
+        {
+            "x": [1.0, 2.0, 3.0, 4.0, 5.0, 100.0],
+            "y": [2.0, 1.0, 4.0, 3.0, 6.0, None],
+            "z": [5.0, None, 1.0, 2.0, None, 3.0],
+        }
+    )
+    matrix = correlation_matrix(frame, "spearman").drop("column").to_numpy()
+    for (i, x), (j, y) in combinations(enumerate(frame.columns), 2):
+        pair = frame.select(x, y).drop_nulls()
+        expected = stats.spearmanr(pair[x], pair[y]).statistic
+        assert matrix[i, j] == pytest.approx(expected), (x, y)
+    np.testing.assert_array_equal(np.diag(matrix), 1.0)
+
+
+def test_unknown_method(measures: pl.DataFrame) -> None:
+    """Methods other than Pearson and Spearman are rejected."""
+    with pytest.raises(ValueError, match="kendall"):
+        correlation_matrix(measures, "kendall")
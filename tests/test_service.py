@@ -0,0 +1,96 @@
+"""Requests to the catalog query service over a local connection."""
+
+import asyncio
+
+import polars as pl
+import pytest
+
+from movie_metadata.catalog import load_catalog
+from movie_metadata.service import CatalogService, max_body_size
+
+
+async def exchange(
+    request: bytes, mm: pl.DataFrame | None = None, close_write: bool = False
+) -> bytes:
+    """Send `request` to a service on a free port and read until it closes.
+
+    The connection handler must not raise. With `close_write` the client closes its
+    side of the connection after the request.
+    """
+    errors: list[dict] = []
+    asyncio.get_running_loop().set_exception_handler(
+        lambda loop, context: errors.append(context)
+    )
+    service = CatalogService(load_catalog() if mm is None else mm, workers=1)
+    server = await asyncio.start_server(service.handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    async with server:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(request)
+        if close_write:
+            writer.write_eof()
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), timeout=10)
+        writer.close()
+    service.executor.shutdown()
+    assert not errors
+    return response
+
+
+@pytest.mark.parametrize("content_length", ["abc", "-1", "1.5"])
+def test_invalid_content_length(content_length: str) -> None:
+    """A Content-Length that is not a number is rejected and closes the connection."""
+    response = asyncio.run(
+        exchange(
+            b"GET /genre-averages HTTP/1.1\r\n"
+            + f"Content-Length: {content_length}\r\n\r\n".encode()
+        )
+    )
+    assert response.startswith(b"HTTP/1.1 400 Bad Request\r\n")
+    assert b"Connection: close\r\n" in response
+
+
+def test_body_is_consumed() -> None:
+    """The body of a request is skipped before the next request is read."""
+    response = asyncio.run(
+        exchange(
+            b"GET /top-directors?n=1 HTTP/1.1\r\nContent-Length: 4\r\n\r\nbody"
+            + b"GET /top-directors?n=1 HTTP/1.1\r\nConnection: close\r\n\r\n"
+        )
+    )
+    assert response.count(b"HTTP/1.1 200 OK\r\n") == 2
+
+
+def test_truncated_body() -> None:
+    """A client closing before the end of the body ends the connection quietly."""
+    response = asyncio.run(
+        exchange(
+            b"GET /health HTTP/1.1\r\nContent-Length: 10\r\n\r\nab", close_write=True
+        )
+    )
+    assert response == b""
+
+
+def test_body_too_large() -> None:
+    """Bodies above `max_body_size` are refused without being read."""
+    response = asyncio.run(
+        exchange(
+            b"GET /health HTTP/1.1\r\n"
+            + f"Content-Length: {max_body_size + 1}\r\n\r\n".encode()
+        )
+    )
+    assert response.startswith(b"HTTP/1.1 413 Content Too Large\r\n")
+    assert b"Connection: close\r\n" in response
+
+
+def test_internal_error_is_generic(capsys: pytest.CaptureFixture[str]) -> None:
+    """A failing query answers a generic 500 body and logs the details."""
+    response = asyncio.run(
+        exchange(
+            b"GET /genre-averages HTTP/1.1\r\nConnection: close\r\n\r\n",
+            mm=pl.DataFrame({"title": ["Movie"]}),
+        )
+    )
+    assert response.startswith(b"HTTP/1.1 500 Internal Server Error\r\n")
+    assert response.endswith(b'{"error": "Internal server error."}')
+    assert "ColumnNotFoundError" in capsys.readouterr().err
@@ -0,0 +1,58 @@
+"""Generations of the shared catalog, as seen by a publisher and a reader."""
+
+from pathlib import Path
+
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from movie_metadata.shared import (
+    SharedCatalog,
+    current_generation,
+    generation_path,
+    publish,
+)
+
+
+def catalog(version: int) -> pl.DataFrame:
+    """Small stand-in catalog tagged with `version`."""
+    return pl.DataFrame({"series_title": ["A", "B"], "version": [version] * 2})
+
+
+def test_refresh_attaches_to_new_generations(tmp_path: Path) -> None:
+    """A reader switches to a new generation on refresh, and only then."""
+    first = publish(catalog(1), tmp_path)
+    reader = SharedCatalog(tmp_path)
+    assert reader.generation == first
+    assert reader.refresh() is False
+    attached = reader.current()
+
+    second = publish(catalog(2), tmp_path)
+    assert second == first + 1
+    assert_frame_equal(attached, catalog(1))
+    assert reader.refresh() is True
+    assert reader.generation == second
+    assert_frame_equal(reader.current(), catalog(2))
+    assert reader.refresh() is False
+
+
+@pytest.mark.parametrize("keep", [1, 2, 3])
+def test_old_generations_are_removed(tmp_path: Path, keep: int) -> None:
+    """Only the `keep` newest generations stay on disk."""
+    generations = [publish(catalog(i), tmp_path, keep=keep) for i in range(5)]
+    assert current_generation(tmp_path) == generations[-1]
+    kept = [g for g in generations if generation_path(tmp_path, g).exists()]
+    assert kept == generations[-keep:]
+
+
+def test_keep_must_be_positive(tmp_path: Path) -> None:
+    """Publishing without keeping the new generation is rejected."""
+    with pytest.raises(ValueError, match="keep"):
+        publish(catalog(1), tmp_path, keep=0)
+    assert not generation_path(tmp_path, 1).exists()
+
+
+def test_nothing_published(tmp_path: Path) -> None:
+    """Attaching to an empty directory raises `FileNotFoundError`."""
+    with pytest.raises(FileNotFoundError):
+        SharedCatalog(tmp_path)
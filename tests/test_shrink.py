@@ -0,0 +1,35 @@
+"""Type inference, plan checks and memory report of `shrink`."""
+
+import polars as pl
+import pytest
+
+from movie_metadata.shrink import infer_dtypes, memory_report, shrink
+
+
+def test_memory_report_counts_categories() -> None:
+    """Categorical columns are counted with their distinct strings."""
+    before = pl.DataFrame(
+        {"title": [f"Movie title {i % 1000:04}" for i in range(2000)]}
+    )
+    after = before.cast({"title": pl.Categorical})
+    report = memory_report(before, after)
+    codes = after["title"].estimated_size()
+    strings = after["title"].unique().cast(pl.String).estimated_size()
+    assert report["bytes_after"].to_list() == [codes + strings, codes + strings]
+    assert report["saved"][0] < 1 - codes / before.estimated_size()
+
+
+def test_plan_refuses_rounded_floats() -> None:
+    """A Float32 plan is refused for values that Float32 would round."""
+    plan = infer_dtypes(pl.DataFrame({"rating": [8.5, 9.25]}))
+    assert plan["rating"] == pl.Float32
+    shrink(pl.DataFrame({"rating": [7.75, None]}), plan)
+    with pytest.raises(ValueError, match="'rating' 1 values rounded in Float32"):
+        shrink(pl.DataFrame({"rating": [7.75, 8.123456789]}), plan)
+
+
+def test_plan_refuses_integer_overflow() -> None:
+    """An integer plan is refused for values out of its range."""
+    plan = infer_dtypes(pl.DataFrame({"votes": [10, 100]}))
+    with pytest.raises(ValueError, match=r"'votes' \[0, 1000\] in UInt8"):
+        shrink(pl.DataFrame({"votes": [0, 1000]}), plan)
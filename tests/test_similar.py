@@ -0,0 +1,50 @@
+"""Edge cases of the similar movies neighbors."""
+
+import numpy as np
+import polars as pl
+import pytest
+
+from movie_metadata.catalog import load_catalog
+from movie_metadata.similar import (
+    SimilarMovies,
+    build_similar_movies,
+    feature_matrix,
+    top_k_neighbors,
+)
+
+
+def test_single_movie_has_no_neighbors() -> None:
+    """A catalog of one movie has an empty neighbor table."""
+    movies = build_similar_movies(k=1).movies.head(1)
+    similar = SimilarMovies.build(movies)
+    assert similar.neighbors.is_empty()
+    assert similar.similar(movies["series_title"][0]).is_empty()
+
+
+def test_similar_slices_the_ranks() -> None:
+    """`similar` returns the first `k` ranks of the neighbor table."""
+    similar = build_similar_movies(k=5)
+    result = similar.similar("Inception", k=3)
+    assert result["rank"].to_list() == [1, 2, 3]
+    expected = similar.neighbors.filter(
+        pl.col("movie_id") == result["movie_id"][0], pl.col("rank") <= 3
+    )
+    assert result["score"].to_list() == expected["score"].to_list()
+
+
+@pytest.mark.parametrize("max_elements", [1, 500, 1 << 22])
+def test_top_k_matches_brute_force(max_elements: int) -> None:
+    """Blocked top-k gives the `k` largest similarities of the dense matrix."""
+    matrix = feature_matrix(load_catalog().head(80))
+    k = 5
+    neighbors, scores = top_k_neighbors(matrix, k=k, max_elements=max_elements)
+
+    dense = (matrix @ matrix.T).toarray()
+    np.fill_diagonal(dense, -np.inf)
+    expected = -np.sort(-dense, axis=1)[:, :k]
+    np.testing.assert_allclose(scores, expected, rtol=1e-6)
+    # Ties can order the neighbors differently, their similarities must match.
+    np.testing.assert_allclose(
+        np.take_along_axis(dense, neighbors.astype(np.int64), axis=1), scores, rtol=1e-6
+    )
+    assert (neighbors != np.arange(len(neighbors))[:, np.newaxis]).all()
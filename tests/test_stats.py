@@ -0,0 +1,95 @@
+"""Bootstrap confidence intervals of group means."""
+
+import numpy as np
+import polars as pl
+import pytest
+
+from movie_metadata.stats import bootstrap_ci, bootstrap_group_means
+
+
+@pytest.fixture(scope="module")
+def groups() -> pl.DataFrame:
+    """Ratings of groups of sizes 1 to 40, with a null rating and a null group."""
+    rng = np.random.default_rng(0)
+    sizes = [1, 1, 2, 3, 5, 8, 13, 40]
+    return pl.DataFrame(
+        {
+            "director": [f"d{i}" for i, size in enumerate(sizes) for _ in range(size)]
+            + [None, "d0"],
+            "imdb_rating": [*rng.normal(8.0, 0.4, sum(sizes)).round(1), 9.0, None],
+        }
+    )
+
+
+def test_mean_is_within_interval(groups: pl.DataFrame) -> None:
+    """Every interval contains its group mean and narrows with the confidence."""
+    wide = bootstrap_ci(groups, "director", "imdb_rating", n_resamples=2000, seed=1)
+    assert (wide["ci_low"] <= wide["mean"]).all()
+    assert (wide["mean"] <= wide["ci_high"]).all()
+    narrow = bootstrap_ci(
+        groups, "director", "imdb_rating", n_resamples=2000, confidence=0.5, seed=1
+    )
+    assert (narrow["ci_low"] >= wide["ci_low"]).all()
+    assert (narrow["ci_high"] <= wide["ci_high"]).all()
+
+
+def test_nulls_are_ignored(groups: pl.DataFrame) -> None:
+    """Rows with a null group or value are not counted."""
+    result = bootstrap_ci(groups, "director", "imdb_rating", n_resamples=100, seed=0)
+    assert result["director"].to_list() == [f"d{i}" for i in range(8)]
+    assert result["count"].to_list() == [1, 1, 2, 3, 5, 8, 13, 40]
+
+
+def test_single_value_groups(groups: pl.DataFrame) -> None:
+    """The interval of a group of one value is that value."""
+    result = bootstrap_ci(groups, "director", "imdb_rating", n_resamples=100, seed=0)
+    single = result.filter(pl.col("count") == 1)
+    assert single["ci_low"].to_list() == single["mean"].to_list()
+    assert single["ci_high"].to_list() == single["mean"].to_list()
+
+
+def test_same_seed_same_intervals(groups: pl.DataFrame) -> None:
+    """A seed makes the intervals reproducible, another seed changes them."""
+    values = groups.drop_nulls().sort("director")["imdb_rating"].to_numpy()
+    sizes = np.array([1, 1, 2, 3, 5, 8, 13, 40])
+    first = bootstrap_group_means(values, sizes, n_resamples=500, seed=7)
+    again = bootstrap_group_means(values, sizes, n_resamples=500, seed=7)
+    other = bootstrap_group_means(values, sizes, n_resamples=500, seed=8)
+    np.testing.assert_array_equal(first, again)
+    assert not np.array_equal(first, other)
+
+
+def test_blocks_bound_the_draws() -> None:
+    """Small `max_elements` blocks give intervals of the same distribution."""
+    rng = np.random.default_rng(0)
+    values = rng.normal(0.0, 1.0, 300)
+    sizes = np.full(10, 30)
+    low, high = bootstrap_group_means(values, sizes, n_resamples=4000, seed=0)
+    blocked_low, blocked_high = bootstrap_group_means(
+        values, sizes, n_resamples=4000, seed=0, max_elements=100
+    )
+    np.testing.assert_allclose(blocked_low, low, atol=0.05)
+    np.testing.assert_allclose(blocked_high, high, atol=0.05)
+
+
+def test_empty_input() -> None:
+    """No values and no groups give no intervals."""
+    low, high = bootstrap_group_means(np.empty(0), np.empty(0, dtype=np.int64))
+    assert low.shape == high.shape == (0,)
+    result = bootstrap_ci(
+        pl.DataFrame(
+            {"director": [], "imdb_rating": []},
+            schema={"director": pl.String, "imdb_rating": pl.Float64},
+        ),
+        "director",
+        "imdb_rating",
+    )
+    assert result.height == 0
+    assert result.columns == ["director", "count", "mean", "ci_low", "ci_high"]
+
+
+@pytest.mark.parametrize("sizes", [[2, 0, 1], [1, 1], [4, -1]])
+def test_invalid_sizes(sizes: list[int]) -> None:
+    """Empty groups and sizes not summing to the number of values are rejected."""
+    with pytest.raises(ValueError, match="sizes"):
+        bootstrap_group_means(np.arange(3.0), np.array(sizes))
@@ -0,0 +1,27 @@
+"""Saved text indexes search like the index they were built from."""
+
+from pathlib import Path
+
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from movie_metadata.text_index import TextIndex, build_text_index
+
+
+@pytest.fixture(scope="module")
+def index() -> TextIndex:
+    """Text index over both bundled catalogs."""
+    return build_text_index()
+
+
+def test_load_keeps_text_out_of_documents(index: TextIndex, tmp_path: Path) -> None:
+    """A loaded index maps its text separately and searches like the saved one."""
+    index.save(tmp_path)
+    loaded = TextIndex.load(tmp_path)
+    assert "text" not in loaded.documents.columns
+    assert_frame_equal(
+        loaded.search('"world war" love', k=50, where=pl.col("released_year") > 1980),
+        index.search('"world war" love', k=50, where=pl.col("released_year") > 1980),
+    )
+    assert_frame_equal(loaded.search("heist", k=50), index.search("heist", k=50))
@@ -0,0 +1,127 @@
+"""Trigram title search ranks, inserts and persists titles as documented."""
+
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from movie_metadata.title_index import TitleIndex, query_trigrams
+
+# Small catalog of titles with shared trigrams and prefixes.
+titles = pl.DataFrame(
+    {
+        "title": [
+            "The Godfather",
+            "The Godfather: Part II",
+            "Godzilla",
+            "The  Dark   Knight",
+            "The Dark Knight Rises",
+            "Amélie",
+        ],
+        "released_year": [1972, 1974, 1954, 2008, 2012, 2001],
+    }
+)
+
+
+def dice(query: str, title: str) -> float:
+    """Dice coefficient of the trigram sets of `query` and `title`."""
+    _, a = query_trigrams(query)
+    _, b = query_trigrams(title)
+    return 2 * len(np.intersect1d(a, b)) / (len(a) + len(b))
+
+
+@pytest.fixture
+def index() -> TitleIndex:
+    """Title index over `titles` in a single segment."""
+    return TitleIndex.build(titles)
+
+
+def test_search_ranks_by_dice(index: TitleIndex) -> None:
+    """Search scores are the Dice coefficients, in descending order."""
+    result = index.search("the godfather", k=len(titles))
+    assert result["title"][0] == "The Godfather"
+    assert result["score"][0] == pytest.approx(1.0)
+    for title, score in result.select("title", "score").iter_rows():
+        assert score == pytest.approx(dice("the godfather", title))
+    assert result["score"].is_sorted(descending=True)
+    assert index.search("the godfather", k=2).height == 2
+
+
+def test_search_min_score_and_no_match(index: TitleIndex) -> None:
+    """Titles below `min_score` and queries without shared trigrams return none."""
+    result = index.search("godfather", k=len(titles), min_score=0.5)
+    assert (result["score"] >= 0.5).all()
+    assert "Godzilla" not in result["title"]
+    assert index.search("xyzzy").height == 0
+
+
+def test_prefix_search(index: TitleIndex) -> None:
+    """Prefix matches are normalized and ordered shortest first."""
+    result = index.prefix_search("  THE dark ")
+    assert result["title"].to_list() == ["The  Dark   Knight", "The Dark Knight Rises"]
+    assert result["score"][0] == pytest.approx(len("the dark") / len("the dark knight"))
+    assert index.prefix_search("god", k=1)["title"].to_list() == ["Godzilla"]
+    assert index.prefix_search("zzz").height == 0
+
+
+def test_insert_then_compact(index: TitleIndex) -> None:
+    """Inserted titles are found before and after the segments are merged."""
+    index.insert(
+        pl.DataFrame({"title": ["Godzilla Minus One"], "released_year": [2023]})
+    )
+    assert len(index) == len(titles) + 1
+    assert len(index.segments) == 2
+    before = index.search("godzilla", k=len(index))
+    assert before["title"].to_list()[:2] == ["Godzilla", "Godzilla Minus One"]
+    assert index.prefix_search("godz")["title"].to_list() == [
+        "Godzilla",
+        "Godzilla Minus One",
+    ]
+
+    index.compact()
+    assert len(index.segments) == 1
+    assert_frame_equal(index.search("godzilla", k=len(index)), before)
+    assert_frame_equal(
+        index.search("dark knight", k=len(index)),
+        TitleIndex.build(index.titles.drop("normalized")).search(
+            "dark knight", k=len(index)
+        ),
+    )
+
+
+def test_insert_compacts_above_max_segments() -> None:
+    """Inserts merge the segments once there are more than `max_segments`."""
+    index = TitleIndex.build(titles, max_segments=2)
+    for year in (2020, 2021):
+        index.insert(
+            pl.DataFrame({"title": [f"Movie {year}"], "released_year": [year]})
+        )
+    assert len(index.segments) == 1
+    assert index.prefix_search("movie")["released_year"].to_list() == [2020, 2021]
+
+
+def test_save_load_round_trip(index: TitleIndex, tmp_path: Path) -> None:
+    """A loaded index memory-maps its segments and answers like the saved one."""
+    index.insert(pl.DataFrame({"title": ["Amelie"], "released_year": [2001]}))
+    index.save(tmp_path)
+    loaded = TitleIndex.load(tmp_path)
+    assert len(loaded.segments) == 2
+    assert all(isinstance(segment.postings, np.memmap) for segment in loaded.segments)
+    for query in ("amelie", "the dark knight", "godfather part"):
+        assert_frame_equal(
+            loaded.search(query, k=len(index)), index.search(query, k=len(index))
+        )
+    assert_frame_equal(loaded.prefix_search("the"), index.prefix_search("the"))
+
+
+def test_load_rejects_other_format_version(index: TitleIndex, tmp_path: Path) -> None:
+    """Loading an index of another layout version raises a `ValueError`."""
+    index.save(tmp_path)
+    meta = tmp_path / "index.json"
+    meta.write_text(
+        meta.read_text().replace('"format_version": 1', '"format_version": 0')
+    )
+    with pytest.raises(ValueError, match="format version 0"):
+        TitleIndex.load(tmp_path)
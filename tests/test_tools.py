@@ -0,0 +1,28 @@
+"""Detection of marimo notebooks by tools.py."""
+
+from pathlib import Path
+
+from movie_metadata.catalog import data_dir
+from tools import is_marimo_app
+
+# Root of the repository, where tools.py is.
+repo_root = Path(__file__).parent.parent
+
+
+def test_marimo_notebook_is_detected() -> None:
+    """The bundled marimo notebook is a marimo app."""
+    assert is_marimo_app(data_dir / "movie_metadata.py")
+
+
+def test_marimo_mentions_are_not_notebooks() -> None:
+    """tools.py mentions `import marimo` and `@app.cell` but is not a notebook."""
+    assert not is_marimo_app(repo_root / "tools.py")
+
+
+def test_cells_without_app_assignment(tmp_path: Path) -> None:
+    """A file importing marimo with `@app.cell` functions is a notebook."""
+    path = tmp_path / "cells.py"
+    path.write_text("import marimo\n\n\n@app.cell\ndef _():\n    return\n")
+    assert is_marimo_app(path)
+    path.write_text("def _():\n    import marimo\n    app = marimo.App()\n")
+    assert not is_marimo_app(path)
@@ -1,6 +1,15 @@
 """A CLI for running development tools on jupyter notebooks and python files."""
 
+import ast
+import fnmatch
+import json
+import os
+import re
 import subprocess
+import tempfile
+import time
+import tomllib
+import xml.etree.ElementTree as ET
 from pathlib import Path
 
 import click
@@ -15,10 +24,110 @@ help_msg = {
     "skip_metavar": "STRING",
     "file_type_help": """'nb' - Runs tools on jupyter notebooks (.ipynb) only.
     'all' - Runs tools on both jupyter notebooks and python files (.ipynb and .py).
-    'py' - Runs tools on python files (.py) only.""",
+    'py' - Runs tools on python files (.py) only.
+    'marimo' - Runs tools on marimo notebooks (.py files containing a marimo app) only.
+    Every marimo notebook found is passed to a single invocation of each tool and the
+    cells are checked as separate units.""",
     "filenames_metavar": "[FILENAME]...",
+    "report_help": """Writes a machine-readable report of the run to PATH. The report
+    includes the wall time, exit status, number of findings and number of files
+    processed for each tool run, as well as totals per file type.""",
+    "report_format_help": """Format of the report written with the -r|--report
+    option. 'json' - JSON document. 'junit' - JUnit XML (one testcase per tool run).""",
 }
 
+# Regex patterns used to count the findings reported by each tool in its output. A
+# pattern with a group captures a count, a pattern without a group counts one finding
+# per matching line.
+findings_patterns = {
+    "black": re.compile(r"(\d+) files? (?:would be )?reformatted"),
+    "blacken-docs": re.compile(r"^(?:Rewriting|.*: code block parse error)", re.M),
+    "isort": re.compile(r"^(?:ERROR|Fixing)", re.M),
+    "interrogate": re.compile(r"^RESULT: FAILED", re.M),
+    "flake8": re.compile(r"^.+?:\d+:\d+: [A-Z]+\d+", re.M),
+    "mypy": re.compile(r"^.+?:\d+: error:", re.M),
+}
+
+# Glob patterns for the files each file type processes.
+file_type_globs = {"nb": "*.ipynb", "py": "*.py", "marimo": "*.py", "md": "*.md"}
+
+# Directories skipped when looking for the files each file type processes, as the
+# tools skip them by default (any other directory starting with "." is skipped too).
+excluded_dirs = {"__pycache__", "build", "dist", "venv", "_build", "buck-out"}
+
+# Tools that modify files are run on marimo notebooks directly, the others are run on
+# shadow copies in which each cell is a separate, uniquely named function.
+marimo_formatters = {"black", "isort"}
+
+
+def is_app_cell(decorator: ast.expr) -> bool:
+    """Check whether `decorator` is marimo's `@app.cell` (with or without a call).
+
+    Parameters
+    ----------
+    decorator : ast.expr
+        Decorator of a function definition.
+
+    Returns
+    -------
+    bool
+        True for `@app.cell` and `@app.cell(...)`.
+    """
+    target = decorator.func if isinstance(decorator, ast.Call) else decorator
+    return (
+        isinstance(target, ast.Attribute)
+        and isinstance(target.value, ast.Name)
+        and target.value.id == "app"
+        and target.attr == "cell"
+    )
+
+
+def is_marimo_app(path: Path) -> bool:
+    """Check whether the python file at `path` is a marimo notebook.
+
+    The file is parsed rather than searched for text, so that files mentioning
+    marimo (e.g. in docstrings) are not mistaken for notebooks. A notebook imports
+    marimo at the top level and either assigns `app = marimo.App(...)` or defines
+    `@app.cell` functions at the top level.
+
+    Parameters
+    ----------
+    path : Path
+        Path to a python file.
+
+    Returns
+    -------
+    bool
+        True if the file is a marimo notebook, False otherwise (including files that
+        cannot be parsed).
+    """
+    try:
+        body = ast.parse(path.read_text(encoding="utf-8"), filename=str(path)).body
+    except (SyntaxError, UnicodeDecodeError):
+        return False
+
+    imports_marimo = any(
+        isinstance(node, ast.Import)
+        and any(alias.name == "marimo" and alias.asname is None for alias in node.names)
+        for node in body
+    )
+    creates_app = any(
+        isinstance(node, ast.Assign)
+        and any(isinstance(t, ast.Name) and t.id == "app" for t in node.targets)
+        and isinstance(node.value, ast.Call)
+        and isinstance(node.value.func, ast.Attribute)
+        and isinstance(node.value.func.value, ast.Name)
+        and node.value.func.value.id == "marimo"
+        and node.value.func.attr == "App"
+        for node in body
+    )
+    defines_cells = any(
+        isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+        and any(is_app_cell(decorator) for decorator in node.decorator_list)
+        for node in body
+    )
+    return imports_marimo and (creates_app or defines_cells)
+
 
 @click.command()
 @click.option("-md", "--markdown", is_flag=True, help=help_msg["markdown_help"])
@@ -32,11 +141,25 @@ help_msg = {
     "-t",
     "--type",
     "file_type",
-    type=click.Choice(["nb", "py", "all"]),
+    type=click.Choice(["nb", "py", "marimo", "all"]),
     show_default=True,
     default="nb",
     help=help_msg["file_type_help"],
 )
+@click.option(
+    "-r",
+    "--report",
+    "report_path",
+    type=click.Path(dir_okay=False, writable=True),
+    help=help_msg["report_help"],
+)
+@click.option(
+    "--report-format",
+    type=click.Choice(["json", "junit"]),
+    show_default=True,
+    default="json",
+    help=help_msg["report_format_help"],
+)
 @click.argument(
     "filenames",
     nargs=-1,
@@ -47,6 +170,8 @@ def tools(
     markdown: bool,
     skip: str | None,
     file_type: str,
+    report_path: str | None,
+    report_format: str,
     filenames: tuple[str, ...],
 ) -> None:
     """tools.py runs development tools on project files.
@@ -58,6 +183,11 @@ def tools(
     python (.py) and markdown (.md) files as well. Additionally, there is an option to
     allow for skipping tools during the run process if needed.
 
+    The exit status, wall time and number of findings of every tool run are recorded.
+    A timing summary is shown at the end of the run and, with the -r|--report option,
+    a JSON or JUnit XML report is written. The exit code of tools.py is non-zero if any
+    tool exited with a non-zero exit code.
+
     Current Tools In Use:
 
     \b
@@ -78,9 +208,11 @@ def tools(
     type_messages = {
         "nb": "notebooks (.ipynb)",
         "py": "python files (.py)",
+        "marimo": "marimo notebooks (.py)",
         "md": "markdown files (.md)",
     }
     type_prepend = {}
+    results: list[dict] = []
 
     # Helper Functions -----------------------------------------------------------------
     def double_echo(func):
@@ -162,13 +294,297 @@ def tools(
 
         # blacken-docs is not run on python files, remove it from the list of tools
         # shown for python files.
-        if file_type == "py":
+        if file_type in ("py", "marimo") and "blacken-docs" in tools_display:
             tools_display.remove("blacken-docs")
 
         click.echo("Run Summary:")
         click.echo(f"Tool(s): {', '.join(tools_display)}")
         click.echo(f"File Type(s): {', '.join(prepend.values())}")
 
+    def find_files(pattern: str) -> list[Path]:
+        """Find the files matching `pattern` within the current working directory.
+
+        Hidden directories (e.g. `.git`, `.venv`, `.ipynb_checkpoints`) and the
+        directories of `excluded_dirs` are not searched.
+
+        Parameters
+        ----------
+        pattern : str
+            Glob pattern of the file names.
+
+        Returns
+        -------
+        list[Path]
+            Sorted paths of the files found.
+        """
+        paths: list[Path] = []
+        for root, dirs, files in os.walk(cwd):
+            dirs[:] = [
+                d for d in dirs if not d.startswith(".") and d not in excluded_dirs
+            ]
+            paths.extend(Path(root, name) for name in fnmatch.filter(files, pattern))
+        return sorted(paths)
+
+    def count_files(file_type: str) -> int:
+        """Count the files of `file_type` that the tools process.
+
+        Parameters
+        ----------
+        file_type : str
+            Type of file that the tool is being run on.
+
+        Returns
+        -------
+        int
+            Number of files processed.
+        """
+        if file_type == "md":
+            return len(filenames)
+        if file_type == "marimo":
+            return len(marimo_apps)
+        return len(find_files(file_type_globs[file_type]))
+
+    def find_marimo_apps() -> list[Path]:
+        """Find the marimo notebooks within the current working directory.
+
+        See `is_marimo_app` for what makes a python file a marimo notebook.
+
+        Returns
+        -------
+        list[Path]
+            Sorted paths of the marimo notebooks found.
+        """
+        return [
+            path
+            for path in find_files(file_type_globs["marimo"])
+            if is_marimo_app(path)
+        ]
+
+    def write_marimo_shadow(path: Path, shadow_dir: Path) -> Path:
+        """Write a copy of a marimo notebook in which each cell is a separate unit.
+
+        Each `@app.cell` decorator is replaced by a comment and the cell function,
+        which marimo names `_`, is renamed to `_cell_<line number>`. The cells are thus
+        checked as separate functions whose parameters define the names the cell uses,
+        without redefinition noise from the repeated `_` functions. Line numbers are
+        preserved so the findings point to the lines of the original notebook.
+
+        Parameters
+        ----------
+        path : Path
+            Path to the marimo notebook.
+        shadow_dir : Path
+            Directory the shadow copy is written to.
+
+        Returns
+        -------
+        Path
+            Path to the shadow copy.
+        """
+        source = path.read_text(encoding="utf-8")
+        lines = source.splitlines(keepends=True)
+
+        for node in ast.parse(source, filename=str(path)).body:
+            if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                continue
+            for decorator in node.decorator_list:
+                if not is_app_cell(decorator):
+                    continue
+                # assert to address mypy [operator] error.
+                assert decorator.end_lineno is not None
+                for lineno in range(decorator.lineno, decorator.end_lineno + 1):
+                    indent = lines[lineno - 1][: decorator.col_offset - 1]
+                    lines[lineno - 1] = f"{indent}# marimo cell\n"
+                if node.name == "_":
+                    lines[node.lineno - 1] = lines[node.lineno - 1].replace(
+                        "def _(", f"def _cell_{node.lineno}(", 1
+                    )
+
+        # Flatten the relative path into the file name so that shadow copies of
+        # notebooks in different directories do not collide as modules.
+        shadow_path = shadow_dir.joinpath(
+            "__".join(path.relative_to(cwd).with_suffix("").parts) + ".py"
+        )
+        shadow_path.write_text("".join(lines), encoding="utf-8")
+        return shadow_path
+
+    def count_findings(tool: str, output: str) -> int:
+        """Count the findings reported by `tool` in its `output`.
+
+        Parameters
+        ----------
+        tool : str
+            Name of the development tool.
+        output : str
+            Combined stdout and stderr of the tool run.
+
+        Returns
+        -------
+        int
+            Number of findings, 0 if the tool has no known findings pattern.
+        """
+        pattern = findings_patterns.get(tool)
+        if pattern is None:
+            return 0
+        if pattern.groups:
+            return sum(int(match) for match in pattern.findall(output))
+        return len(pattern.findall(output))
+
+    def run_tool(
+        command: list,
+        *,
+        tool: str,
+        file_type: str,
+        path_map: dict[str, str] | None = None,
+    ) -> None:
+        """Run a tool, echo its output and record the result of the run.
+
+        Parameters
+        ----------
+        command : list
+            Command passed to `subprocess.run`.
+        tool : str
+            Name of the development tool.
+        file_type : str
+            Type of file that the tool is being run on.
+        path_map : dict[str, str] | None, optional
+            Mapping from paths in the tool output to the paths shown instead, by
+            default None.
+        """
+        start = time.perf_counter()
+        try:
+            completed = subprocess.run(command, capture_output=True, text=True)
+        except FileNotFoundError:
+            # Record a missing tool like a shell would (exit status 127).
+            completed = subprocess.CompletedProcess(
+                command, 127, "", f"{command[0]}: command not found\n"
+            )
+        wall_time = time.perf_counter() - start
+
+        for shadow, original in (path_map or {}).items():
+            completed.stdout = completed.stdout.replace(shadow, original)
+            completed.stderr = completed.stderr.replace(shadow, original)
+
+        click.echo(completed.stdout, nl=False)
+        click.echo(completed.stderr, nl=False, err=True)
+
+        results.append(
+            {
+                "tool": tool,
+                "file_type": file_type,
+                "command": [str(part) for part in command],
+                "exit_status": completed.returncode,
+                "wall_time": round(wall_time, 6),
+                "findings": count_findings(tool, completed.stdout + completed.stderr),
+                "files_processed": files_processed[file_type],
+            }
+        )
+
+    def summarize_results(results: list[dict]) -> dict:
+        """Aggregate the tool results into per file type and overall totals.
+
+        Parameters
+        ----------
+        results : list[dict]
+            Recorded results of each tool run.
+
+        Returns
+        -------
+        dict
+            Report containing the tool results, totals per file type and the
+            aggregated exit code.
+        """
+        file_types: dict[str, dict] = {}
+        for result in results:
+            totals = file_types.setdefault(
+                result["file_type"],
+                {"wall_time": 0.0, "findings": 0, "failed": 0, "runs": 0},
+            )
+            totals["wall_time"] = round(totals["wall_time"] + result["wall_time"], 6)
+            totals["findings"] += result["findings"]
+            totals["failed"] += result["exit_status"] != 0
+            totals["runs"] += 1
+            totals["files_processed"] = result["files_processed"]
+
+        return {
+            "cwd": str(cwd),
+            "wall_time": round(sum(r["wall_time"] for r in results), 6),
+            "exit_code": int(any(r["exit_status"] != 0 for r in results)),
+            "file_types": file_types,
+            "tools": results,
+        }
+
+    def generate_timing_summary(report: dict) -> None:
+        """Generate a summary of the wall time and status of each tool run.
+
+        Parameters
+        ----------
+        report : dict
+            Report created by `summarize_results`.
+        """
+        click.echo("Timing Summary:")
+        for result in sorted(report["tools"], key=lambda r: -r["wall_time"]):
+            status = "ok" if result["exit_status"] == 0 else "FAILED"
+            click.echo(
+                f"{result['wall_time']:>9.3f}s  {result['file_type']:<7}"
+                + f"{result['tool']:<13}{status:<7}findings: {result['findings']}"
+            )
+        click.echo(f"{report['wall_time']:>9.3f}s  total")
+
+    def write_report(report: dict, path: Path, report_format: str) -> None:
+        """Write the report to `path` as JSON or JUnit XML.
+
+        Parameters
+        ----------
+        report : dict
+            Report created by `summarize_results`.
+        path : Path
+            Destination of the report.
+        report_format : str
+            Either 'json' or 'junit'.
+        """
+        if report_format == "json":
+            path.write_text(json.dumps(report, indent=2) + "\n")
+            return
+
+        testsuites = ET.Element(
+            "testsuites",
+            name="tools.py",
+            tests=str(len(report["tools"])),
+            failures=str(sum(r["exit_status"] != 0 for r in report["tools"])),
+            time=f"{report['wall_time']:.6f}",
+        )
+        for ft, totals in report["file_types"].items():
+            testsuite = ET.SubElement(
+                testsuites,
+                "testsuite",
+                name=ft,
+                tests=str(totals["runs"]),
+                failures=str(totals["failed"]),
+                time=f"{totals['wall_time']:.6f}",
+            )
+            for result in (r for r in report["tools"] if r["file_type"] == ft):
+                testcase = ET.SubElement(
+                    testsuite,
+                    "testcase",
+                    classname=ft,
+                    name=result["tool"],
+                    time=f"{result['wall_time']:.6f}",
+                )
+                properties = ET.SubElement(testcase, "properties")
+                for key in ("exit_status", "findings", "files_processed"):
+                    ET.SubElement(
+                        properties, "property", name=key, value=str(result[key])
+                    )
+                if result["exit_status"] != 0:
+                    ET.SubElement(
+                        testcase,
+                        "failure",
+                        message=f"{result['tool']} exited with status "
+                        + f"{result['exit_status']} ({result['findings']} findings)",
+                    )
+        ET.ElementTree(testsuites).write(path, encoding="utf-8", xml_declaration=True)
+
     # Path processing ------------------------------------------------------------------
     # `tools_path` will be static (always the directory where this file is located).
     tools_path = Path(__file__).parent
@@ -217,6 +633,20 @@ def tools(
             else:
                 run_tools.remove(tool)
 
+    # Options nbqa passes to each tool, reused for the marimo shadow copies.
+    with tools_path.joinpath("pyproject.toml").open("rb") as f:
+        nbqa_addopts = (
+            tomllib.load(f).get("tool", {}).get("nbqa", {}).get("addopts", {})
+        )
+
+    # Detect marimo notebooks once so that every tool runs on the same batch of files.
+    marimo_apps = find_marimo_apps() if "marimo" in type_prepend else []
+    if "marimo" in type_prepend and not marimo_apps:
+        raise click.UsageError(f"No marimo notebooks found in '{cwd}'.")
+
+    # Count the files of each file type once, the count is recorded for every tool run.
+    files_processed = {ft: count_files(ft) for ft in type_prepend}
+
     # Run Dev Tools --------------------------------------------------------------------
     create_banner(
         "RUNNING DEV TOOLS",
@@ -241,17 +671,19 @@ def tools(
                 # `mypy` addressed separately in order to ensure the config file is
                 # added to the command.
                 if tool == "mypy":
-                    subprocess.run(
+                    run_tool(
                         [
                             "nbqa",
                             tool,
                             cwd,
                             "--config-file",
                             tools_path.joinpath("pyproject.toml"),
-                        ]
+                        ],
+                        tool=tool,
+                        file_type=ft,
                     )
                 else:
-                    subprocess.run(["nbqa", tool, cwd])
+                    run_tool(["nbqa", tool, cwd], tool=tool, file_type=ft)
             elif ft == "py":
                 # `blacken-docs` is not run on python files.
                 if tool != "blacken-docs":
@@ -266,16 +698,61 @@ def tools(
                     # `mypy` addressed separately in order to ensure the config file is
                     # added to the command.
                     if tool == "mypy":
-                        subprocess.run(
+                        run_tool(
                             [
                                 tool,
                                 cwd,
                                 "--config-file",
                                 tools_path.joinpath("pyproject.toml"),
-                            ]
+                            ],
+                            tool=tool,
+                            file_type=ft,
                         )
                     else:
-                        subprocess.run([tool, cwd])
+                        run_tool([tool, cwd], tool=tool, file_type=ft)
+            elif ft == "marimo":
+                # `blacken-docs` is not run on python files.
+                if tool == "blacken-docs":
+                    continue
+                create_banner(
+                    f"Running {tool}",
+                    banner_length=tool_banner_len,
+                    fg_color="black",
+                    bg_color="bright_magenta",
+                    prepend=type_prepend,
+                    file_type=ft,
+                )
+                # Every marimo notebook is passed to a single invocation of the tool.
+                if tool in marimo_formatters:
+                    run_tool([tool, *marimo_apps], tool=tool, file_type=ft)
+                    continue
+                with tempfile.TemporaryDirectory() as tmp_dir:
+                    shadow_paths = {
+                        write_marimo_shadow(path, Path(tmp_dir)): path
+                        for path in marimo_apps
+                    }
+                    command = [tool, *shadow_paths]
+                    if tool == "mypy":
+                        command += [
+                            "--config-file",
+                            tools_path.joinpath("pyproject.toml"),
+                        ]
+                    else:
+                        # marimo notebooks share the nbqa options used for jupyter
+                        # notebooks.
+                        command += nbqa_addopts.get(tool, [])
+                    if tool == "interrogate":
+                        # The cell functions are not expected to have docstrings.
+                        command.append("--ignore-semiprivate")
+                    run_tool(
+                        command,
+                        tool=tool,
+                        file_type=ft,
+                        path_map={
+                            str(shadow): str(original.relative_to(cwd))
+                            for shadow, original in shadow_paths.items()
+                        },
+                    )
             elif ft == "md":
                 create_banner(
                     f"Running {tool}",
@@ -285,7 +762,7 @@ def tools(
                     prepend=type_prepend,
                     file_type=ft,
                 )
-                subprocess.run([tool, *filenames])
+                run_tool([tool, *filenames], tool=tool, file_type=ft)
 
     create_banner(
         "DEV TOOLS COMPLETE",
@@ -294,6 +771,17 @@ def tools(
         bg_color="bright_cyan",
     )
 
+    # Report ---------------------------------------------------------------------------
+    report = summarize_results(results)
+    generate_timing_summary(report)
+
+    if report_path:
+        write_report(report, cwd.joinpath(report_path), report_format)
+        click.echo(f"Report written to {report_path} ({report_format}).")
+
+    # Exit with a non-zero exit code if any of the tools failed.
+    click.get_current_context().exit(report["exit_code"])
+
 
 if __name__ == "__main__":
     tools()